@@ -3,6 +3,8 @@
 """NeuroImaging Workflows (NIWorkflows) is a selection of image processing workflows."""
 
 import logging
+import os
+import sys
 
 from acres import Loader
 
@@ -26,11 +28,11 @@ __all__ = [
 NIWORKFLOWS_LOG = logging.getLogger(__packagename__)
 NIWORKFLOWS_LOG.setLevel(logging.INFO)
 
-try:
-    import matplotlib as mpl
-
-    mpl.use('Agg')
-except ImportError:
-    pass
+# Select the Agg backend without paying for importing matplotlib when not plotting,
+# unless a backend was already chosen through the environment
+if 'matplotlib' in sys.modules:
+    sys.modules['matplotlib'].use('Agg')
+else:
+    os.environ.setdefault('MPLBACKEND', 'Agg')
 
 load_resource = Loader(__package__)
@@ -40,6 +40,7 @@ from nipype.interfaces.ants import (
 from nipype.pipeline import engine as pe
 
 from ..data import load as load_data
+from ..engine.workflows import cached_workflow
 from ..interfaces.fixes import (
     FixHeaderApplyTransforms as ApplyTransforms,
 )
@@ -61,6 +62,7 @@ ATROPOS_MODELS = {
 T1W_MODEL = tuple(ATROPOS_MODELS['T1w'].values())
 
 
+@cached_workflow
 def init_brain_extraction_wf(
     name='brain_extraction_wf',
     in_template='OASIS30ANTs',
@@ -75,6 +77,7 @@ def init_brain_extraction_wf(
     atropos_model=None,
     use_laplacian=True,
     bspline_fitting_distance=200,
+    atropos_in_process_morphology=False,
 ):
     """
     Build a workflow for atlas-based brain extraction on anatomical MRI data.
@@ -152,6 +155,9 @@ def init_brain_extraction_wf(
         criterion for image registration quality (default: True)
     bspline_fitting_distance : float
         The size of the b-spline mesh grid elements, in mm (default: 200)
+    atropos_in_process_morphology : bool
+        Massage the outputs of ATROPOS in memory rather than with ``ImageMath``
+        (see :py:func:`init_atropos_wf`)
     name : str, optional
         Workflow name (default: antsBrainExtraction)
 
@@ -399,6 +405,7 @@ def init_brain_extraction_wf(
             in_segmentation_model=atropos_model,
             bspline_fitting_distance=bspline_fitting_distance,
             wm_prior=bool(wm_tpm),
+            in_process_morphology=atropos_in_process_morphology,
         )
 
         wf.connect([
@@ -463,6 +470,7 @@ def init_brain_extraction_wf(
     return wf
 
 
+@cached_workflow
 def init_atropos_wf(
     name='atropos_wf',
     use_random_seed=True,
@@ -472,6 +480,7 @@ def init_atropos_wf(
     in_segmentation_model=T1W_MODEL,
     bspline_fitting_distance=200,
     wm_prior=False,
+    in_process_morphology=False,
 ):
     """
     Create an ANTs' ATROPOS workflow for brain tissue segmentation.
@@ -524,6 +533,10 @@ def init_atropos_wf(
         Whether the WM posterior obtained with ATROPOS should be regularized with a prior
         map (typically, mapped from the template). When ``wm_prior`` is ``True`` the input
         field ``wm_prior`` of the input node must be connected.
+    in_process_morphology : :obj:`bool`
+        Whether the massaging of the mask and the outputs of ATROPOS should run in
+        memory (with :class:`~niworkflows.interfaces.morphology.AtroposRefinement`)
+        instead of as a chain of ANTs' ``ImageMath`` and ``MultiplyImages`` calls.
 
     Inputs
     ------
@@ -729,51 +742,12 @@ def init_atropos_wf(
     apply_mask = pe.MapNode(ApplyMask(), iterfield=['in_file'], name='apply_mask')
 
     wf.connect([
-        (inputnode, dil_brainmask, [('in_mask', 'op1')]),
         (inputnode, copy_xform, [(('in_files', _pop), 'hdr_file')]),
         (inputnode, copy_xform_wm, [(('in_files', _pop), 'hdr_file')]),
-        (inputnode, pad_mask, [('in_mask', 'op1')]),
         (inputnode, atropos, [('in_corrected', 'intensity_images')]),
         (inputnode, inu_n4_final, [('in_files', 'input_image')]),
         (inputnode, msk_conform, [(('in_files', _pop), 'in_reference')]),
-        (dil_brainmask, get_brainmask, [('output_image', 'op1')]),
-        (get_brainmask, atropos, [('output_image', 'mask_image')]),
-        (atropos, pad_segm, [('classified_image', 'op1')]),
-        (pad_segm, sel_labels, [('output_image', 'in_segm')]),
-        (sel_labels, get_wm, [('out_wm', 'op1')]),
-        (sel_labels, get_gm, [('out_gm', 'op1')]),
-        (get_gm, fill_gm, [('output_image', 'op1')]),
-        (get_gm, mult_gm, [('output_image', 'first_input')]),
-        (fill_gm, mult_gm, [('output_image', 'second_input')]),
-        (get_wm, relabel_wm, [('output_image', 'first_input')]),
-        (sel_labels, me_csf, [('out_csf', 'op1')]),
-        (mult_gm, add_gm, [('output_product_image', 'op1')]),
-        (me_csf, add_gm, [('output_image', 'op2')]),
-        (add_gm, relabel_gm, [('output_image', 'first_input')]),
-        (relabel_wm, add_gm_wm, [('output_product_image', 'op1')]),
-        (relabel_gm, add_gm_wm, [('output_product_image', 'op2')]),
-        (add_gm_wm, sel_labels2, [('output_image', 'in_segm')]),
-        (sel_labels2, add_7, [('out_wm', 'op1'), ('out_gm', 'op2')]),
-        (add_7, me_7, [('output_image', 'op1')]),
-        (me_7, comp_7, [('output_image', 'op1')]),
-        (comp_7, md_7, [('output_image', 'op1')]),
-        (md_7, fill_7, [('output_image', 'op1')]),
-        (fill_7, add_7_2, [('output_image', 'op1')]),
-        (pad_mask, add_7_2, [('output_image', 'op2')]),
-        (add_7_2, md_7_2, [('output_image', 'op1')]),
-        (md_7_2, me_7_2, [('output_image', 'op1')]),
-        (me_7_2, depad_mask, [('output_image', 'op1')]),
-        (add_gm_wm, depad_segm, [('output_image', 'op1')]),
-        (relabel_wm, depad_wm, [('output_product_image', 'op1')]),
-        (relabel_gm, depad_gm, [('output_product_image', 'op1')]),
-        (sel_labels, depad_csf, [('out_csf', 'op1')]),
-        (depad_csf, merge_tpms, [('output_image', 'in1')]),
-        (depad_gm, merge_tpms, [('output_image', 'in2')]),
-        (depad_wm, merge_tpms, [('output_image', 'in3')]),
-        (depad_mask, msk_conform, [('output_image', 'in_mask')]),
         (msk_conform, copy_xform, [('out', 'out_mask')]),
-        (depad_segm, copy_xform, [('output_image', 'out_segm')]),
-        (merge_tpms, copy_xform, [('out', 'out_tpms')]),
         (atropos, sel_wm, [('posteriors', 'inlist')]),
         (sel_wm, copy_xform_wm, [('out', 'wm_map')]),
         (inu_n4_final, copy_xform, [('output_image', 'bias_corrected'),
@@ -790,6 +764,67 @@ def init_atropos_wf(
         ]),
     ])  # fmt:skip
 
+    if in_process_morphology:
+        from ..interfaces.morphology import AtroposRefinement
+
+        prep_mask = pe.Node(niu.Function(function=_atropos_mask), name='prep_mask')
+        refine_segm = pe.Node(
+            AtroposRefinement(segmentation_model=tuple(in_segmentation_model), padding=padding),
+            name='refine_segm',
+        )
+
+        wf.connect([
+            (inputnode, prep_mask, [('in_mask', 'in_mask')]),
+            (inputnode, refine_segm, [('in_mask', 'in_mask')]),
+            (prep_mask, atropos, [('out', 'mask_image')]),
+            (atropos, refine_segm, [('classified_image', 'in_segm')]),
+            (refine_segm, msk_conform, [('out_mask', 'in_mask')]),
+            (refine_segm, copy_xform, [('out_segm', 'out_segm'),
+                                       ('out_tpms', 'out_tpms')]),
+        ])  # fmt:skip
+    else:
+        wf.connect([
+            (inputnode, dil_brainmask, [('in_mask', 'op1')]),
+            (inputnode, pad_mask, [('in_mask', 'op1')]),
+            (dil_brainmask, get_brainmask, [('output_image', 'op1')]),
+            (get_brainmask, atropos, [('output_image', 'mask_image')]),
+            (atropos, pad_segm, [('classified_image', 'op1')]),
+            (pad_segm, sel_labels, [('output_image', 'in_segm')]),
+            (sel_labels, get_wm, [('out_wm', 'op1')]),
+            (sel_labels, get_gm, [('out_gm', 'op1')]),
+            (get_gm, fill_gm, [('output_image', 'op1')]),
+            (get_gm, mult_gm, [('output_image', 'first_input')]),
+            (fill_gm, mult_gm, [('output_image', 'second_input')]),
+            (get_wm, relabel_wm, [('output_image', 'first_input')]),
+            (sel_labels, me_csf, [('out_csf', 'op1')]),
+            (mult_gm, add_gm, [('output_product_image', 'op1')]),
+            (me_csf, add_gm, [('output_image', 'op2')]),
+            (add_gm, relabel_gm, [('output_image', 'first_input')]),
+            (relabel_wm, add_gm_wm, [('output_product_image', 'op1')]),
+            (relabel_gm, add_gm_wm, [('output_product_image', 'op2')]),
+            (add_gm_wm, sel_labels2, [('output_image', 'in_segm')]),
+            (sel_labels2, add_7, [('out_wm', 'op1'), ('out_gm', 'op2')]),
+            (add_7, me_7, [('output_image', 'op1')]),
+            (me_7, comp_7, [('output_image', 'op1')]),
+            (comp_7, md_7, [('output_image', 'op1')]),
+            (md_7, fill_7, [('output_image', 'op1')]),
+            (fill_7, add_7_2, [('output_image', 'op1')]),
+            (pad_mask, add_7_2, [('output_image', 'op2')]),
+            (add_7_2, md_7_2, [('output_image', 'op1')]),
+            (md_7_2, me_7_2, [('output_image', 'op1')]),
+            (me_7_2, depad_mask, [('output_image', 'op1')]),
+            (add_gm_wm, depad_segm, [('output_image', 'op1')]),
+            (relabel_wm, depad_wm, [('output_product_image', 'op1')]),
+            (relabel_gm, depad_gm, [('output_product_image', 'op1')]),
+            (sel_labels, depad_csf, [('out_csf', 'op1')]),
+            (depad_csf, merge_tpms, [('output_image', 'in1')]),
+            (depad_gm, merge_tpms, [('output_image', 'in2')]),
+            (depad_wm, merge_tpms, [('output_image', 'in3')]),
+            (depad_mask, msk_conform, [('output_image', 'in_mask')]),
+            (depad_segm, copy_xform, [('output_image', 'out_segm')]),
+            (merge_tpms, copy_xform, [('out', 'out_tpms')]),
+        ])  # fmt:skip
+
     if wm_prior:
         from nipype.algorithms.metrics import FuzzyOverlap
 
@@ -823,6 +858,7 @@ def init_atropos_wf(
     return wf
 
 
+@cached_workflow
 def init_n4_only_wf(
     atropos_model=None,
     atropos_refine=True,
@@ -831,6 +867,7 @@ def init_n4_only_wf(
     mem_gb=3.0,
     name='n4_only_wf',
     omp_nthreads=None,
+    atropos_in_process_morphology=False,
 ):
     """
     Build a workflow to sidetrack brain extraction on skull-stripped datasets.
@@ -868,6 +905,9 @@ def init_n4_only_wf(
     atropos_model : tuple or None
         Allows to specify a particular segmentation model, overwriting
         the defaults based on ``bids_suffix``
+    atropos_in_process_morphology : bool
+        Massage the outputs of ATROPOS in memory rather than with ``ImageMath``
+        (see :py:func:`init_atropos_wf`)
     name : str, optional
         Workflow name (default: ``'n4_only_wf'``).
 
@@ -963,6 +1003,7 @@ def init_n4_only_wf(
             omp_nthreads=omp_nthreads,
             mem_gb=mem_gb,
             in_segmentation_model=atropos_model,
+            in_process_morphology=atropos_in_process_morphology,
         )
 
         wf.connect([
@@ -1042,6 +1083,25 @@ def _conform_mask(in_mask, in_reference):
     return out_file
 
 
+def _atropos_mask(in_mask, radius=2):
+    """Dilate the brain mask and keep its largest component, as ``ImageMath`` would."""
+    from pathlib import Path
+
+    import nibabel as nb
+    import numpy as np
+    from nipype.utils.filemanip import fname_presuffix
+
+    from niworkflows.interfaces.morphology import _binary_dilation, _largest_component
+
+    img = nb.load(in_mask)
+    mask = _largest_component(_binary_dilation(np.asanyarray(img.dataobj) >= 0.5, radius))
+    hdr = img.header.copy()
+    hdr.set_data_dtype('float32')
+    out_file = fname_presuffix(in_mask, suffix='_maths', newpath=str(Path().absolute()))
+    img.__class__(mask.astype('float32'), img.affine, hdr).to_filename(out_file)
+    return out_file
+
+
 def _matchlen(value, reference):
     return [value] * len(reference)
 
@@ -26,9 +26,12 @@ from nipype import logging
 from nipype.interfaces import utility as niu
 from nipype.pipeline import engine as pe
 
+from ..engine.workflows import cached_workflow
+
 LOGGER = logging.getLogger('workflow')
 
 
+@cached_workflow
 def init_bbreg_wf(
     *,
     omp_nthreads,
@@ -27,7 +27,9 @@ import multiprocessing as mp
 import os
 import sys
 from concurrent.futures import ProcessPoolExecutor
+from contextlib import suppress
 from copy import deepcopy
+from importlib import import_module
 from time import sleep, time
 from traceback import format_exception
 
@@ -67,6 +69,27 @@ def run_node(node, updatehash, taskid):
     return result
 
 
+def _init_worker(modules, initializer, *initargs):
+    """
+    Import the modules of the interfaces a worker may run, then call the initializer.
+
+    Parameters
+    ----------
+    modules : :obj:`list` of :obj:`str`
+        names of the modules to import
+    initializer : callable or ``None``
+        a function that will be called with ``initargs`` once modules are loaded
+
+    """
+    for module in modules:
+        # Failing imports will be reported when (and if) the node runs
+        with suppress(Exception):
+            import_module(module)
+
+    if initializer is not None:
+        initializer(*initargs)
+
+
 class PluginBase:
     """Base class for plugins."""
 
@@ -419,6 +442,10 @@ class MultiProcPlugin(DistributedPluginBase):
             A process pool that has been already initialized.
         plugin_args : :obj:`dict`
             A Nipype-compatible dictionary of settings.
+            Setting ``preload_modules`` to ``False`` disables warming up workers
+            (importing the modules of the workflow's interfaces) before the first
+            node is submitted. Warm-up is only possible when the plugin creates
+            its own ``pool``.
 
         """
         super().__init__(plugin_args=plugin_args)
@@ -456,13 +483,19 @@ class MultiProcPlugin(DistributedPluginBase):
             config.environment.total_memory * 0.9,
         )
         self.raise_insufficient = self.plugin_args.get('raise_insufficient', False)
+        self.preload_modules = self.plugin_args.get('preload_modules', True) and pool is None
+
+        # Workers are started at the first submission, so the list of modules to
+        # preload can still be filled in when the graph is checked before running
+        self._preload = []
 
         # Instantiate different thread pools for non-daemon processes
         mp_context = mp.get_context(self.plugin_args.get('mp_context'))
+        self._forking = mp_context.get_start_method() == 'fork'
         self.pool = pool or ProcessPoolExecutor(
             max_workers=self.processors,
-            initializer=config._process_initializer,
-            initargs=(config.file_path,),
+            initializer=_init_worker,
+            initargs=(self._preload, config._process_initializer, config.file_path),
             mp_context=mp_context,
         )
 
@@ -496,9 +529,22 @@ class MultiProcPlugin(DistributedPluginBase):
 
         tasks_mem_gb = []
         tasks_num_th = []
+        modules = set()
         for node in graph.nodes():
             tasks_mem_gb.append(node.mem_gb)
             tasks_num_th.append(node.n_procs)
+            if not node.run_without_submitting:
+                modules.add(type(node.interface).__module__)
+
+        if self.preload_modules:
+            modules.discard('__main__')
+            self._preload[:] = sorted(modules.union(self._preload))
+            if self._forking:
+                # Forked workers inherit the modules imported by the parent
+                _init_worker(self._preload, None)
+            # Start workers, so that they warm up while the graph is being indexed
+            for _ in range(self.processors):
+                self.pool.submit(_init_worker, [], None)
 
         if self.raise_insufficient and (
             np.any(np.array(tasks_mem_gb) > self.memory_gb)
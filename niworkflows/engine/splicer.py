@@ -2,6 +2,7 @@
 
 import logging
 import typing as ty
+from collections import defaultdict
 from functools import wraps
 
 import nipype.pipeline.engine as pe
@@ -43,7 +44,7 @@ def splice_workflow(
         root_wf.write_graph('pre-slice.dot', format='png', graph2use='colored')
 
     substitutions = _get_substitutions(root_wf, replacements)
-    _splice_components(root_wf, substitutions, debug=debug)
+    _splice_components(substitutions, debug=debug)
 
     if write_graph:
         root_wf.write_graph('post-slice.dot', format='png', graph2use='colored')
@@ -53,77 +54,75 @@ def splice_workflow(
 def _get_substitutions(
     workflow: pe.Workflow,
     replacements: dict[str, EngineBase],
-) -> dict[EngineBase, EngineBase]:
-    """ "Query tags in workflow, and return a list of substitutions to make"""
-    substitutions = {}
-    tagged_wfs = _fetch_tags(workflow)
-    for tag in tagged_wfs:
-        if tag in replacements:
-            substitutions[tagged_wfs[tag]] = replacements[tag]
+) -> list[tuple[EngineBase, EngineBase, pe.Workflow]]:
+    """Query tags in workflow, and return a list of substitutions to make."""
+    tagged = _fetch_tags(workflow)
+    targets = {tagged[tag][0] for tag in replacements if tag in tagged}
+
+    substitutions = []
+    for tag, (node, lineage) in tagged.items():
+        # Nodes within a workflow that is replaced as a whole are left alone
+        if node in targets and targets.isdisjoint(lineage):
+            substitutions.append((node, replacements[tag], lineage[-1]))
     return substitutions
 
 
-def _fetch_tags(wf: pe.Workflow) -> dict[str, EngineBase]:
-    """Query all nodes in a workflow and return a dictionary of tags and nodes."""
+def _fetch_tags(
+    wf: pe.Workflow,
+    lineage: tuple[pe.Workflow, ...] = (),
+) -> dict[str, tuple[EngineBase, tuple[pe.Workflow, ...]]]:
+    """
+    Query all nodes in a workflow and index tags.
+
+    Returns a dictionary mapping tags to the (last) node found with that tag,
+    and the chain of workflows (outermost first) containing the node.
+    """
     tagged = {}
+    lineage = (*lineage, wf)
     for node in wf._graph.nodes:
         if hasattr(node, '_tag'):
-            tagged[node._tag] = node
+            tagged[node._tag] = (node, lineage)
         if isinstance(node, pe.Workflow):
-            inner_tags = _fetch_tags(node)
-            tagged.update(inner_tags)
+            tagged.update(_fetch_tags(node, lineage))
     return tagged
 
 
 def _splice_components(
-    workflow: pe.Workflow,
-    substitutions: dict[EngineBase, EngineBase],
+    substitutions: list[tuple[EngineBase, EngineBase, pe.Workflow]],
     debug: bool = False,
-) -> tuple[list, list]:
-    """Query all connections and return a list of removals and additions to be made."""
-    edge_removals = []
-    edge_connects = []
-    node_removals = set()
-    node_adds = set()
-    _expanded_workflows = set()
-
-    to_replace = [x.fullname for x in substitutions]
-
-    for src, dst in workflow._graph.edges:
-        if dst.fullname in to_replace:
-            edge_data = workflow._graph.get_edge_data(src, dst)
-            alt_dst = substitutions[dst]
-            alt_dst._hierarchy = dst._hierarchy
-
-            edge_removals.append((src, dst))
-            node_removals.add(dst)
-            node_adds.add(alt_dst)
-            edge_connects.append((src, alt_dst, edge_data))
-        elif src.fullname in to_replace:
-            edge_data = workflow._graph.get_edge_data(src, dst)
-            alt_src = substitutions[src]
-            alt_src._hierarchy = src._hierarchy
-
-            edge_removals.append((src, dst))
-            node_removals.add(src)
-            node_adds.add(alt_src)
-            edge_connects.append((alt_src, dst, edge_data))
-        elif isinstance(dst, pe.Workflow) and dst not in _expanded_workflows:
-            _expanded_workflows.add(dst)
-            _splice_components(dst, substitutions, debug=debug)
-        elif isinstance(src, pe.Workflow) and src not in _expanded_workflows:
-            _expanded_workflows.add(src)
-            _splice_components(src, substitutions, debug=debug)
+) -> None:
+    """Replace nodes (and their connections) within the workflows that contain them."""
+    by_workflow = defaultdict(list)
+    for node, alt_node, workflow in substitutions:
+        by_workflow[workflow].append((node, alt_node))
 
     logger = logging.getLogger('nipype.workflow')
-    logger.debug(
-        'Workflow: %s, \n- edge_removals: %s, \n+ edge_connects: %s',
-        workflow,
-        edge_removals,
-        edge_connects,
-    )
-
-    workflow._graph.remove_edges_from(edge_removals)
-    workflow.remove_nodes(node_removals)
-    workflow.add_nodes(node_adds)
-    workflow._graph.add_edges_from(edge_connects)
+    for workflow, nodes in by_workflow.items():
+        graph = workflow._graph
+        alt_nodes = dict(nodes)
+        edges = {}
+        for node, alt_node in nodes:
+            alt_node._hierarchy = node._hierarchy
+            for src, dst, edge_data in (
+                *graph.in_edges(node, data=True),
+                *graph.out_edges(node, data=True),
+            ):
+                edges[src, dst] = edge_data
+
+        edge_removals = list(edges)
+        edge_connects = [
+            (alt_nodes.get(src, src), alt_nodes.get(dst, dst), edge_data)
+            for (src, dst), edge_data in edges.items()
+        ]
+
+        logger.debug(
+            'Workflow: %s, \n- edge_removals: %s, \n+ edge_connects: %s',
+            workflow,
+            edge_removals,
+            edge_connects,
+        )
+
+        graph.remove_edges_from(edge_removals)
+        workflow.remove_nodes(list(alt_nodes))
+        workflow.add_nodes(list(alt_nodes.values()))
+        graph.add_edges_from(edge_connects)
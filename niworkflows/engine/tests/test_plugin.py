@@ -1,4 +1,5 @@
 import logging
+import sys
 from types import SimpleNamespace
 
 import pytest
@@ -96,3 +97,40 @@ def test_plugin_app_config(tmp_path, workflow, caplog):
 
     assert init_flag.exists()
     assert init_flag.read_text() == 'flag'
+
+
+def record_modules(file_path: str) -> None:
+    """Record whether the interfaces of the workflow were imported before initializing."""
+    with open(file_path, 'a') as f:
+        f.write(f'{"niworkflows.interfaces.utility" in sys.modules}\n')
+
+
+@pytest.mark.parametrize('preload', [True, False])
+def test_plugin_preload_modules(tmp_path, caplog, preload):
+    """Test workers import the modules of the workflow's interfaces when they start."""
+    from niworkflows.interfaces.utility import KeySelect
+
+    workflow = pe.Workflow(name='test_wf', base_dir=tmp_path)
+    workflow.add_nodes(
+        [pe.Node(KeySelect(fields=['field'], keys=['a'], key='a', field=[1]), name='select')]
+    )
+
+    init_flag = tmp_path / 'init_flag.txt'
+    app_config = SimpleNamespace(
+        environment=SimpleNamespace(total_memory=1),
+        _process_initializer=record_modules,
+        file_path=str(init_flag),
+    )
+    caplog.set_level(logging.CRITICAL, logger='nipype.workflow')
+    workflow.run(
+        plugin=MultiProcPlugin(
+            plugin_args={
+                'n_procs': 1,
+                'app_config': app_config,
+                'mp_context': 'spawn',
+                'preload_modules': preload,
+            }
+        )
+    )
+
+    assert init_flag.read_text() == f'{preload}\n'
@@ -163,3 +163,52 @@ def test_tag(name):
 
     wf = init_workflow(name, xarg='bar')
     assert wf._tag == name
+
+
+def test_splice_adjacent(tmp_path):
+    """Connected tagged nodes are both replaced, and so is an unconnected one."""
+    wf = Workflow(name='root', base_dir=tmp_path)
+    nodes = [Node(NullInterface(), name=f'null{i}') for i in range(4)]
+    for i, node in enumerate(nodes):
+        node._tag = f'n{i}'
+    wf.connect([
+        (nodes[0], nodes[1], [('out1', 'in1')]),
+        (nodes[1], nodes[2], [('out1', 'in1'), ('out2', 'in2')]),
+    ])  # fmt:skip
+    wf.add_nodes([nodes[3]])
+
+    replacements = {tag: Node(NullInterface(), name=f'{tag}_alt') for tag in ('n1', 'n2', 'n3')}
+    splice_workflow(wf, replacements)
+
+    graph = wf._graph
+    assert set(graph.nodes) == {nodes[0], *replacements.values()}
+    assert graph.get_edge_data(nodes[0], replacements['n1'])['connect'] == [('out1', 'in1')]
+    assert graph.get_edge_data(replacements['n1'], replacements['n2'])['connect'] == [
+        ('out1', 'in1'),
+        ('out2', 'in2'),
+    ]
+
+
+def _create_deep_wf(name: str, depth: int, width: int):
+    wf = _create_null_wf(name, tag=name)
+    if depth:
+        for i in range(width):
+            child = _create_deep_wf(f'{name}_{i}', depth - 1, width)
+            wf.connect(wf.get_node('null1'), 'out1', child, 'inputnode.in1')
+    return wf
+
+
+def test_splice_deep(tmp_path):
+    """Splice many tags at once throughout a synthetic deep workflow."""
+    wf = _create_deep_wf('wf', depth=3, width=4)
+    wf.base_dir = tmp_path
+
+    # Replace all workflows at the deepest level
+    tags = [f'wf_{i}_{j}_{k}' for i in range(4) for j in range(4) for k in range(4)]
+    splice_workflow(wf, {name: _create_null_wf(f'{name}_alt') for name in tags})
+
+    for name in tags:
+        _, i, j, _ = name.split('_')
+        parent = wf.get_node(f'wf_{i}').get_node(f'wf_{i}_{j}')
+        assert parent.get_node(f'{name}_alt') is not None
+        assert parent.get_node(name) is None
@@ -26,7 +26,9 @@ from nipype.interfaces import afni
 from nipype.interfaces import utility as niu
 from nipype.pipeline.engine import Node
 
+from .. import workflows as wfmod
 from ..workflows import LiterateWorkflow as Workflow
+from ..workflows import cached_workflow, clear_workflow_cache
 
 
 def _reorient_wf(name='ReorientWorkflow'):
@@ -63,3 +65,76 @@ def test_boilerplate():
     # fmt: on
 
     assert workflow.visit_desc() == 'Outer workflow. Inner workflow. Outer workflow (postdesc).'
+
+
+def test_cached_workflow(monkeypatch):
+    """Check cached workflows are independent copies of the first one built."""
+    monkeypatch.setenv(wfmod.WORKFLOW_CACHE_ENV, '1')
+    calls = []
+
+    @cached_workflow
+    def init_reorient_wf(name='ReorientWorkflow', orientation='RPI'):
+        calls.append(name)
+        return _reorient_wf(name=name)
+
+    clear_workflow_cache()
+    first = init_reorient_wf()
+    first.get_node('inputnode').inputs.in_file = 'sub-01_T1w.nii.gz'
+    second = init_reorient_wf(name='ReorientWorkflow')
+    init_reorient_wf(orientation='LAS')
+    init_reorient_wf(orientation=lambda: 'RPI')  # Unpicklable arguments are not cached
+    init_reorient_wf(orientation=lambda: 'RPI')
+    clear_workflow_cache()
+    init_reorient_wf()
+
+    assert calls == ['ReorientWorkflow'] * 5
+    assert second is not first
+    assert second.visit_desc() == first.visit_desc() == 'Inner workflow. '
+    assert sorted(second.list_node_names()) == sorted(first.list_node_names())
+    assert second.get_node('inputnode').inputs.in_file != 'sub-01_T1w.nii.gz'
+
+
+def test_cached_workflow_lru(monkeypatch):
+    """Check the least recently used workflow is evicted beyond the cache size."""
+    monkeypatch.setenv(wfmod.WORKFLOW_CACHE_ENV, '1')
+    monkeypatch.setattr(wfmod, 'WORKFLOW_CACHE_SIZE', 2)
+    calls = []
+
+    @cached_workflow
+    def init_reorient_wf(name='ReorientWorkflow'):
+        calls.append(name)
+        return _reorient_wf(name=name)
+
+    clear_workflow_cache()
+    init_reorient_wf(name='a')
+    init_reorient_wf(name='b')
+    init_reorient_wf(name='a')  # Hit, makes ``b`` the least recently used
+    init_reorient_wf(name='c')  # Evicts ``b``
+    init_reorient_wf(name='a')
+    init_reorient_wf(name='b')
+    clear_workflow_cache()
+
+    assert calls == ['a', 'b', 'c', 'b']
+
+
+def test_cached_workflow_disabled(monkeypatch):
+    """Check workflows are rebuilt on every call unless the cache is enabled."""
+    calls = []
+
+    @cached_workflow
+    def init_reorient_wf(name='ReorientWorkflow'):
+        calls.append(name)
+        return _reorient_wf(name=name)
+
+    clear_workflow_cache()
+    for value in (None, '', '0'):
+        if value is None:
+            monkeypatch.delenv(wfmod.WORKFLOW_CACHE_ENV, raising=False)
+        else:
+            monkeypatch.setenv(wfmod.WORKFLOW_CACHE_ENV, value)
+        first = init_reorient_wf()
+        second = init_reorient_wf()
+        assert second is not first
+
+    assert calls == ['ReorientWorkflow'] * 6
+    assert not wfmod._WORKFLOW_CACHE
@@ -26,8 +26,21 @@ Supercharging Nipype's workflow engine.
 Add special features to the Nipype's vanilla workflows
 """
 
+import os
+import pickle
+from collections import OrderedDict
+from functools import wraps
+from hashlib import sha256
+from inspect import signature
+
 from nipype.pipeline import engine as pe
 
+from .. import __version__
+
+WORKFLOW_CACHE_ENV = 'NIWORKFLOWS_WORKFLOW_CACHE'
+WORKFLOW_CACHE_SIZE = 32
+_WORKFLOW_CACHE = OrderedDict()
+
 
 class LiterateWorkflow(pe.Workflow):
     """Controls the setup and execution of a pipeline of processes."""
@@ -65,3 +78,81 @@ class LiterateWorkflow(pe.Workflow):
             desc += [self.__postdesc__]
 
         return ''.join(desc)
+
+
+def cached_workflow(func):
+    """
+    Decorator to cache the workflows built by an ``init_...wf`` function.
+
+    Caching is opt-in: it is only active while the environment variable named by
+    :data:`WORKFLOW_CACHE_ENV` is set to a non-empty value other than ``0``.
+    Otherwise, the function is called as usual every time.
+    Workflows are pickled and indexed by the function, its (bound) arguments and
+    the version of *NiWorkflows*.
+    Anything else the function resolves at build time (e.g., TemplateFlow paths)
+    is not part of the key, so only enable the cache when that environment is fixed.
+    At most :data:`WORKFLOW_CACHE_SIZE` workflows are kept, the least recently used
+    being evicted first.
+    Calling the function again with identical arguments returns an independent
+    copy of the cached workflow (unpickled) instead of building it anew.
+    Calls with arguments that cannot be pickled, or building workflows that cannot
+    be pickled, are not cached.
+
+    Examples
+    --------
+    >>> os.environ[WORKFLOW_CACHE_ENV] = '1'
+    >>> @cached_workflow
+    ... def init_test_wf(name='test_wf'):
+    ...     return LiterateWorkflow(name=name)
+    >>> wf = init_test_wf()
+    >>> wf_copy = init_test_wf(name='test_wf')
+    >>> wf_copy.name, wf_copy is wf
+    ('test_wf', False)
+    >>> init_test_wf(name='other_wf').name
+    'other_wf'
+    >>> del os.environ[WORKFLOW_CACHE_ENV]
+
+    """
+    sig = signature(func)
+
+    @wraps(func)
+    def _cached(*args, **kwargs):
+        if os.getenv(WORKFLOW_CACHE_ENV, '0') in ('', '0'):
+            return func(*args, **kwargs)
+
+        bound = sig.bind(*args, **kwargs)
+        bound.apply_defaults()
+        try:
+            key = sha256(
+                pickle.dumps(
+                    (
+                        func.__module__,
+                        func.__qualname__,
+                        __version__,
+                        tuple(bound.arguments.items()),
+                    )
+                )
+            ).hexdigest()
+        except (pickle.PicklingError, TypeError, AttributeError):
+            return func(*args, **kwargs)
+
+        if key in _WORKFLOW_CACHE:
+            _WORKFLOW_CACHE.move_to_end(key)
+            cached = _WORKFLOW_CACHE[key]
+            return func(*args, **kwargs) if cached is None else pickle.loads(cached)  # noqa: S301
+
+        workflow = func(*args, **kwargs)
+        try:
+            _WORKFLOW_CACHE[key] = pickle.dumps(workflow)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            _WORKFLOW_CACHE[key] = None
+        while len(_WORKFLOW_CACHE) > WORKFLOW_CACHE_SIZE:
+            _WORKFLOW_CACHE.popitem(last=False)
+        return workflow
+
+    return _cached
+
+
+def clear_workflow_cache():
+    """Drop all workflows cached by :func:`cached_workflow`."""
+    _WORKFLOW_CACHE.clear()
@@ -31,6 +31,7 @@ from templateflow.api import get as get_template
 
 from .. import data
 from ..engine.workflows import LiterateWorkflow as Workflow
+from ..engine.workflows import cached_workflow
 from ..interfaces.fixes import (
     FixHeaderApplyTransforms as ApplyTransforms,
 )
@@ -57,6 +58,7 @@ def init_bold_reference_wf(
     multiecho=False,
     name='bold_reference_wf',
     gen_report=False,
+    fused_preflight=False,
 ):
     """
     Build a workflow that generates reference BOLD images for a series.
@@ -104,6 +106,11 @@ def init_bold_reference_wf(
         Name of workflow (default: ``bold_reference_wf``)
     gen_report : :obj:`bool`
         Whether a mask report node should be appended in the end
+    fused_preflight : :obj:`bool`
+        Validate the header, detect nonsteady states and average the reference
+        volumes of the (first echo of the) BOLD series in a single
+        :class:`~niworkflows.interfaces.bold.BOLDPreflight` node, which reads
+        the series once (default: ``False``).
 
     Inputs
     ------
@@ -146,6 +153,7 @@ def init_bold_reference_wf(
     """
     from ..interfaces.bold import NonsteadyStatesDetector
     from ..interfaces.images import RobustAverage
+    from ..utils.connections import drop_first as _drop_first
     from ..utils.connections import pop_file as _pop
 
     workflow = Workflow(name=name)
@@ -188,7 +196,13 @@ methodology of *fMRIPrep*.
         iterfield=['in_file'],
     )
 
-    get_dummy = pe.Node(NonsteadyStatesDetector(), name='get_dummy')
+    if fused_preflight:
+        from ..interfaces.bold import BOLDPreflight
+
+        # The preflight node stands for both the detector and the averaging
+        get_dummy = pe.Node(BOLDPreflight(average=not sbref_files), name='preflight', mem_gb=1)
+    else:
+        get_dummy = pe.Node(NonsteadyStatesDetector(), name='get_dummy')
     gen_avg = pe.Node(RobustAverage(), name='gen_avg', mem_gb=1)
 
     enhance_and_skullstrip_bold_wf = init_enhance_and_skullstrip_bold_wf(
@@ -206,18 +220,12 @@ methodology of *fMRIPrep*.
 
     # fmt: off
     workflow.connect([
-        (inputnode, val_bold, [(('bold_file', listify), 'in_file')]),
         (inputnode, get_dummy, [(('bold_file', _pop), 'in_file')]),
         (inputnode, enhance_and_skullstrip_bold_wf, [('bold_mask', 'inputnode.pre_mask')]),
         (inputnode, calc_dummy_scans, [('dummy_scans', 'dummy_scans')]),
-        (gen_avg, enhance_and_skullstrip_bold_wf, [('out_file', 'inputnode.in_file')]),
         (get_dummy, calc_dummy_scans, [('n_dummy', 'algo_dummy_scans')]),
         (calc_dummy_scans, outputnode, [('skip_vols_num', 'skip_vols')]),
-        (gen_avg, outputnode, [('out_file', 'raw_ref_image')]),
         (get_dummy, outputnode, [('n_dummy', 'algo_dummy_scans')]),
-        (val_bold, outputnode, [(('out_file', _pop), 'bold_file'),
-                                ('out_file', 'all_bold_files'),
-                                (('out_report', _pop), 'validation_report')]),
         (enhance_and_skullstrip_bold_wf, outputnode, [
             ('outputnode.bias_corrected_file', 'ref_image'),
             ('outputnode.mask_file', 'bold_mask'),
@@ -237,13 +245,51 @@ methodology of *fMRIPrep*.
         ])
         # fmt: on
 
-    if not sbref_files:
+    if fused_preflight:
+        # Only the remaining echoes of ME-EPI need to be validated separately
+        merge_bold = pe.Node(niu.Merge(2), name='merge_bold', run_without_submitting=True)
+        # fmt: off
+        workflow.connect([
+            (get_dummy, merge_bold, [('out_file', 'in1')]),
+            (get_dummy, outputnode, [('out_file', 'bold_file'),
+                                     ('out_report', 'validation_report')]),
+            (merge_bold, outputnode, [('out', 'all_bold_files')]),
+        ])
+        # fmt: on
+        if multiecho:
+            # fmt: off
+            workflow.connect([
+                (inputnode, val_bold, [(('bold_file', _drop_first), 'in_file')]),
+                (val_bold, merge_bold, [('out_file', 'in2')]),
+            ])
+            # fmt: on
+    else:
         # fmt: off
         workflow.connect([
-            (val_bold, gen_avg, [(('out_file', _pop), 'in_file')]),  # pop first echo of ME-EPI
-            (get_dummy, gen_avg, [('t_mask', 't_mask')]),
+            (inputnode, val_bold, [(('bold_file', listify), 'in_file')]),
+            (val_bold, outputnode, [(('out_file', _pop), 'bold_file'),
+                                    ('out_file', 'all_bold_files'),
+                                    (('out_report', _pop), 'validation_report')]),
         ])
         # fmt: on
+
+    ref_source = get_dummy if fused_preflight and not sbref_files else gen_avg
+    ref_field = 'out_avg' if ref_source is get_dummy else 'out_file'
+    # fmt: off
+    workflow.connect([
+        (ref_source, enhance_and_skullstrip_bold_wf, [(ref_field, 'inputnode.in_file')]),
+        (ref_source, outputnode, [(ref_field, 'raw_ref_image')]),
+    ])
+    # fmt: on
+
+    if not sbref_files:
+        if not fused_preflight:
+            # fmt: off
+            workflow.connect([
+                (val_bold, gen_avg, [(('out_file', _pop), 'in_file')]),  # pop first echo of ME-EPI
+                (get_dummy, gen_avg, [('t_mask', 't_mask')]),
+            ])
+            # fmt: on
         return workflow
 
     from ..interfaces.nibabel import MergeSeries
@@ -279,6 +325,7 @@ by aligning and averaging {nsbrefs or ''} single-band references (SBRefs).
     return workflow
 
 
+@cached_workflow
 def init_enhance_and_skullstrip_bold_wf(
     brainmask_thresh=0.5,
     name='enhance_and_skullstrip_bold_wf',
@@ -515,6 +562,7 @@ def init_enhance_and_skullstrip_bold_wf(
     return workflow
 
 
+@cached_workflow
 def init_skullstrip_bold_wf(name='skullstrip_bold_wf'):
     """
     Apply skull-stripping to a BOLD image.
@@ -32,7 +32,6 @@ from pathlib import Path
 
 import nibabel as nb
 import numpy as np
-import templateflow as tf
 from bids.utils import listify
 from nipype import logging
 from nipype.interfaces.base import (
@@ -57,16 +56,23 @@ from .. import data
 from ..utils.bids import _find_nearest_path, _init_layout, relative_to_root
 from ..utils.images import set_consumables, unsafe_write_nifti_header_and_data
 from ..utils.misc import _copy_any, unlink
+from ..utils.spaces import _TemplateFlowQuery, _tf_catalog
 
 regz = re.compile(r'\.gz$')
 _pybids_spec = loads(data.load.readable('nipreps.json').read_text())
 BIDS_DERIV_ENTITIES = _pybids_spec['entities']
 BIDS_DERIV_PATTERNS = tuple(_pybids_spec['default_path_patterns'])
 
-STANDARD_SPACES = tf.api.templates()
 LOGGER = logging.getLogger('nipype.interface')
 
 
+def __getattr__(name):
+    # Listing TemplateFlow's templates is slow, defer it until first requested
+    if name == 'STANDARD_SPACES':
+        return _tf_catalog()['templates']
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
 def _none():
     return None
 
@@ -489,7 +495,7 @@ class PrepareDerivative(SimpleInterface):
     output_spec = _PrepareDerivativeOutputSpec
     _config_entities = frozenset({e['name'] for e in BIDS_DERIV_ENTITIES})
     _config_entities_dict = BIDS_DERIV_ENTITIES
-    _standard_spaces = STANDARD_SPACES
+    _standard_spaces = _TemplateFlowQuery('templates')
     _file_patterns = BIDS_DERIV_PATTERNS
     _default_dtypes = DEFAULT_DTYPES
 
@@ -992,7 +998,7 @@ space-MNI152NLin6Asym_desc-preproc_bold.json'
     _always_run = True
     _config_entities = frozenset({e['name'] for e in BIDS_DERIV_ENTITIES})
     _config_entities_dict = BIDS_DERIV_ENTITIES
-    _standard_spaces = STANDARD_SPACES
+    _standard_spaces = _TemplateFlowQuery('templates')
     _file_patterns = BIDS_DERIV_PATTERNS
     _default_dtypes = DEFAULT_DTYPES
 
@@ -1460,6 +1466,8 @@ def _get_tf_resolution(space: str, resolution: str) -> str:
     >>> _get_tf_resolution('MNI152NLin2009cAsym', '10')
     'Unknown'
     """
+    import templateflow as tf
+
     metadata = tf.api.get_metadata(space)
     resolutions = metadata.get('res', {})
     res_meta = None
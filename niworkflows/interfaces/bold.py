@@ -22,16 +22,23 @@
 #
 """Utilities for BOLD fMRI imaging."""
 
+import os
+from contextlib import nullcontext
+from textwrap import indent
+
 import nibabel as nb
 import numpy as np
 from nipype import logging
 from nipype.interfaces.base import (
     BaseInterfaceInputSpec,
     File,
+    OutputMultiObject,
     SimpleInterface,
     TraitedSpec,
+    isdefined,
     traits,
 )
+from nipype.utils.filemanip import fname_presuffix
 
 LOGGER = logging.getLogger('nipype.interface')
 
@@ -74,31 +81,263 @@ class NonsteadyStatesDetector(SimpleInterface):
         img = nb.load(self.inputs.in_file)
 
         ntotal = img.shape[-1] if img.dataobj.ndim == 4 else 1
-        t_mask = np.zeros((ntotal,), dtype=bool)
+        if ntotal == 1:
+            self._results['t_mask'] = [True]
+            self._results['n_dummy'] = 1
+            return runtime
+
+        n_dummy, t_mask = _detect_nonsteady_states(
+            img.get_fdata(dtype='float32')[..., : self.inputs.n_volumes],
+            ntotal,
+            nonnegative=self.inputs.nonnegative,
+            zero_dummy_masked=self.inputs.zero_dummy_masked,
+        )
+        self._results['n_dummy'] = n_dummy
+        self._results['t_mask'] = t_mask
+        return runtime
+
 
+class _BOLDPreflightInputSpec(_NonsteadyStatesDetectorInputSpec):
+    t_mask = traits.List(
+        traits.Bool,
+        desc='volumes to be averaged (disables the detection of nonsteady states)',
+    )
+    average = traits.Bool(
+        True, usedefault=True, desc='whether a reference should be averaged from the series'
+    )
+    mc_method = traits.Enum(
+        'AFNI',
+        'FSL',
+        None,
+        usedefault=True,
+        desc='Which software to use to perform motion correction',
+    )
+    num_threads = traits.Int(desc='number of threads')
+    two_pass = traits.Bool(
+        True, usedefault=True, desc='whether two passes of correction is necessary'
+    )
+
+
+class _BOLDPreflightOutputSpec(_NonsteadyStatesDetectorOutputSpec):
+    out_file = File(exists=True, desc='validated BOLD fMRI timeseries')
+    out_report = File(exists=True, desc='HTML segment containing warning')
+    out_avg = File(exists=True, desc='the averaged image')
+    out_volumes = File(exists=True, desc='the volumes selected that have been averaged')
+    out_drift = traits.List(
+        traits.Float, desc='the ratio to the grand mean or global signal drift'
+    )
+    out_hmc = OutputMultiObject(File(exists=True), desc='head-motion correction matrices')
+    out_hmc_volumes = OutputMultiObject(File(exists=True), desc='head-motion correction volumes')
+
+
+class BOLDPreflight(SimpleInterface):
+    """
+    Validate, detect nonsteady states and average a reference in a single read.
+
+    Produces the outputs of :class:`~niworkflows.interfaces.header.ValidateImage`,
+    :class:`NonsteadyStatesDetector` and :class:`~niworkflows.interfaces.images.RobustAverage`
+    (``out_avg`` corresponds to the latter's ``out_file``), chained together.
+    The series is decoded once, volume by volume: only the volumes required
+    to detect nonsteady states or to be averaged are kept in memory, and the
+    file is only read through to the end when its header must be fixed.
+
+    """
+
+    input_spec = _BOLDPreflightInputSpec
+    output_spec = _BOLDPreflightOutputSpec
+
+    def _run_interface(self, runtime):
+        from .header import _fix_xforms
+        from .images import _robust_average
+
+        img = nb.load(self.inputs.in_file)
+        out_report = os.path.join(runtime.cwd, 'report.html')
+
+        snippet = _fix_xforms(img)
+        with open(out_report, 'w') as fobj:
+            fobj.write(indent(snippet, '\t' * 3) if snippet else '')
+        self._results['out_report'] = out_report
+        self._results['out_file'] = (
+            self.inputs.in_file
+            if snippet is None
+            else fname_presuffix(self.inputs.in_file, suffix='_valid', newpath=runtime.cwd)
+        )
+        fname = fname_presuffix(self._results['out_file'], newpath=runtime.cwd)
+
+        ntotal = img.shape[3] if img.dataobj.ndim == 4 else 1
         if ntotal == 1:
+            if snippet is not None:
+                img.to_filename(self._results['out_file'])
             self._results['t_mask'] = [True]
             self._results['n_dummy'] = 1
+            if self.inputs.average:
+                self._results['out_avg'] = self._results['out_file']
+                self._results['out_volumes'] = self._results['out_file']
+                self._results['out_drift'] = [1.0]
+                if img.dataobj.ndim == 4:
+                    self._results['out_avg'] = fname_presuffix(fname, suffix='_squeezed')
+                    nb.squeeze_image(img).to_filename(self._results['out_avg'])
             return runtime
 
-        from nipype.algorithms.confounds import is_outlier
+        detect = not isdefined(self.inputs.t_mask)
+        retain = np.zeros(ntotal, dtype=bool)
+        if detect:
+            retain[: self.inputs.n_volumes] = True
+        elif self.inputs.average:
+            if len(self.inputs.t_mask) != ntotal:
+                raise ValueError(
+                    f'Image length ({ntotal} timepoints) unmatched by mask '
+                    f'({len(self.inputs.t_mask)})'
+                )
+            retain[:] = self.inputs.t_mask
 
-        data = img.get_fdata(dtype='float32')[..., : self.inputs.n_volumes]
-        # Data can come with outliers showing very high numbers - preemptively prune
-        data = np.clip(
-            data,
-            a_min=0.0 if self.inputs.nonnegative else np.percentile(data, 0.2),
-            a_max=np.percentile(data, 99.8),
+        data = _read_volumes(
+            self.inputs.in_file,
+            img,
+            retain,
+            out_file=None if snippet is None else self._results['out_file'],
         )
-        self._results['n_dummy'] = is_outlier(np.mean(data, axis=(0, 1, 2)))
 
-        start = 0
-        stop = self._results['n_dummy']
-        if stop < 2:
-            stop = min(ntotal, self.inputs.n_volumes)
-            start = max(0, stop - self.inputs.zero_dummy_masked)
+        t_mask = self.inputs.t_mask
+        if detect:
+            self._results['n_dummy'], t_mask = _detect_nonsteady_states(
+                data,
+                ntotal,
+                nonnegative=self.inputs.nonnegative,
+                zero_dummy_masked=self.inputs.zero_dummy_masked,
+            )
+            data = data[..., t_mask[: data.shape[-1]]]
+        self._results['t_mask'] = t_mask
 
-        t_mask[start:stop] = True
-        self._results['t_mask'] = t_mask.tolist()
+        if not self.inputs.average:
+            return runtime
 
+        if data.shape[-1] < 1:
+            raise ValueError('At least one volume should be selected for slicing')
+
+        header = img.header.copy()
+        header.extensions.clear()
+        self._results['out_avg'] = fname_presuffix(fname, suffix='_average')
+        self._results['out_volumes'] = fname_presuffix(fname, suffix='_sliced')
+        self._results.update(
+            _robust_average(
+                img.__class__(data, img.affine, header),
+                self._results['out_avg'],
+                self._results['out_volumes'],
+                nonnegative=self.inputs.nonnegative,
+                mc_method=self.inputs.mc_method,
+                two_pass=self.inputs.two_pass,
+                num_threads=self.inputs.num_threads
+                if isdefined(self.inputs.num_threads)
+                else None,
+            )
+        )
         return runtime
+
+
+def _read_volumes(in_file, img, retain, out_file=None):
+    """
+    Read the volumes of a 4D image in a single sequential pass.
+
+    Parameters
+    ----------
+    in_file : :obj:`os.pathlike`
+        Path to the image.
+    img : :obj:`~nibabel.spatialimages.SpatialImage`
+        The image, as loaded from ``in_file`` (its header may have been modified).
+    retain : :obj:`numpy.ndarray`
+        Boolean mask of the volumes to be returned.
+    out_file : :obj:`os.pathlike`, optional
+        If set, the image is written out (with ``img``'s header) while being read.
+
+    Returns
+    -------
+    data : :obj:`numpy.ndarray`
+        The retained volumes, scaled and cast to ``float32``.
+
+    """
+    from nibabel.openers import ImageOpener
+    from nibabel.volumeutils import apply_read_scaling
+
+    if type(img) not in (nb.Nifti1Image, nb.Nifti2Image) or not nb.is_proxy(img.dataobj):
+        if out_file is not None:
+            img.to_filename(out_file)
+        return img.get_fdata(dtype='float32')[..., retain]
+
+    header = img.header
+    vol_shape = img.shape[:3]
+    dtype = header.get_data_dtype()
+    vol_bytes = int(np.prod(vol_shape)) * dtype.itemsize
+    n_read = (
+        len(retain) if out_file is not None else int(np.flatnonzero(retain).max(initial=-1)) + 1
+    )
+
+    data = np.empty(vol_shape + (int(retain.sum()),), dtype='float32')
+    with (
+        ImageOpener(in_file) as fin,
+        ImageOpener(out_file, 'wb') if out_file is not None else nullcontext() as fout,
+    ):
+        prefix = fin.read(img.dataobj.offset)
+        if fout is not None:
+            # Keep extensions and padding as they were, with the (possibly fixed) header.
+            # Loaded headers have their offset and scaling reset, restore them from the proxy.
+            out_hdr = header.copy()
+            out_hdr.set_data_offset(img.dataobj.offset)
+            out_hdr.set_slope_inter(img.dataobj.slope, img.dataobj.inter)
+            fout.write(out_hdr.binaryblock + prefix[out_hdr.sizeof_hdr :])
+
+        index = 0
+        for keep in retain[:n_read]:
+            buffer = fin.read(vol_bytes)
+            if fout is not None:
+                fout.write(buffer)
+            if keep:
+                data[..., index] = apply_read_scaling(
+                    np.frombuffer(buffer, dtype=dtype).reshape(vol_shape, order='F'),
+                    img.dataobj.slope,
+                    img.dataobj.inter,
+                )
+                index += 1
+    return data
+
+
+def _detect_nonsteady_states(data, ntotal, nonnegative=True, zero_dummy_masked=20):
+    """
+    Detect initial non-steady states from the first volumes of a BOLD series.
+
+    Parameters
+    ----------
+    data : :obj:`numpy.ndarray`
+        The first volumes (up to ``n_volumes``) of the series, as a 4D array.
+    ntotal : :obj:`int`
+        The total number of volumes in the series.
+
+    The remaining arguments correspond to the inputs of :class:`NonsteadyStatesDetector`.
+
+    Returns
+    -------
+    n_dummy : :obj:`int`
+        Number of volumes identified as nonsteady states.
+    t_mask : :obj:`list` of :obj:`bool`
+        Volumes selected to calculate a reference (True).
+
+    """
+    from nipype.algorithms.confounds import is_outlier
+
+    # Data can come with outliers showing very high numbers - preemptively prune
+    data = np.clip(
+        data,
+        a_min=0.0 if nonnegative else np.percentile(data, 0.2),
+        a_max=np.percentile(data, 99.8),
+    )
+    n_dummy = is_outlier(np.mean(data, axis=(0, 1, 2)))
+
+    start = 0
+    stop = n_dummy
+    if stop < 2:
+        stop = data.shape[-1]
+        start = max(0, stop - zero_dummy_masked)
+
+    t_mask = np.zeros((ntotal,), dtype=bool)
+    t_mask[start:stop] = True
+    return n_dummy, t_mask.tolist()
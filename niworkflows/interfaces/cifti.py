@@ -30,19 +30,19 @@ from pathlib import Path
 
 import nibabel as nb
 import numpy as np
-import templateflow.api as tf
 from nibabel import cifti2 as ci
-from nilearn.image import resample_to_img
 from nipype.interfaces.base import (
     BaseInterfaceInputSpec,
     File,
     SimpleInterface,
     TraitedSpec,
+    isdefined,
     traits,
 )
 from nipype.utils.filemanip import split_filename
 
 from niworkflows.interfaces.nibabel import reorient_image
+from niworkflows.utils.images import iter_gifti_timeseries, load_gifti_timeseries
 
 CIFTI_STRUCT_WITH_LABELS = {  # CITFI structures with corresponding labels
     # SURFACES
@@ -90,6 +90,10 @@ class _GenerateCiftiInputSpec(BaseInterfaceInputSpec):
         mandatory=True,
         desc='list of surface BOLD GIFTI files (length 2 with order [L,R])',
     )
+    chunk_size = traits.Int(
+        desc='stream the time series to disk in chunks of this many volumes '
+        '(by default, the whole grayordinate matrix is held in memory)',
+    )
 
 
 class _GenerateCiftiOutputSpec(TraitedSpec):
@@ -114,6 +118,7 @@ class GenerateCifti(SimpleInterface):
             surface_labels,
             self.inputs.TR,
             metadata,
+            chunk_size=self.inputs.chunk_size if isdefined(self.inputs.chunk_size) else None,
         )
         metadata_file = Path('bold.dtseries.json').absolute()
         metadata_file.write_text(json.dumps(metadata, indent=2))
@@ -196,6 +201,7 @@ def _prepare_cifti(grayordinates: str) -> tuple[list, str, dict]:
 2mm average vertex spacing... 'SpatialReference': {'VolumeReference': ...
 
     """
+    import templateflow.api as tf
 
     grayord_key = {
         '91k': {'surface-den': '32k', 'tf-res': '02', 'grayords': '91,282', 'res-mm': '2mm'},
@@ -254,6 +260,7 @@ def _create_cifti_image(
     surface_labels: tuple[str, str],
     tr: float,
     metadata: dict | None = None,
+    chunk_size: int | None = None,
 ):
     """
     Generate CIFTI image in target space.
@@ -272,30 +279,42 @@ def _create_cifti_image(
         BOLD repetition time
     metadata
         Metadata to include in CIFTI header
+    chunk_size
+        If set, the grayordinate matrix is streamed to disk in blocks of
+        ``chunk_size`` volumes, instead of being built in memory at once.
+        Both the BOLD volume and the surface time series are read one block
+        at a time
 
     Returns
     -------
     out :
         BOLD data saved as CIFTI dtseries
     """
-    bold_img = nb.load(bold_file)
+    from nilearn.image import resample_to_img
+
+    bold_img = nb.load(bold_file, keep_file_open=True)
     label_img = nb.load(volume_label)
-    if label_img.shape != bold_img.shape[:3]:
+    resample = label_img.shape != bold_img.shape[:3]
+    if resample:
         warnings.warn('Resampling bold volume to match label dimensions', stacklevel=1)
-        bold_img = resample_to_img(bold_img, label_img)
 
-    # ensure images match HCP orientation (LAS)
-    bold_img = reorient_image(bold_img, target_ornt='LAS')
-    label_img = reorient_image(label_img, target_ornt='LAS')
+    def _bold_chunk(start, stop):
+        chunk_img = bold_img.slicer[..., start:stop]
+        if resample:
+            chunk_img = resample_to_img(chunk_img, label_img)
+        # ensure images match HCP orientation (LAS)
+        return reorient_image(chunk_img, target_ornt='LAS')
 
-    bold_data = bold_img.get_fdata(dtype='float32')
+    # Header information is derived from the first volume only
+    ref_img = _bold_chunk(0, 1)
     timepoints = bold_img.shape[3]
-    label_data = np.asanyarray(label_img.dataobj).astype('int16')
+    las_label_img = reorient_image(label_img, target_ornt='LAS')
+    label_data = np.asanyarray(las_label_img.dataobj).astype('int16')
 
     # Create brain models
     idx_offset = 0
     brainmodels = []
-    bm_ts = np.empty((timepoints, 0), dtype='float32')
+    sources = []  # (surface time series file or None, vertex or voxel indices) per brain model
 
     for structure, labels in CIFTI_STRUCT_WITH_LABELS.items():
         if labels is None:  # surface model
@@ -303,13 +322,12 @@ def _create_cifti_image(
             # use the corresponding annotation
             hemi = structure.split('_')[-1]
             # currently only supports L/R cortex
-            surf_ts = nb.load(bold_surfs[hemi == 'RIGHT'])
-            surf_verts = len(surf_ts.darrays[0].data)
-            labels = nb.load(surface_labels[hemi == 'RIGHT'])
+            # labels are small, do not let nibabel allocate its default 35MB parser buffer
+            labels = nb.GiftiImage.from_filename(
+                surface_labels[hemi == 'RIGHT'], buffer_size=2**20
+            )
+            surf_verts = len(labels.darrays[0].data)
             medial = np.nonzero(labels.darrays[0].data)[0]
-            # extract values across volumes
-            ts = np.array([tsarr.data[medial] for tsarr in surf_ts.darrays])
-
             vert_idx = ci.Cifti2VertexIndices(medial)
             bm = ci.Cifti2BrainModel(
                 index_offset=idx_offset,
@@ -320,11 +338,10 @@ def _create_cifti_image(
                 n_surface_vertices=surf_verts,
             )
             idx_offset += len(vert_idx)
-            bm_ts = np.column_stack((bm_ts, ts))
+            sources.append((bold_surfs[hemi == 'RIGHT'], medial))
         else:
             model_type = 'CIFTI_MODEL_TYPE_VOXELS'
             vox = []
-            ts = []
             for label in labels:
                 # nonzero returns indices in row-major (C) order
                 # NIfTI uses column-major (Fortran) order, so HCP generates indices in F order
@@ -332,7 +349,6 @@ def _create_cifti_image(
                 k, j, i = np.nonzero(label_data.T == label)
                 if k.size == 0:  # skip label if nothing matches
                     continue
-                ts.append(bold_data[i, j, k])
                 vox.append(np.stack([i, j, k]).T)
 
             vox_indices_ijk = ci.Cifti2VoxelIndicesIJK(np.concatenate(vox))
@@ -344,15 +360,46 @@ def _create_cifti_image(
                 voxel_indices_ijk=vox_indices_ijk,
             )
             idx_offset += len(vox_indices_ijk)
-            bm_ts = np.column_stack((bm_ts, np.concatenate(ts).T))
+            sources.append((None, np.concatenate(vox)))
         # add each brain structure to list
         brainmodels.append(bm)
 
+    surface_readers = {}  # brain model index -> (next volume, block iterator)
+
+    def _surface_chunk(index, surf_file, vertices, start, stop):
+        """Read the surface time series of volumes ``start`` to ``stop``."""
+        if not chunk_size:
+            return load_gifti_timeseries(surf_file, vertices=vertices)[start:stop]
+
+        # Blocks are requested in order, although the whole series may be read more than once
+        position, blocks = surface_readers.get(index, (None, None))
+        if position != start:
+            position = 0
+            blocks = iter_gifti_timeseries(surf_file, chunk_size, vertices=vertices)
+        while position < start:
+            position += len(next(blocks))
+        ts = next(blocks)
+        surface_readers[index] = (position + len(ts), blocks)
+        return ts
+
+    def _read_chunk(start, stop):
+        """Generate (column offset, time series) blocks for volumes ``start`` to ``stop``."""
+        bold_data = _bold_chunk(start, stop).get_fdata(dtype='float32')
+        column = 0
+        for index, (surf_file, indices) in enumerate(sources):
+            if surf_file is None:
+                i, j, k = indices.T
+                ts = bold_data[i, j, k].T
+            else:
+                ts = _surface_chunk(index, surf_file, indices, start, stop)
+            yield column, ts
+            column += ts.shape[1]
+
     # add volume information
     brainmodels.append(
         ci.Cifti2Volume(
-            bold_img.shape[:3],
-            ci.Cifti2TransformationMatrixVoxelIndicesIJKtoXYZ(-3, bold_img.affine),
+            ref_img.shape[:3],
+            ci.Cifti2TransformationMatrixVoxelIndicesIJKtoXYZ(-3, ref_img.affine),
         )
     )
 
@@ -381,10 +428,99 @@ def _create_cifti_image(
     matrix.append(geometry_map)
     matrix.metadata = ci.Cifti2MetaData(metadata)
     hdr = ci.Cifti2Header(matrix)
+
+    out_file = f'{split_filename(bold_file)[1]}.dtseries.nii'
+    if chunk_size:
+        _stream_dtseries(out_file, hdr, ref_img.get_data_dtype(), _read_chunk, chunk_size)
+        return Path.cwd() / out_file
+
+    bm_ts = np.empty((timepoints, idx_offset), dtype='float32')
+    for column, ts in _read_chunk(0, timepoints):
+        bm_ts[:, column : column + ts.shape[1]] = ts
+
     img = ci.Cifti2Image(dataobj=bm_ts, header=hdr)
-    img.set_data_dtype(bold_img.get_data_dtype())
+    img.set_data_dtype(ref_img.get_data_dtype())
     img.nifti_header.set_intent('NIFTI_INTENT_CONNECTIVITY_DENSE_SERIES')
 
-    out_file = f'{split_filename(bold_file)[1]}.dtseries.nii'
     ci.save(img, out_file)
     return Path.cwd() / out_file
+
+
+def _stream_dtseries(
+    out_file: str,
+    header: ci.Cifti2Header,
+    dtype: np.dtype,
+    read_chunk,
+    chunk_size: int,
+):
+    """
+    Write a dense time series CIFTI-2 file one block of volumes at a time.
+
+    The NIfTI-2 header and CIFTI-2 extension are written first, and then the data
+    block is filled through a memory map, so that only ``chunk_size`` volumes are held
+    in memory at any time.
+    Integer output types require scaling factors computed over the full time series,
+    and therefore the data are read twice in that case.
+
+    Parameters
+    ----------
+    out_file
+        Path of the output ``.dtseries.nii`` file
+    header
+        CIFTI-2 header of the output image
+    dtype
+        On-disk data type
+    read_chunk
+        Callable taking a ``(start, stop)`` range of volumes and generating
+        ``(column offset, time series block)`` pairs that cover all grayordinates
+    chunk_size
+        Number of volumes read and written at a time
+
+    """
+    from nibabel.arraywriters import make_array_writer
+    from nibabel.cifti2.parse_cifti2 import Cifti2Extension
+
+    shape = header.matrix.get_data_shape()
+    timepoints = shape[0]
+    chunks = [
+        (start, min(start + chunk_size, timepoints)) for start in range(0, timepoints, chunk_size)
+    ]
+
+    nifti_hdr = nb.Nifti2Header()
+    nifti_hdr.set_data_shape((1, 1, 1, 1) + shape)
+    nifti_hdr.set_data_dtype(dtype)
+    nifti_hdr.set_intent('NIFTI_INTENT_CONNECTIVITY_DENSE_SERIES')
+    # qform is not set, reset pixdim values so NIfTI-2 does not complain
+    nifti_hdr['pixdim'][:4] = 1
+    nifti_hdr.extensions.append(Cifti2Extension.from_bytes(header.to_xml()))
+    out_dtype = nifti_hdr.get_data_dtype()
+
+    scaling = None
+    if out_dtype.kind in 'iu':
+        vmin, vmax = np.inf, -np.inf
+        for start, stop in chunks:
+            for _, ts in read_chunk(start, stop):
+                finite = ts[np.isfinite(ts)]
+                if finite.size:
+                    vmin, vmax = min(vmin, finite.min()), max(vmax, finite.max())
+        if vmin > vmax:  # no finite values
+            vmin = vmax = 0.0
+        # Same scaling nibabel would calculate if the whole matrix was in memory
+        writer = make_array_writer(np.array([vmin, vmax], dtype='float32'), out_dtype)
+        scaling = (writer.slope, writer.inter, np.iinfo(out_dtype))
+        nifti_hdr.set_slope_inter(*scaling[:2])
+
+    with open(out_file, 'wb') as fobj:
+        nifti_hdr.write_to(fobj)
+        offset = int(nifti_hdr['vox_offset'])
+        fobj.truncate(offset + out_dtype.itemsize * int(np.prod(shape)))
+
+    data = np.memmap(out_file, dtype=out_dtype, mode='r+', offset=offset, shape=shape, order='F')
+    for start, stop in chunks:
+        for column, ts in read_chunk(start, stop):
+            if scaling is not None:
+                slope, inter, info = scaling
+                ts = np.clip(np.rint((np.nan_to_num(ts) - inter) / slope), info.min, info.max)
+            data[start:stop, column : column + ts.shape[1]] = ts
+    data.flush()
+    del data
@@ -29,9 +29,7 @@ from collections import OrderedDict, deque
 from functools import reduce
 
 import nibabel as nb
-import nitransforms as nt
 import numpy as np
-import pandas as pd
 from nipype.interfaces.base import (
     BaseInterfaceInputSpec,
     File,
@@ -60,6 +58,8 @@ class FSLMotionParams(SimpleInterface):
     output_spec = _FSLMotionParamsOutputSpec
 
     def _run_interface(self, runtime):
+        import nitransforms as nt
+        import pandas as pd
         from scipy import ndimage as ndi
         from scipy.spatial import transform as sst
 
@@ -117,6 +117,9 @@ class FSLRMSDeviation(SimpleInterface):
     output_spec = _FSLRMSDeviationOutputSpec
 
     def _run_interface(self, runtime):
+        import nitransforms as nt
+        import pandas as pd
+
         self._results['out_file'] = fname_presuffix(
             self.inputs.boldref_file, suffix='_motion.tsv', newpath=runtime.cwd
         )
@@ -169,6 +172,8 @@ class FramewiseDisplacement(SimpleInterface):
     output_spec = _FramewiseDisplacementOutputSpec
 
     def _run_interface(self, runtime):
+        import pandas as pd
+
         self._results['out_file'] = fname_presuffix(
             self.inputs.in_file, suffix='_fd.tsv', newpath=runtime.cwd
         )
@@ -262,6 +267,8 @@ class ExpandModel(SimpleInterface):
     output_spec = _ExpandModelOutputSpec
 
     def _run_interface(self, runtime):
+        import pandas as pd
+
         if isdefined(self.inputs.output_file):
             out_file = self.inputs.output_file
         else:
@@ -339,6 +346,8 @@ class SpikeRegressors(SimpleInterface):
     output_spec = _SpikeRegressorsOutputSpec
 
     def _run_interface(self, runtime):
+        import pandas as pd
+
         if isdefined(self.inputs.output_file):
             out_file = self.inputs.output_file
         else:
@@ -425,6 +434,8 @@ def spike_regressors(
         <https://doi.org/10.1016/j.neuroimage.2013.08.048>`__.
 
     """
+    import pandas as pd
+
     mask = {}
     indices = range(data.shape[0])
     lags = lags or [0]
@@ -494,6 +505,8 @@ def temporal_derivatives(order, variables, data):
         specified derivative terms.
 
     """
+    import pandas as pd
+
     variables_deriv = OrderedDict()
     data_deriv = OrderedDict()
     if 0 in order:
@@ -537,6 +550,8 @@ def exponential_terms(order, variables, data):
         specified exponential terms.
 
     """
+    import pandas as pd
+
     variables_exp = OrderedDict()
     data_exp = OrderedDict()
     if 1 in order:
@@ -762,6 +777,8 @@ def parse_formula(model_formula, parent_data, unscramble=False):
         All values in the complete model.
 
     """
+    import pandas as pd
+
     variables = {}
     data = {}
     expr_delimiter = 0
@@ -208,110 +208,21 @@ class ValidateImage(SimpleInterface):
         img = nb.load(self.inputs.in_file)
         out_report = os.path.join(runtime.cwd, 'report.html')
 
-        # Retrieve xform codes
-        sform_code = int(img.header._structarr['sform_code'])
-        qform_code = int(img.header._structarr['qform_code'])
-
-        # Check qform is valid
-        valid_qform = False
-        try:
-            qform = img.get_qform()
-            valid_qform = True
-        except ValueError:
-            pass
-
-        sform = img.get_sform()
-        if np.linalg.det(sform) == 0:
-            valid_sform = False
-        else:
-            RZS = sform[:3, :3]
-            zooms = np.sqrt(np.sum(RZS * RZS, axis=0))
-            valid_sform = np.allclose(zooms, img.header.get_zooms()[:3])
-
-        # Matching affines
-        matching_affines = valid_qform and np.allclose(qform, sform)
-
-        # Both match, qform valid (implicit with match), codes okay -> do nothing, empty report
-        if matching_affines and qform_code > 0 and sform_code > 0:
+        snippet = _fix_xforms(img)
+        # Header is valid -> do nothing, empty report
+        if snippet is None:
             self._results['out_file'] = self.inputs.in_file
             open(out_report, 'w').close()
             self._results['out_report'] = out_report
             return runtime
 
-        # A new file will be written
-        out_fname = fname_presuffix(self.inputs.in_file, suffix='_valid', newpath=runtime.cwd)
-        self._results['out_file'] = out_fname
-
-        # Row 2:
-        if valid_qform and qform_code > 0 and (sform_code == 0 or not valid_sform):
-            img.set_sform(qform, qform_code)
-            warning_txt = 'Note on orientation: sform matrix set'
-            description = """\
-<p class="elem-desc">The sform has been copied from qform.</p>
-"""
-        # Rows 3-4:
-        # Note: if qform is not valid, matching_affines is False
-        elif (valid_sform and sform_code > 0) and (not matching_affines or qform_code == 0):
-            img.set_qform(sform, sform_code)
-            new_qform = img.get_qform()
-            if valid_qform:
-                # False alarm - the difference is due to precision loss of qform
-                if np.allclose(new_qform, qform) and qform_code > 0:
-                    self._results['out_file'] = self.inputs.in_file
-                    open(out_report, 'w').close()
-                    self._results['out_report'] = out_report
-                    return runtime
-                # Replacing an existing, valid qform. Report magnitude of change.
-                diff = np.linalg.inv(qform) @ new_qform
-                trans, rot, _, _ = transforms3d.affines.decompose44(diff)
-                angle = transforms3d.axangles.mat2axangle(rot)[1]
-                xyz_unit = img.header.get_xyzt_units()[0]
-                if xyz_unit == 'unknown':
-                    xyz_unit = 'mm'
-
-                total_trans = np.sqrt(np.sum(trans * trans))  # Add angle and total_trans to report
-                warning_txt = 'Note on orientation: qform matrix overwritten'
-                description = f"""\
-    <p class="elem-desc">
-    The qform has been copied from sform.
-    The difference in angle is {angle:.02g} radians.
-    The difference in translation is {total_trans:.02g}{xyz_unit}.
-    </p>
-    """
-            elif qform_code > 0:
-                # qform code indicates the qform is supposed to be valid. Use more stridency.
-                warning_txt = 'WARNING - Invalid qform information'
-                description = """\
-<p class="elem-desc">
-    The qform matrix found in the file header is invalid.
-    The qform has been copied from sform.
-    Checking the original qform information from the data produced
-    by the scanner is advised.
-</p>
-"""
-            else:  # qform_code == 0
-                # qform is not expected to be valids. Simple note.
-                warning_txt = 'Note on orientation: qform matrix overwritten'
-                description = '<p class="elem-desc">The qform has been copied from sform.</p>'
-        # Rows 5-6:
-        else:
-            affine = img.header.get_base_affine()
-            img.set_sform(affine, nb.nifti1.xform_codes['scanner'])
-            img.set_qform(affine, nb.nifti1.xform_codes['scanner'])
-            warning_txt = 'WARNING - Missing orientation information'
-            description = """\
-<p class="elem-desc">
-    FMRIPREP could not retrieve orientation information from the image header.
-    The qform and sform matrices have been set to a default, LAS-oriented affine.
-    Analyses of this dataset MAY BE INVALID.
-</p>
-"""
-        snippet = f'<h3 class="elem-title">{warning_txt}</h3>\n{description}\n'
         # Store new file and report
+        out_fname = fname_presuffix(self.inputs.in_file, suffix='_valid', newpath=runtime.cwd)
         img.to_filename(out_fname)
         with open(out_report, 'w') as fobj:
             fobj.write(indent(snippet, '\t' * 3))
 
+        self._results['out_file'] = out_fname
         self._results['out_report'] = out_report
         return runtime
 
@@ -528,3 +439,107 @@ class SanitizeImage(SimpleInterface):
 
         self._results['out_report'] = out_report
         return runtime
+
+
+def _fix_xforms(img):
+    """
+    Check the x-forms of a NIfTI image, and fix its header in place if necessary.
+
+    See :class:`ValidateImage` for the rules applied.
+
+    Returns
+    -------
+    snippet : :obj:`str` or ``None``
+        An HTML snippet describing the changes made to the header, or ``None``
+        if the header is valid and was left unchanged.
+
+    """
+    # Retrieve xform codes
+    sform_code = int(img.header._structarr['sform_code'])
+    qform_code = int(img.header._structarr['qform_code'])
+
+    # Check qform is valid
+    valid_qform = False
+    try:
+        qform = img.get_qform()
+        valid_qform = True
+    except ValueError:
+        pass
+
+    sform = img.get_sform()
+    if np.linalg.det(sform) == 0:
+        valid_sform = False
+    else:
+        RZS = sform[:3, :3]
+        zooms = np.sqrt(np.sum(RZS * RZS, axis=0))
+        valid_sform = np.allclose(zooms, img.header.get_zooms()[:3])
+
+    # Matching affines
+    matching_affines = valid_qform and np.allclose(qform, sform)
+
+    # Both match, qform valid (implicit with match), codes okay -> do nothing, empty report
+    if matching_affines and qform_code > 0 and sform_code > 0:
+        return None
+
+    # Row 2:
+    if valid_qform and qform_code > 0 and (sform_code == 0 or not valid_sform):
+        img.set_sform(qform, qform_code)
+        warning_txt = 'Note on orientation: sform matrix set'
+        description = """\
+<p class="elem-desc">The sform has been copied from qform.</p>
+"""
+    # Rows 3-4:
+    # Note: if qform is not valid, matching_affines is False
+    elif (valid_sform and sform_code > 0) and (not matching_affines or qform_code == 0):
+        img.set_qform(sform, sform_code)
+        new_qform = img.get_qform()
+        if valid_qform:
+            # False alarm - the difference is due to precision loss of qform
+            if np.allclose(new_qform, qform) and qform_code > 0:
+                return None
+            # Replacing an existing, valid qform. Report magnitude of change.
+            diff = np.linalg.inv(qform) @ new_qform
+            trans, rot, _, _ = transforms3d.affines.decompose44(diff)
+            angle = transforms3d.axangles.mat2axangle(rot)[1]
+            xyz_unit = img.header.get_xyzt_units()[0]
+            if xyz_unit == 'unknown':
+                xyz_unit = 'mm'
+
+            total_trans = np.sqrt(np.sum(trans * trans))  # Add angle and total_trans to report
+            warning_txt = 'Note on orientation: qform matrix overwritten'
+            description = f"""\
+    <p class="elem-desc">
+    The qform has been copied from sform.
+    The difference in angle is {angle:.02g} radians.
+    The difference in translation is {total_trans:.02g}{xyz_unit}.
+    </p>
+    """
+        elif qform_code > 0:
+            # qform code indicates the qform is supposed to be valid. Use more stridency.
+            warning_txt = 'WARNING - Invalid qform information'
+            description = """\
+<p class="elem-desc">
+    The qform matrix found in the file header is invalid.
+    The qform has been copied from sform.
+    Checking the original qform information from the data produced
+    by the scanner is advised.
+</p>
+"""
+        else:  # qform_code == 0
+            # qform is not expected to be valids. Simple note.
+            warning_txt = 'Note on orientation: qform matrix overwritten'
+            description = '<p class="elem-desc">The qform has been copied from sform.</p>'
+    # Rows 5-6:
+    else:
+        affine = img.header.get_base_affine()
+        img.set_sform(affine, nb.nifti1.xform_codes['scanner'])
+        img.set_qform(affine, nb.nifti1.xform_codes['scanner'])
+        warning_txt = 'WARNING - Missing orientation information'
+        description = """\
+<p class="elem-desc">
+    FMRIPREP could not retrieve orientation information from the image header.
+    The qform and sform matrices have been set to a default, LAS-oriented affine.
+    Analyses of this dataset MAY BE INVALID.
+</p>
+"""
+    return f'<h3 class="elem-title">{warning_txt}</h3>\n{description}\n'
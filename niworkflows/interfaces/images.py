@@ -287,74 +287,115 @@ class RobustAverage(SimpleInterface):
         sliced = nb.concat_images(
             i for i, t in zip(nb.four_to_three(img), t_mask, strict=False) if t
         )
-
-        data = sliced.get_fdata(dtype='float32')
-        # Data can come with outliers showing very high numbers - preemptively prune
-        data = np.clip(
-            data,
-            a_min=0.0 if self.inputs.nonnegative else np.percentile(data, 0.2),
-            a_max=np.percentile(data, 99.8),
+        self._results.update(
+            _robust_average(
+                sliced,
+                self._results['out_file'],
+                self._results['out_volumes'],
+                nonnegative=self.inputs.nonnegative,
+                mc_method=self.inputs.mc_method,
+                two_pass=self.inputs.two_pass,
+                num_threads=self.inputs.num_threads
+                if isdefined(self.inputs.num_threads)
+                else None,
+            )
         )
+        return runtime
 
-        gs_drift = np.mean(data, axis=(0, 1, 2))
-        gs_drift /= gs_drift.max()
-        self._results['out_drift'] = [float(i) for i in gs_drift]
 
-        data /= gs_drift
-        data = np.clip(
-            data,
-            a_min=0.0 if self.inputs.nonnegative else data.min(),
-            a_max=data.max(),
-        )
-        sliced.__class__(data, sliced.affine, sliced.header).to_filename(
-            self._results['out_volumes']
-        )
+def _robust_average(
+    sliced,
+    out_file,
+    out_volumes,
+    nonnegative=True,
+    mc_method='AFNI',
+    two_pass=True,
+    num_threads=None,
+):
+    """
+    Average the volumes of a 4D image after global drift and head-motion correction.
 
-        if n_volumes == 1:
-            nb.squeeze_image(sliced).to_filename(self._results['out_file'])
-            self._results['out_drift'] = [1.0]
-            return runtime
+    Parameters
+    ----------
+    sliced : :obj:`~nibabel.spatialimages.SpatialImage`
+        4D image containing only the volumes to be averaged.
+    out_file : :obj:`os.pathlike`
+        Path where the average will be written.
+    out_volumes : :obj:`os.pathlike`
+        Path where the drift-corrected volumes will be written.
 
-        if self.inputs.mc_method == 'AFNI':
-            from nipype.interfaces.afni import Volreg
+    The remaining arguments correspond to the inputs of :class:`RobustAverage`.
 
-            volreg = Volreg(
-                in_file=self._results['out_volumes'],
-                interp='Fourier',
-                args='-twopass' if self.inputs.two_pass else '',
-                zpad=4,
-                outputtype='NIFTI_GZ',
-            )
-            if isdefined(self.inputs.num_threads):
-                volreg.inputs.num_threads = self.inputs.num_threads
+    Returns
+    -------
+    results : :obj:`dict`
+        The outputs of :class:`RobustAverage` (except for ``out_file`` and ``out_volumes``).
 
-            res = volreg.run()
-            self._results['out_hmc'] = res.outputs.oned_matrix_save
+    """
+    results = {}
+    data = sliced.get_fdata(dtype='float32')
+    # Data can come with outliers showing very high numbers - preemptively prune
+    data = np.clip(
+        data,
+        a_min=0.0 if nonnegative else np.percentile(data, 0.2),
+        a_max=np.percentile(data, 99.8),
+    )
 
-        elif self.inputs.mc_method == 'FSL':
-            from nipype.interfaces.fsl import MCFLIRT
+    gs_drift = np.mean(data, axis=(0, 1, 2))
+    gs_drift /= gs_drift.max()
+    results['out_drift'] = [float(i) for i in gs_drift]
 
-            res = MCFLIRT(
-                in_file=self._results['out_volumes'],
-                ref_vol=0,
-                interpolation='sinc',
-            ).run()
-            self._results['out_hmc'] = res.outputs.mat_file
-
-        if self.inputs.mc_method:
-            self._results['out_hmc_volumes'] = res.outputs.out_file
-            data = nb.load(res.outputs.out_file).get_fdata(dtype='float32')
-
-        data = np.clip(
-            data,
-            a_min=0.0 if self.inputs.nonnegative else data.min(),
-            a_max=data.max(),
+    data /= gs_drift
+    data = np.clip(
+        data,
+        a_min=0.0 if nonnegative else data.min(),
+        a_max=data.max(),
+    )
+    sliced.__class__(data, sliced.affine, sliced.header).to_filename(out_volumes)
+
+    if data.shape[-1] == 1:
+        nb.squeeze_image(sliced).to_filename(out_file)
+        results['out_drift'] = [1.0]
+        return results
+
+    if mc_method == 'AFNI':
+        from nipype.interfaces.afni import Volreg
+
+        volreg = Volreg(
+            in_file=out_volumes,
+            interp='Fourier',
+            args='-twopass' if two_pass else '',
+            zpad=4,
+            outputtype='NIFTI_GZ',
         )
+        if num_threads is not None:
+            volreg.inputs.num_threads = num_threads
+
+        res = volreg.run()
+        results['out_hmc'] = res.outputs.oned_matrix_save
+
+    elif mc_method == 'FSL':
+        from nipype.interfaces.fsl import MCFLIRT
+
+        res = MCFLIRT(
+            in_file=out_volumes,
+            ref_vol=0,
+            interpolation='sinc',
+        ).run()
+        results['out_hmc'] = res.outputs.mat_file
+
+    if mc_method:
+        results['out_hmc_volumes'] = res.outputs.out_file
+        data = nb.load(res.outputs.out_file).get_fdata(dtype='float32')
+
+    data = np.clip(
+        data,
+        a_min=0.0 if nonnegative else data.min(),
+        a_max=data.max(),
+    )
 
-        sliced.__class__(np.median(data, axis=3), sliced.affine, sliced.header).to_filename(
-            self._results['out_file']
-        )
-        return runtime
+    sliced.__class__(np.median(data, axis=3), sliced.affine, sliced.header).to_filename(out_file)
+    return results
 
 
 CONFORMATION_TEMPLATE = """\t\t<h3 class="elem-title">Anatomical Conformation</h3>
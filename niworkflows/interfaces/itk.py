@@ -27,7 +27,6 @@ from mimetypes import guess_type
 from tempfile import TemporaryDirectory
 
 import nibabel as nb
-import nitransforms as nt
 import numpy as np
 from nipype import logging
 from nipype.interfaces.base import (
@@ -67,6 +66,8 @@ class MCFLIRT2ITK(SimpleInterface):
     output_spec = _MCFLIRT2ITKOutputSpec
 
     def _run_interface(self, runtime):
+        import nitransforms as nt
+
         if isdefined(self.inputs.num_threads):
             LOGGER.warning('Multithreading is deprecated. Remove the num_threads input.')
 
@@ -98,20 +99,45 @@ class _MultiApplyTransformsInputSpec(_FixTraitApplyTransformsInputSpec):
         True, usedefault=True, desc='write a log of command lines that were applied'
     )
     copy_dtype = traits.Bool(False, usedefault=True, desc='copy dtype from inputs to outputs')
+    engine = traits.Enum(
+        'ants',
+        'python',
+        usedefault=True,
+        desc='run antsApplyTransforms on each volume, or resample all volumes in-process',
+    )
+    merge_outputs = traits.Bool(
+        False,
+        usedefault=True,
+        desc='write one 4D image (out_file) rather than one file per volume (out_files)',
+    )
 
 
 class _MultiApplyTransformsOutputSpec(TraitedSpec):
     out_files = OutputMultiObject(File(), desc='the output ITKTransform file')
+    out_file = File(desc='the resampled volumes, concatenated (if merge_outputs is set)')
     log_cmdline = File(desc='a list of command lines used to apply transforms')
 
 
 class MultiApplyTransforms(SimpleInterface):
-    """Apply the corresponding list of input transforms."""
+    """
+    Apply the corresponding list of input transforms.
+
+    With ``engine='python'``, displacement fields and transforms are loaded only once,
+    the affines of each volume are composed in a vectorized fashion, and volumes
+    are resampled with :func:`scipy.ndimage.map_coordinates` in parallel threads.
+    This engine supports ITK's affine transforms (also, files with one transform
+    per volume) and displacement fields (which cannot be inverted), with
+    ``NearestNeighbor``, ``Linear`` and ``BSpline`` interpolations.
+
+    """
 
     input_spec = _MultiApplyTransformsInputSpec
     output_spec = _MultiApplyTransformsOutputSpec
 
     def _run_interface(self, runtime):
+        if self.inputs.engine == 'python':
+            return self._run_python(runtime)
+
         # Get all inputs from the ApplyTransforms object
         ifargs = self.inputs.get()
 
@@ -167,9 +193,217 @@ class MultiApplyTransforms(SimpleInterface):
             self._results['log_cmdline'] = os.path.join(runtime.cwd, 'command.txt')
             with open(self._results['log_cmdline'], 'w') as cmdfile:
                 print('\n-------\n'.join([el[1] for el in out_files]), file=cmdfile)
+
+        if self.inputs.merge_outputs:
+            self._results['out_file'] = fname_presuffix(
+                self.inputs.input_image[0], suffix='_xform', newpath=runtime.cwd, use_ext=True
+            )
+            nb.concat_images(self._results['out_files']).to_filename(self._results['out_file'])
+            self._results.pop('out_files')
+        return runtime
+
+    def _run_python(self, runtime):
+        from concurrent.futures import ThreadPoolExecutor
+
+        if isdefined(self.inputs.dimension) and self.inputs.dimension != 3:
+            raise NotImplementedError('The python engine only resamples 3D volumes')
+
+        order = _interpolation_order(
+            self.inputs.interpolation,
+            self.inputs.interpolation_parameters
+            if isdefined(self.inputs.interpolation_parameters)
+            else None,
+        )
+        in_files = self.inputs.input_image
+        reference = nb.load(self.inputs.reference_image)
+        invert = (
+            self.inputs.invert_transform_flags
+            if isdefined(self.inputs.invert_transform_flags)
+            else [False] * len(self.inputs.transforms)
+        )
+        stages = [
+            _load_stage(xfm, len(in_files), inv)
+            for xfm, inv in zip(self.inputs.transforms, invert, strict=True)
+        ]
+        # Finally, map from RAS+ coordinates into the voxels of each moving volume
+        stages.insert(
+            0,
+            (
+                'affine',
+                np.stack([np.linalg.inv(nb.load(fname).affine) for fname in in_files]),
+            ),
+        )
+        resample = _Resampler(reference, stages)
+
+        dtype = 'float32' if self.inputs.float else 'float64'
+        num_threads = self.inputs.num_threads if self.inputs.num_threads > 0 else None
+
+        def _resample_volume(index):
+            img = nb.load(in_files[index])
+            data = resample(
+                img.get_fdata(dtype='float32'),
+                index,
+                order=order,
+                cval=self.inputs.default_value,
+            )
+            out_dtype = img.get_data_dtype() if self.inputs.copy_dtype else dtype
+            if self.inputs.merge_outputs:
+                return data, out_dtype
+
+            out_file = fname_presuffix(
+                in_files[index], suffix=f'_xform-{index:05d}', newpath=runtime.cwd, use_ext=True
+            )
+            hdr = reference.header.copy()
+            hdr.set_data_dtype(out_dtype)
+            reference.__class__(data, reference.affine, hdr).to_filename(out_file)
+            return out_file, out_dtype
+
+        with ThreadPoolExecutor(max_workers=num_threads) as pool:
+            results = list(pool.map(_resample_volume, range(len(in_files))))
+
+        if self.inputs.merge_outputs:
+            hdr = reference.header.copy()
+            hdr.set_data_dtype(results[0][1])
+            self._results['out_file'] = fname_presuffix(
+                in_files[0], suffix='_xform', newpath=runtime.cwd, use_ext=True
+            )
+            reference.__class__(
+                np.stack([data for data, _ in results], axis=-1), reference.affine, hdr
+            ).to_filename(self._results['out_file'])
+        else:
+            self._results['out_files'] = [out_file for out_file, _ in results]
+
+        if self.inputs.save_cmd:
+            self._results['log_cmdline'] = os.path.join(runtime.cwd, 'command.txt')
+            with open(self._results['log_cmdline'], 'w') as cmdfile:
+                print(
+                    f'Resampled {len(in_files)} volumes in-process onto '
+                    f'{self.inputs.reference_image} (interpolation order {order}), '
+                    f'with transforms: {", ".join(self.inputs.transforms)} '
+                    f'(inverted: {invert}).',
+                    file=cmdfile,
+                )
         return runtime
 
 
+class _Resampler:
+    """
+    Resample volumes on a reference grid through a chain of transforms.
+
+    ``stages`` are given in ANTs order (the last stage is applied first to the
+    coordinates of the reference grid), and are either ``('affine', matrices)`` with
+    one (or one per volume) 4x4 matrix, or ``('field', (displacements, affine))``
+    with a dense field of RAS+ displacements.
+    Consecutive affines are composed, and the leading stages that are shared
+    by all volumes are applied only once.
+
+    """
+
+    def __init__(self, reference, stages):
+        # Transforms are applied in reverse order
+        stages = list(reversed(stages))
+        merged = []
+        for kind, value in stages:
+            if kind == 'affine' and merged and merged[-1][0] == 'affine':
+                # Broadcasting composes one or several matrices per volume
+                value = value @ merged.pop()[1]
+            merged.append((kind, value))
+
+        ijk = np.indices(reference.shape[:3], dtype='float32').reshape(3, -1)
+        self.shape = reference.shape[:3]
+        self.points = reference.affine[:3, :3] @ ijk + reference.affine[:3, 3:]
+        while merged and (merged[0][0] == 'field' or len(merged[0][1]) == 1):
+            self.points = _apply_stage(merged.pop(0), self.points, 0)
+        self.stages = merged
+
+    def __call__(self, data, index, order=1, cval=0.0):
+        from scipy import ndimage as ndi
+
+        points = self.points
+        for stage in self.stages:
+            points = _apply_stage(stage, points, index)
+        return ndi.map_coordinates(
+            data, points, order=order, mode='constant', cval=cval, output='float32'
+        ).reshape(self.shape)
+
+
+def _apply_stage(stage, points, index):
+    """Map a ``(3, N)`` array of coordinates through a stage of a :class:`_Resampler`."""
+    from scipy import ndimage as ndi
+
+    kind, value = stage
+    if kind == 'affine':
+        matrix = value[index if len(value) > 1 else 0]
+        return matrix[:3, :3] @ points + matrix[:3, 3:]
+
+    field, affine = value
+    ijk = np.linalg.inv(affine)[:3, :3] @ points + np.linalg.inv(affine)[:3, 3:]
+    # Points outside the field are not displaced, like ITK does
+    return points + np.stack(
+        [ndi.map_coordinates(field[..., i], ijk, order=1, mode='constant') for i in range(3)]
+    )
+
+
+def _load_stage(in_xfm, num_files, invert=False):
+    """Load a transform of the chain as a stage of a :class:`_Resampler`."""
+    import nitransforms as nt
+
+    if in_xfm == 'identity':
+        return ('affine', np.eye(4)[np.newaxis])
+
+    if in_xfm.endswith(('.nii', '.nii.gz')):
+        if invert:
+            raise NotImplementedError(
+                f'Displacement fields cannot be inverted by the python engine <{in_xfm}>.'
+            )
+        field = nt.io.itk.ITKDisplacementsField.from_image(nb.load(in_xfm))
+        return ('field', (field.get_fdata(dtype='float32'), field.affine))
+
+    if in_xfm.endswith('.mat'):
+        matrices = nt.io.itk.ITKLinearTransform.from_filename(in_xfm).to_ras()[np.newaxis]
+    elif guess_type(in_xfm)[0] == 'text/plain':
+        with open(in_xfm) as tf_fh:
+            nxforms = tf_fh.read().count('#Transform')
+        if nxforms == 1:
+            matrices = nt.io.itk.ITKLinearTransform.from_filename(in_xfm).to_ras()[np.newaxis]
+        elif nxforms == num_files:
+            matrices = nt.io.itk.ITKLinearTransformArray.from_filename(in_xfm).to_ras()
+        else:
+            raise RuntimeError(
+                f'Number of transforms ({nxforms}) found in the ITK file does not'
+                f' match the number of input image files ({num_files}).'
+            )
+    else:
+        raise NotImplementedError(f'Unsupported transform file for the python engine <{in_xfm}>.')
+
+    return ('affine', np.linalg.inv(matrices) if invert else matrices)
+
+
+def _interpolation_order(interpolation, parameters=None):
+    """
+    Map ANTs' interpolation methods into spline orders.
+
+    Examples
+    --------
+    >>> _interpolation_order('Linear')
+    1
+    >>> _interpolation_order('BSpline', (5,))
+    5
+    >>> _interpolation_order('LanczosWindowedSinc')
+    Traceback (most recent call last):
+    NotImplementedError: ...
+
+    """
+    if interpolation == 'BSpline':
+        return int(parameters[0]) if parameters else 3
+    try:
+        return {'NearestNeighbor': 0, 'Linear': 1}[interpolation]
+    except KeyError:
+        raise NotImplementedError(
+            f'Interpolation "{interpolation}" is not supported by the python engine.'
+        ) from None
+
+
 def _applytfms(args):
     """
     Applies ANTs' antsApplyTransforms to the input image.
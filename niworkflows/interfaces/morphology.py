@@ -112,3 +112,232 @@ def image_binary_dilation(in_mask, radius=2):
     from skimage.morphology import ball
 
     return ndi.binary_dilation(in_mask.astype(bool), ball(radius)).astype(int)
+
+
+class _AtroposRefinementInputSpec(BaseInterfaceInputSpec):
+    in_segm = File(exists=True, mandatory=True, desc='hard segmentation calculated by ATROPOS')
+    in_mask = File(exists=True, mandatory=True, desc='brain mask ATROPOS was initialized with')
+    segmentation_model = traits.Tuple(
+        traits.Int,
+        traits.Int,
+        traits.Int,
+        traits.Int,
+        mandatory=True,
+        desc='ATROPOS model (K, csfLabel, gmLabel, wmLabel)',
+    )
+    padding = traits.Int(10, usedefault=True, desc='pad images with zeros before processing')
+
+
+class _AtroposRefinementOutputSpec(TraitedSpec):
+    out_mask = File(exists=True, desc='refined brain mask')
+    out_segm = File(exists=True, desc='refined segmentation')
+    out_tpms = traits.List(File(exists=True), desc='CSF, GM and WM maps')
+
+
+class AtroposRefinement(SimpleInterface):
+    """
+    Refine an ATROPOS segmentation and its brain mask (supersteps 6 and 7).
+
+    Reproduces, in memory, the sequence of ``ImageMath`` and ``MultiplyImages``
+    calls with which ``antsBrainExtraction.sh`` massages the ATROPOS outputs.
+    Outputs are written as ``float32``, like ``ImageMath`` does.
+
+    """
+
+    input_spec = _AtroposRefinementInputSpec
+    output_spec = _AtroposRefinementOutputSpec
+
+    def _run_interface(self, runtime):
+        from nipype.utils.filemanip import fname_presuffix
+
+        segm_img = nb.load(self.inputs.in_segm)
+        pad = self.inputs.padding
+        segm = np.pad(np.asanyarray(segm_img.dataobj).astype('uint8'), pad)
+        mask = np.pad(np.asanyarray(nb.load(self.inputs.in_mask).dataobj) >= 0.5, pad)
+
+        results = refine_atropos_segmentation(segm, mask, self.inputs.segmentation_model)
+        crop = (slice(pad, -pad or None),) * 3
+        _, csf_label, gm_label, wm_label = self.inputs.segmentation_model
+
+        def _write(data, in_file, suffix):
+            out_file = fname_presuffix(in_file, suffix=suffix, newpath=runtime.cwd)
+            hdr = segm_img.header.copy()
+            hdr.set_data_dtype('float32')
+            segm_img.__class__(data[crop].astype('float32'), segm_img.affine, hdr).to_filename(
+                out_file
+            )
+            return out_file
+
+        # The "_maths" suffix keeps file names in line with those of the ImageMath chain
+        self._results['out_mask'] = _write(results[0], self.inputs.in_mask, '_maths')
+        self._results['out_segm'] = _write(results[1], self.inputs.in_segm, '_maths')
+        self._results['out_tpms'] = [
+            _write(tpm, self.inputs.in_segm, f'_class-{label:02d}_maths')
+            for tpm, label in zip(results[2:], (csf_label, gm_label, wm_label), strict=True)
+        ]
+        return runtime
+
+
+def refine_atropos_segmentation(segm, mask, segmentation_model):
+    """
+    Refine an ATROPOS segmentation and its brain mask as ``antsBrainExtraction.sh`` does.
+
+    Parameters
+    ----------
+    segm : :obj:`numpy.ndarray`
+        A 3D array of labels, as assigned by ATROPOS (already padded).
+    mask : :obj:`numpy.ndarray`
+        The 3D binary brain mask ATROPOS was initialized with (already padded).
+    segmentation_model : :obj:`tuple`
+        ATROPOS model (K, csfLabel, gmLabel, wmLabel).
+
+    Returns
+    -------
+    out_mask : :obj:`numpy.ndarray`
+        The refined brain mask.
+    out_segm : :obj:`numpy.ndarray`
+        The refined segmentation, with labels ``gmLabel`` and ``wmLabel``.
+    csf, gm, wm : :obj:`numpy.ndarray`
+        The tissue maps (CSF is binary, GM and WM are valued with their label).
+
+    Examples
+    --------
+    >>> segm = np.zeros((30, 30, 30), dtype='uint8')
+    >>> segm[5:25, 5:25, 5:25] = 2
+    >>> segm[10:20, 10:20, 10:20] = 3
+    >>> segm[[0, 5, 12], [0, 5, 12], [0, 5, 12]] = 1
+    >>> out_mask, out_segm, csf, gm, wm = refine_atropos_segmentation(
+    ...     segm, segm > 0, (3, 1, 2, 3)
+    ... )
+    >>> np.unique(out_segm).tolist()
+    [0, 2, 3]
+    >>> bool(out_mask[segm > 0].all())
+    True
+
+    """
+    _, csf_label, gm_label, wm_label = segmentation_model
+
+    # Superstep 6: split in tissues, keep the largest WM and GM components,
+    # and grow GM into the (eroded) CSF
+    wm = _largest_component(segm == wm_label)
+    gm = _largest_component(segm == gm_label)
+    # (multiplying the GM by its hole-filled version, as the script does, is a no-op)
+    csf = segm == csf_label
+    gm = np.where(gm, 1, _binary_erosion(csf, 10))
+    wm_map = wm * wm_label
+    gm_map = gm * gm_label
+    out_segm = np.where(wm_map > 0, wm_map, gm_map)
+
+    # Superstep 7: calculate the brain mask from the GM and WM of the refined segmentation
+    brain = (out_segm == gm_label) | (out_segm == wm_label)
+    brain = _binary_erosion(brain, 2)
+    brain = _largest_component(brain)
+    brain = _binary_dilation(brain, 4)
+    brain = _fill_holes(brain)
+    brain |= mask
+    brain = _binary_dilation(brain, 5)
+    brain = _binary_erosion(brain, 5)
+    return brain, out_segm, csf, gm_map, wm_map
+
+
+def _ants_ball(radius):
+    """
+    Generate the ball structuring element of ``ImageMath``'s morphological operations.
+
+    ITK's ``BinaryBallStructuringElement`` is an ellipsoid with axes as long as
+    the element's size (``2 * radius + 1``), and therefore slightly larger than
+    :func:`skimage.morphology.ball`.
+
+    Examples
+    --------
+    >>> int(_ants_ball(1).sum()), int(_ants_ball(2).sum())
+    (19, 81)
+
+    """
+    grid = np.indices((2 * radius + 1,) * 3) - radius
+    return (grid**2).sum(0) <= (radius + 0.5) ** 2
+
+
+def _binary_dilation(data, radius):
+    """
+    Emulate ``ImageMath MD``.
+
+    Dilating with a ball is equivalent to thresholding the (exact) Euclidean distance
+    to the foreground, which is much faster than a dilation with large structuring
+    elements.
+
+    Examples
+    --------
+    >>> from scipy import ndimage as ndi
+    >>> data = np.random.default_rng(0).random((20, 20, 20)) > 0.97
+    >>> np.array_equal(
+    ...     _binary_dilation(data, 3), ndi.binary_dilation(data, structure=_ants_ball(3))
+    ... )
+    True
+
+    """
+    from scipy import ndimage as ndi
+
+    out = np.zeros_like(data, dtype=bool)
+    if not data.any():
+        return out
+    # Only the bounding box of the foreground, grown by the radius, can change
+    crop = _bbox(data, radius + 1)
+    out[crop] = ndi.distance_transform_edt(~data[crop]) ** 2 <= (radius + 0.5) ** 2
+    return out
+
+
+def _binary_erosion(data, radius):
+    """
+    Emulate ``ImageMath ME`` (ITK sets the boundary to foreground when eroding).
+
+    Examples
+    --------
+    >>> from scipy import ndimage as ndi
+    >>> data = np.random.default_rng(0).random((20, 20, 20)) > 0.03
+    >>> np.array_equal(
+    ...     _binary_erosion(data, 3),
+    ...     ndi.binary_erosion(data, structure=_ants_ball(3), border_value=1),
+    ... )
+    True
+
+    """
+    from scipy import ndimage as ndi
+
+    if data.all():
+        return np.ones_like(data, dtype=bool)
+    out = np.zeros_like(data, dtype=bool)
+    if not data.any():
+        return out
+    # A background margin around the foreground bounds the distances within the box
+    crop = _bbox(data, 1)
+    out[crop] = ndi.distance_transform_edt(data[crop]) ** 2 > (radius + 0.5) ** 2
+    return out
+
+
+def _bbox(data, margin):
+    """Calculate the bounding box of the foreground, grown by a margin."""
+    crop = []
+    for axis in range(data.ndim):
+        nonzero = np.flatnonzero(data.any(axis=tuple(set(range(data.ndim)) - {axis})))
+        crop.append(
+            slice(max(nonzero[0] - margin, 0), min(nonzero[-1] + margin + 1, data.shape[axis]))
+        )
+    return tuple(crop)
+
+
+def _largest_component(data):
+    """Emulate ``ImageMath GetLargestComponent`` (face connectivity)."""
+    from scipy import ndimage as ndi
+
+    labels, nlabels = ndi.label(data)
+    if nlabels < 2:
+        return labels > 0
+    return labels == np.argmax(np.bincount(labels.ravel())[1:]) + 1
+
+
+def _fill_holes(data):
+    """Emulate ``ImageMath FillHoles 2``, which fills all holes."""
+    from scipy import ndimage as ndi
+
+    return ndi.binary_fill_holes(data)
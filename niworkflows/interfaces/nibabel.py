@@ -436,6 +436,12 @@ class _IntensityClipInputSpec(BaseInterfaceInputSpec):
     )
     dtype = traits.Enum('int16', 'float32', 'uint8', usedefault=True, desc='output datatype')
     invert = traits.Bool(False, usedefault=True, desc='finalize by inverting contrast')
+    max_samples = traits.Int(
+        0,
+        usedefault=True,
+        desc='estimate the clipping thresholds on a regular grid of at most this many '
+        'voxels (e.g., 2**20); a value of zero or less (default) uses every voxel',
+    )
 
 
 class _IntensityClipOutputSpec(TraitedSpec):
@@ -456,6 +462,7 @@ class IntensityClip(SimpleInterface):
             nonnegative=self.inputs.nonnegative,
             dtype=self.inputs.dtype,
             invert=self.inputs.invert,
+            max_samples=self.inputs.max_samples,
             newpath=runtime.cwd,
         )
         return runtime
@@ -659,6 +666,7 @@ def _advanced_clip(
     dtype='int16',
     invert=False,
     newpath=None,
+    max_samples=None,
 ):
     """
     Remove outliers at both ends of the intensity distribution and fit into a given dtype.
@@ -672,14 +680,14 @@ def _advanced_clip(
     with a median filter.
     Once the thresholds are calculated, the denoised data are thrown away and the thresholds
     are applied on the original image.
+    When ``max_samples`` is set and the image is larger, the median filter is only
+    evaluated on a regular grid of voxels (see :func:`_robust_percentiles`).
 
     """
     from pathlib import Path
 
     import nibabel as nb
     import numpy as np
-    from scipy import ndimage
-    from skimage.morphology import ball
 
     out_file = (Path(newpath or '') / 'clipped.nii.gz').absolute()
 
@@ -690,10 +698,9 @@ def _advanced_clip(
     data = img.get_fdata(dtype='float32')
 
     # Calculate stats on denoised version, to preempt outliers from biasing
-    denoised = ndimage.median_filter(data, footprint=ball(3))
-
-    a_min = np.percentile(denoised[denoised > 0] if nonnegative else denoised, p_min)
-    a_max = np.percentile(denoised[denoised > 0] if nonnegative else denoised, p_max)
+    a_min, a_max = _robust_percentiles(
+        data, (p_min, p_max), nonnegative=nonnegative, max_samples=max_samples
+    )
 
     # Clip and cast
     data = np.clip(data, a_min=a_min, a_max=a_max)
@@ -715,6 +722,65 @@ def _advanced_clip(
     return str(out_file)
 
 
+def _robust_percentiles(data, percentiles, nonnegative=True, max_samples=None, radius=3):
+    """
+    Calculate percentiles of a 3D array after removing spikes with a median filter.
+
+    If the array has more than ``max_samples`` voxels, the median filter is evaluated
+    only at the nodes of a regular grid (with the same stride along every axis)
+    holding at most ``max_samples`` voxels, rather than over the whole array.
+    Each sampled value is exactly the value the full filter produces at that
+    voxel, so only the percentile estimation is approximate.
+
+    Examples
+    --------
+    >>> rng = np.random.default_rng(0)
+    >>> data = rng.normal(100, 10, size=(40, 40, 40)).astype('float32')
+    >>> full = _robust_percentiles(data, (35, 99.98))
+    >>> np.allclose(full, _robust_percentiles(data, (35, 99.98), max_samples=data.size))
+    True
+    >>> fast = _robust_percentiles(data, (35, 99.98), max_samples=2**13)
+    >>> np.allclose(full, fast, rtol=0.02)
+    True
+
+    """
+    from scipy import ndimage
+    from skimage.morphology import ball
+
+    footprint = ball(radius).astype(bool)
+    stride = 1
+    if max_samples is not None and max_samples > 0 and data.size > max_samples:
+        stride = int(np.ceil((data.size / max_samples) ** (1 / 3)))
+
+    if stride == 1:
+        denoised = ndimage.median_filter(data, footprint=footprint)
+    else:
+        # Gather the neighborhood of each grid node from a padded copy that
+        # reproduces the default (``reflect``) boundary mode of the median filter
+        padded = np.pad(data, radius, mode='symmetric')
+        offsets = np.ravel_multi_index(
+            tuple(np.nonzero(footprint)), padded.shape
+        ) - np.ravel_multi_index((radius,) * 3, padded.shape)
+        centers = np.ravel_multi_index(
+            np.meshgrid(
+                *(np.arange(radius, radius + n, stride) for n in data.shape),
+                indexing='ij',
+            ),
+            padded.shape,
+        ).ravel()
+        flat = padded.ravel()
+        rank = footprint.sum() // 2
+        denoised = np.empty(centers.size, dtype=data.dtype)
+        chunk = max(1, 2**22 // offsets.size)
+        for start in range(0, centers.size, chunk):
+            neighbors = flat[centers[start : start + chunk, np.newaxis] + offsets]
+            denoised[start : start + chunk] = np.partition(neighbors, rank, axis=1)[:, rank]
+
+    if nonnegative:
+        denoised = denoised[denoised > 0]
+    return np.percentile(denoised, percentiles)
+
+
 def _dilate(in_file, radius=3, iterations=1, newpath=None):
     """Dilate (binary) input mask."""
     from pathlib import Path
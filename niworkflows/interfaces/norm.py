@@ -22,8 +22,13 @@
 #
 """A robust ANTs T1-to-MNI registration workflow with fallback retry."""
 
+import json
+import os
+import shutil
+from hashlib import sha256
 from multiprocessing import cpu_count
 from os import path as op
+from pathlib import Path
 
 import numpy as np
 from nipype.interfaces.ants import AffineInitializer
@@ -31,6 +36,7 @@ from nipype.interfaces.ants.registration import RegistrationOutputSpec
 from nipype.interfaces.base import (
     BaseInterface,
     BaseInterfaceInputSpec,
+    Directory,
     File,
     Str,
     isdefined,
@@ -44,6 +50,7 @@ from ..data import load as load_data
 from .fixes import FixHeaderRegistration as Registration
 
 niworkflows_version = Version(__version__)
+NORM_CACHE_ENV = 'NIWORKFLOWS_NORM_CACHE'
 
 
 class _SpatialNormalizationInputSpec(BaseInterfaceInputSpec):
@@ -116,6 +123,14 @@ See https://sourceforge.net/p/advants/discussion/840261/thread/27216e69/#c7ba\
     initial_moving_transform = File(exists=True, desc='transform for initialization')
     use_histogram_matching = traits.Bool(desc='determine use of histogram matching')
     float = traits.Bool(False, usedefault=True, desc='use single precision calculations')
+    cache_dir = Directory(
+        nohash=True,
+        desc='cache initial transforms and template-derived inputs in this folder '
+        f'(defaults to the path in the ``{NORM_CACHE_ENV}`` environment variable, if set)',
+    )
+    cache_size = traits.Int(
+        256, usedefault=True, nohash=True, desc='maximum number of entries in the cache'
+    )
 
 
 class _SpatialNormalizationOutputSpec(RegistrationOutputSpec):
@@ -141,6 +156,7 @@ class SpatialNormalization(BaseInterface):
     def __init__(self, **inputs):
         self.norm = None
         self._reference_image = None
+        self._cache = None
         self.retry = 1
         self.terminal_output = 'file'
         super().__init__(**inputs)
@@ -167,12 +183,39 @@ class SpatialNormalization(BaseInterface):
             ]
         )
 
+    def _get_cache(self):
+        """Return the cache of initializations and template-derived inputs, if enabled."""
+        cache_dir = (
+            self.inputs.cache_dir
+            if isdefined(self.inputs.cache_dir)
+            else os.getenv(NORM_CACHE_ENV)
+        )
+        return _DigestCache(cache_dir, self.inputs.cache_size) if cache_dir else None
+
     def _run_interface(self, runtime):
+        self._cache = self._get_cache()
         # Get a list of settings files.
         settings_files = self._get_settings()
         ants_args = self._get_ants_args()
 
-        if not isdefined(self.inputs.initial_moving_transform):
+        init_key = None
+        if not isdefined(self.inputs.initial_moving_transform) and self._cache is not None:
+            init_key = _DigestCache.key(
+                'AffineInitializer',
+                _file_digest(ants_args['moving_image']),
+                _file_digest(ants_args['fixed_image']),
+                self.inputs.template,
+                self.inputs.flavor,
+                [_file_digest(fname) for fname in settings_files],
+            )
+            cached = self._cache.get(init_key, '.mat')
+            if cached is not None:
+                NIWORKFLOWS_LOG.info('Reusing cached initial transform (%s).', cached)
+                ants_args['initial_moving_transform'] = str(
+                    shutil.copyfile(cached, Path(runtime.cwd) / 'transform.mat')
+                )
+
+        if not isdefined(ants_args['initial_moving_transform']):
             NIWORKFLOWS_LOG.info('Estimating initial transform using AffineInitializer')
             init = AffineInitializer(
                 fixed_image=ants_args['fixed_image'],
@@ -191,6 +234,8 @@ class SpatialNormalization(BaseInterface):
                 )
 
             ants_args['initial_moving_transform'] = init_result.outputs.out_file
+            if init_key is not None:
+                self._cache.put(init_key, init_result.outputs.out_file, '.mat')
 
         # For each settings file...
         for ants_settings in settings_files:
@@ -409,12 +454,36 @@ class SpatialNormalization(BaseInterface):
 
             template_spec['suffix'] = self.inputs.reference
             template_spec['desc'] = None
-            ref_template, template_spec = get_template_specs(
-                self.inputs.template,
-                template_spec=template_spec,
-                default_resolution=default_resolution,
-                fallback=True,
-            )
+
+            template_key = None
+            cached = None
+            if self._cache is not None:
+                template_key = _DigestCache.key(
+                    'template', self.inputs.template, template_spec, default_resolution
+                )
+                cached = self._cache.get_json(template_key)
+            if cached and all(op.isfile(fname) for fname in cached.values()):
+                ref_template, ref_mask = cached['template'], cached['mask']
+            else:
+                ref_template, template_spec = get_template_specs(
+                    self.inputs.template,
+                    template_spec=template_spec,
+                    default_resolution=default_resolution,
+                    fallback=True,
+                )
+                # Get the template specified by the user.
+                ref_mask = str(
+                    get_template(
+                        self.inputs.template, desc='brain', suffix='mask', **template_spec
+                    )
+                    or get_template(
+                        self.inputs.template, label='brain', suffix='mask', **template_spec
+                    )
+                )
+                if template_key is not None and op.isfile(ref_template):
+                    self._cache.put_json(
+                        template_key, {'template': str(ref_template), 'mask': ref_mask}
+                    )
 
             # Set reference image
             self._reference_image = ref_template
@@ -425,11 +494,6 @@ The registration reference must be an existing file, but path "{ref_template}" \
 cannot be found."""
                 )
 
-            # Get the template specified by the user.
-            ref_mask = get_template(
-                self.inputs.template, desc='brain', suffix='mask', **template_spec
-            ) or get_template(self.inputs.template, label='brain', suffix='mask', **template_spec)
-
             # Default is explicit masking disabled
             args['fixed_image'] = ref_template
             # Use the template mask as the fixed mask.
@@ -438,7 +502,9 @@ cannot be found."""
             # Overwrite defaults if explicit masking
             if self.inputs.explicit_masking:
                 # Mask the template image with the template mask.
-                args['fixed_image'] = mask(ref_template, str(ref_mask), 'fixed_masked.nii.gz')
+                args['fixed_image'] = self._cached_mask(
+                    ref_template, str(ref_mask), 'fixed_masked.nii.gz'
+                )
                 # Do not use a fixed mask during registration.
                 args.pop('fixed_image_masks', None)
 
@@ -452,6 +518,102 @@ cannot be found."""
 
         return args
 
+    def _cached_mask(self, in_file, mask_file, new_name):
+        """Apply :func:`mask`, reusing the cached result when available."""
+        if self._cache is None:
+            return mask(in_file, mask_file, new_name)
+
+        key = _DigestCache.key('mask', _file_digest(in_file), _file_digest(mask_file))
+        cached = self._cache.get(key, '.nii.gz')
+        if cached is not None:
+            return op.abspath(shutil.copyfile(cached, new_name))
+
+        out_file = mask(in_file, mask_file, new_name)
+        self._cache.put(key, out_file, '.nii.gz')
+        return out_file
+
+
+class _DigestCache:
+    """
+    A folder of files keyed by digests, evicting the least recently used entries.
+
+    Examples
+    --------
+    >>> cache = _DigestCache(tmpdir, max_entries=2)
+    >>> key = _DigestCache.key('template', 'MNI152NLin2009cAsym', {'res': 1})
+    >>> cache.get_json(key) is None
+    True
+    >>> cache.put_json(key, {'template': 'tpl.nii.gz'})
+    >>> cache.get_json(key)
+    {'template': 'tpl.nii.gz'}
+    >>> for i in range(3):
+    ...     cache.put_json(_DigestCache.key(i), {'entry': i})
+    >>> cache.get_json(key) is None
+    True
+
+    """
+
+    def __init__(self, path, max_entries=256):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+
+    @staticmethod
+    def key(*parts):
+        """Calculate a key from JSON-serializable parts."""
+        return sha256(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+
+    def get(self, key, suffix=''):
+        """Return the path of an entry (marking it as recently used), if it exists."""
+        entry = self.path / f'{key}{suffix}'
+        try:
+            os.utime(entry)
+        except FileNotFoundError:
+            return None
+        return entry
+
+    def put(self, key, in_file, suffix=''):
+        """Store a copy of a file, and evict the least recently used entries."""
+        entry = self.path / f'{key}{suffix}'
+        # Write to a hidden file first, so that concurrent readers never see partial entries
+        tmp_file = self.path / f'.{entry.name}.{os.getpid()}'
+        shutil.copyfile(in_file, tmp_file)
+        os.replace(tmp_file, entry)
+        self._evict()
+        return entry
+
+    def get_json(self, key):
+        """Return the contents of a JSON entry, if it exists."""
+        entry = self.get(key, '.json')
+        return None if entry is None else json.loads(entry.read_text())
+
+    def put_json(self, key, value):
+        """Store a JSON entry."""
+        tmp_file = self.path / f'.{key}.{os.getpid()}'
+        tmp_file.write_text(json.dumps(value))
+        self.put(key, tmp_file, '.json')
+        tmp_file.unlink()
+
+    def _evict(self):
+        entries = []
+        for entry in self.path.iterdir():
+            try:
+                entries.append((entry.stat().st_mtime_ns, entry))
+            except FileNotFoundError:  # Evicted by another process
+                continue
+        entries = sorted(e for e in entries if not e[1].name.startswith('.'))
+        for _, entry in entries[: max(len(entries) - self.max_entries, 0)]:
+            entry.unlink(missing_ok=True)
+
+
+def _file_digest(in_file, blocksize=2**20):
+    """Calculate the SHA-256 digest of the contents of a file."""
+    digest = sha256()
+    with open(in_file, 'rb') as fobj:
+        while block := fobj.read(blocksize):
+            digest.update(block)
+    return digest.hexdigest()
+
 
 def mask(in_file, mask_file, new_name):
     """
@@ -35,11 +35,6 @@ from nipype.interfaces.base import (
 from nipype.utils.filemanip import fname_presuffix
 
 from niworkflows.utils.timeseries import _cifti_timeseries, _nifti_timeseries
-from niworkflows.viz.plots import (
-    compcor_variance_plot,
-    confounds_correlation_plot,
-    fMRIPlot,
-)
 
 
 class _FMRISummaryInputSpec(BaseInterfaceInputSpec):
@@ -67,6 +62,8 @@ class FMRISummary(SimpleInterface):
     def _run_interface(self, runtime):
         import pandas as pd
 
+        from niworkflows.viz.plots import fMRIPlot
+
         self._results['out_file'] = fname_presuffix(
             self.inputs.in_func,
             suffix='_fmriplot.svg',
@@ -97,9 +94,9 @@ class FMRISummary(SimpleInterface):
         input_data = nb.load(self.inputs.in_func)
         seg_file = self.inputs.in_segm if isdefined(self.inputs.in_segm) else None
         dataset, segments = (
-            _cifti_timeseries(input_data)
+            _cifti_timeseries(input_data, lazy=True)
             if isinstance(input_data, nb.Cifti2Image)
-            else _nifti_timeseries(input_data, seg_file)
+            else _nifti_timeseries(input_data, seg_file, lazy=True)
         )
 
         fig = fMRIPlot(
@@ -151,6 +148,8 @@ class CompCorVariancePlot(SimpleInterface):
     output_spec = _CompCorVariancePlotOutputSpec
 
     def _run_interface(self, runtime):
+        from niworkflows.viz.plots import compcor_variance_plot
+
         if self.inputs.out_file is None:
             self._results['out_file'] = fname_presuffix(
                 self.inputs.metadata_files[0],
@@ -206,6 +205,8 @@ class ConfoundsCorrelationPlot(SimpleInterface):
     output_spec = _ConfoundsCorrelationPlotOutputSpec
 
     def _run_interface(self, runtime):
+        from niworkflows.viz.plots import confounds_correlation_plot
+
         if self.inputs.out_file is None:
             self._results['out_file'] = fname_presuffix(
                 self.inputs.confounds_file,
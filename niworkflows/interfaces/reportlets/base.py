@@ -35,11 +35,21 @@ class _SVGReportCapableInputSpec(reporting.ReportCapableInputSpec):
         'auto',
         True,
         False,
+        'raster',
+        'external',
         usedefault=True,
         desc='Compress the reportlet using SVGO or'
         "WEBP. 'auto' - compress if relevant "
         'software is installed, True = force,'
-        "False - don't attempt to compress",
+        "False - don't attempt to compress, "
+        "'raster' - render figures as WEBP images in-process, "
+        "'external' - compress with the svgo and cwebp tools",
+    )
+    report_n_procs = traits.Int(
+        1,
+        usedefault=True,
+        nohash=True,
+        desc='number of processes rendering the views of the reportlet in parallel',
     )
 
 
@@ -57,9 +67,9 @@ class RegistrationRC(reporting.ReportCapableInterface):
     def _generate_report(self):
         """Generate the visual report."""
         from nilearn.image import load_img, threshold_img
-        from nilearn.masking import apply_mask, unmask
+        from svgutils.transform import fromstring
 
-        from niworkflows.viz.utils import plot_registration
+        from niworkflows.viz.utils import _registration_jobs, _render_views
 
         NIWORKFLOWS_LOG.info('Generating visual report')
 
@@ -68,17 +78,12 @@ class RegistrationRC(reporting.ReportCapableInterface):
         contour_nii = load_img(self._contour) if self._contour is not None else None
 
         if self._fixed_image_mask:
-            fixed_image_nii = unmask(
-                apply_mask(fixed_image_nii, self._fixed_image_mask),
-                self._fixed_image_mask,
-            )
+            # Load the mask once, for both images
+            mask_nii = load_img(self._fixed_image_mask)
+            fixed_image_nii = _apply_mask(fixed_image_nii, mask_nii)
             # since the moving image is already in the fixed image space we
             # should apply the same mask
-            moving_image_nii = unmask(
-                apply_mask(moving_image_nii, self._fixed_image_mask),
-                self._fixed_image_mask,
-            )
-            mask_nii = load_img(self._fixed_image_mask)
+            moving_image_nii = _apply_mask(moving_image_nii, mask_nii)
         else:
             mask_nii = threshold_img(fixed_image_nii, 1e-3)
 
@@ -88,30 +93,30 @@ class RegistrationRC(reporting.ReportCapableInterface):
         else:
             cuts = cuts_from_bbox(mask_nii, cuts=n_cuts)
 
-        # Call composer
-        compose_view(
-            plot_registration(
-                fixed_image_nii,
-                'fixed-image',
-                estimate_brightness=True,
-                cuts=cuts,
-                label=self._fixed_image_label,
-                contour=contour_nii,
-                compress=self.inputs.compress_report,
-                dismiss_affine=self._dismiss_affine,
-            ),
-            plot_registration(
-                moving_image_nii,
-                'moving-image',
+        # Render the views of both images at once, with the same cuts
+        jobs = [
+            _registration_jobs(
+                image_nii,
+                div_id,
                 estimate_brightness=True,
                 cuts=cuts,
-                label=self._moving_image_label,
+                label=label,
                 contour=contour_nii,
                 compress=self.inputs.compress_report,
                 dismiss_affine=self._dismiss_affine,
-            ),
-            out_file=self._out_report,
-        )
+            )
+            for image_nii, div_id, label in (
+                (fixed_image_nii, 'fixed-image', self._fixed_image_label),
+                (moving_image_nii, 'moving-image', self._moving_image_label),
+            )
+        ]
+        svgs = [
+            fromstring(svg)
+            for svg in _render_views(jobs[0] + jobs[1], n_procs=self.inputs.report_n_procs)
+        ]
+
+        # Call composer
+        compose_view(svgs[: len(jobs[0])], svgs[len(jobs[0]) :], out_file=self._out_report)
 
 
 class SegmentationRC(reporting.ReportCapableInterface):
@@ -128,6 +133,7 @@ class SegmentationRC(reporting.ReportCapableInterface):
                 out_file=self.inputs.out_report,
                 masked=self._masked,
                 compress=self.inputs.compress_report,
+                n_procs=self.inputs.report_n_procs,
             ),
             fg_svgs=None,
             out_file=self._out_report,
@@ -144,7 +150,6 @@ class SurfaceSegmentationRC(reporting.ReportCapableInterface):
     def _generate_report(self):
         """Generate the visual report."""
         from nilearn.image import load_img, threshold_img
-        from nilearn.masking import apply_mask, unmask
 
         from niworkflows.viz.utils import plot_registration
 
@@ -154,8 +159,8 @@ class SurfaceSegmentationRC(reporting.ReportCapableInterface):
         contour_nii = load_img(self._contour) if self._contour is not None else None
 
         if self._mask_file:
-            anat = unmask(apply_mask(anat, self._mask_file), self._mask_file)
             mask_nii = load_img(self._mask_file)
+            anat = _apply_mask(anat, mask_nii)
         else:
             mask_nii = threshold_img(anat, 1e-3)
 
@@ -174,12 +179,36 @@ class SurfaceSegmentationRC(reporting.ReportCapableInterface):
                 cuts=cuts,
                 contour=contour_nii,
                 compress=self.inputs.compress_report,
+                n_procs=self.inputs.report_n_procs,
             ),
             [],
             out_file=self._out_report,
         )
 
 
+def _apply_mask(img, mask_img):
+    """
+    Zero out voxels outside a mask, in single precision.
+
+    Equivalent to nilearn's ``unmask(apply_mask(img, mask_img), mask_img)`` for 3D
+    images, without the intermediate (double precision) copies.
+
+    """
+    import nibabel as nb
+    import numpy as np
+
+    if img.shape[:3] != mask_img.shape[:3] or not np.allclose(img.affine, mask_img.affine):
+        raise ValueError('Image and mask must be defined on the same grid')
+
+    data = np.array(img.dataobj, dtype='float32')
+    data[np.asanyarray(mask_img.dataobj).reshape(mask_img.shape[:3]) == 0] = 0
+    out_img = nb.Nifti1Image(
+        data, img.affine, img.header if isinstance(img.header, nb.Nifti1Header) else None
+    )
+    out_img.set_data_dtype('float32')
+    return out_img
+
+
 class ReportingInterface(reporting.ReportCapableInterface):
     """
     Interface that always generates a report.
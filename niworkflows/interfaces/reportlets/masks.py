@@ -273,6 +273,7 @@ class ROIsPlot(nrb.ReportingInterface):
                 out_file=self.inputs.out_report,
                 masked=self.inputs.masked,
                 compress=self.inputs.compress_report,
+                n_procs=self.inputs.report_n_procs,
             ),
             fg_svgs=None,
             out_file=self._out_report,
@@ -349,18 +349,14 @@ class GiftiToCSV(SimpleInterface):
         if self.inputs.itk_lps:  # ITK: flip X and Y around 0
             data[:, :2] *= -1
 
-        # antsApplyTransformsToPoints requires 5 cols with headers
-        csvdata = np.hstack((data, np.zeros((data.shape[0], 3))))
-
         out_file = fname_presuffix(
             self.inputs.in_file, newpath=runtime.cwd, use_ext=False, suffix='points.csv'
         )
-        np.savetxt(
-            out_file,
-            csvdata,
-            delimiter=',',
-            header='x,y,z,t,label,comment',
-            fmt=['%.5f'] * 4 + ['%d'] * 2,
+        # antsApplyTransformsToPoints requires 5 cols with headers
+        # (same output as np.savetxt, formatted in one go rather than row by row)
+        Path(out_file).write_text(
+            '# x,y,z,t,label,comment\n'
+            + '%.5f,%.5f,%.5f,0.00000,0,0\n' * data.shape[0] % tuple(data[:, :3].ravel().tolist())
         )
         self._results['out_file'] = out_file
         return runtime
@@ -399,6 +395,43 @@ class CSVToGifti(SimpleInterface):
         return runtime
 
 
+class _GiftiApplyTransformsInputSpec(BaseInterfaceInputSpec):
+    in_file = File(mandatory=True, exists=True, desc='GIfTI surface file')
+    transforms = InputMultiPath(
+        File(exists=True),
+        mandatory=True,
+        desc='ITK/ANTs transform files (affines, displacement fields or composite HDF5), '
+        'in antsApplyTransformsToPoints order (i.e., the last one is applied first)',
+    )
+
+
+class _GiftiApplyTransformsOutputSpec(TraitedSpec):
+    out_file = File(desc='output GIfTI file')
+
+
+class GiftiApplyTransforms(SimpleInterface):
+    """Move the vertices of a GIfTI surface with ITK/ANTs transforms.
+
+    Equivalent to the :class:`GiftiToCSV` (``itk_lps=True``),
+    ``antsApplyTransformsToPoints``, :class:`CSVToGifti` (``itk_lps=True``)
+    chain, but coordinates are mapped in memory, without serializing them to text.
+    """
+
+    input_spec = _GiftiApplyTransformsInputSpec
+    output_spec = _GiftiApplyTransformsOutputSpec
+
+    def _run_interface(self, runtime):
+        gii = nb.load(self.inputs.in_file)
+        data = gii.darrays[0].data
+        gii.darrays[0].data = apply_transforms_to_points(data, self.inputs.transforms).astype(
+            data.dtype
+        )
+        out_file = fname_presuffix(self.inputs.in_file, newpath=runtime.cwd, suffix='.transformed')
+        gii.to_filename(out_file)
+        self._results['out_file'] = out_file
+        return runtime
+
+
 class _SurfacesToPointCloudInputSpec(BaseInterfaceInputSpec):
     in_files = InputMultiPath(File(exists=True), mandatory=True, desc='input GIfTI files')
     out_file = File('pointcloud.ply', usedefault=True, desc='output file name')
@@ -684,44 +717,227 @@ def load_transform(fname):
     raise ValueError('Unknown transform type; pass FSL (.mat) or LTA (.lta)')
 
 
+def apply_transforms_to_points(points, transforms):
+    """
+    Map RAS+ coordinates through ITK/ANTs transforms, like ``antsApplyTransformsToPoints``.
+
+    Transforms are applied in reverse order (the last one first).
+    Affines (``.txt``, ``.mat``, ``.tfm``), displacement fields (``.nii``, ``.nii.gz``)
+    and composite (``.h5``) transforms are supported.
+    Displacement fields are linearly interpolated, and points falling outside of
+    the field are not displaced.
+
+    Parameters
+    ----------
+    points : (N, 3) array-like
+        Coordinates in RAS+ (world) space.
+    transforms : list of str
+        ITK/ANTs transform files.
+
+    Returns
+    -------
+    points : (N, 3) numpy.ndarray
+        The mapped coordinates.
+
+    """
+    from nitransforms.io import itk
+    from nitransforms.linear import load as load_affine
+    from scipy.ndimage import map_coordinates
+
+    xfms = []
+    for fname in transforms:
+        fname = str(fname)
+        if fname.endswith('.h5'):
+            xfms += [
+                xfm.to_ras() if isinstance(xfm, itk.ITKLinearTransform) else xfm
+                for xfm in itk.ITKCompositeH5.from_filename(fname)
+            ]
+        elif fname.endswith(('.nii', '.nii.gz')):
+            xfms.append(itk.ITKDisplacementsField.from_filename(fname))
+        else:
+            xfms.append(load_affine(fname, fmt='itk').matrix)
+
+    points = np.array(points, dtype='float64')
+    for xfm in reversed(xfms):
+        if isinstance(xfm, np.ndarray):
+            points = points @ xfm[:3, :3].T + xfm[:3, 3]
+            continue
+
+        ijk = nb.affines.apply_affine(np.linalg.inv(xfm.affine), points)
+        field = np.asanyarray(xfm.dataobj)
+        points += np.stack(
+            [
+                map_coordinates(field[..., i], ijk.T, order=1, mode='constant', cval=0.0)
+                for i in range(3)
+            ],
+            axis=-1,
+        )
+    return points
+
+
 def vertex_normals(vertices, faces):
-    """Calculates the normals of a triangular mesh"""
+    """
+    Calculate the normals of a triangular mesh.
 
-    def normalize_v3(arr):
-        """Normalize a numpy array of 3 component vectors shape=(n,3)"""
-        lens = np.sqrt(arr[:, 0] ** 2 + arr[:, 1] ** 2 + arr[:, 2] ** 2)
-        arr /= lens[:, np.newaxis]
+    Each vertex normal is the (normalized) sum of the normals of all the faces it
+    belongs to.
+    Vertices that do not belong to any (non-degenerate) face get a null normal.
+
+    """
+    vertices = np.asanyarray(vertices)
+    faces = np.asanyarray(faces)
 
     tris = vertices[faces]
-    facenorms = np.cross(tris[::, 1] - tris[::, 0], tris[::, 2] - tris[::, 0])
-    normalize_v3(facenorms)
-
-    norm = np.zeros(vertices.shape, dtype=vertices.dtype)
-    norm[faces[:, 0]] += facenorms
-    norm[faces[:, 1]] += facenorms
-    norm[faces[:, 2]] += facenorms
-    normalize_v3(norm)
+    facenorms = np.cross(tris[:, 1] - tris[:, 0], tris[:, 2] - tris[:, 0])
+    lens = np.linalg.norm(facenorms, axis=1, keepdims=True)
+    np.divide(facenorms, lens, out=facenorms, where=lens > 0)
+
+    # Accumulate face normals onto their vertices (repeated indices are summed up)
+    indices = faces.T.ravel()
+    norm = np.stack(
+        [
+            np.bincount(indices, weights=np.tile(facenorms[:, i], 3), minlength=len(vertices))
+            for i in range(3)
+        ],
+        axis=1,
+    ).astype(vertices.dtype)
+    lens = np.linalg.norm(norm, axis=1, keepdims=True)
+    np.divide(norm, lens, out=norm, where=lens > 0)
     return norm
 
 
-def pointcloud2ply(vertices, normals, out_file=None):
-    """Converts the file to PLY format"""
-    from pathlib import Path
+PLY_DTYPES = {
+    'char': 'i1',
+    'int8': 'i1',
+    'uchar': 'u1',
+    'uint8': 'u1',
+    'short': 'i2',
+    'int16': 'i2',
+    'ushort': 'u2',
+    'uint16': 'u2',
+    'int': 'i4',
+    'int32': 'i4',
+    'uint': 'u4',
+    'uint32': 'u4',
+    'float': 'f4',
+    'float32': 'f4',
+    'double': 'f8',
+    'float64': 'f8',
+}
 
-    import pandas as pd
-    from pyntcloud import PyntCloud
 
-    df = pd.DataFrame(np.hstack((vertices, normals)))
-    df.columns = ['x', 'y', 'z', 'nx', 'ny', 'nz']
-    cloud = PyntCloud(df)
+def pointcloud2ply(vertices, normals, out_file=None):
+    """Write a point cloud with normals as a binary PLY file."""
+    from pathlib import Path
 
     if out_file is None:
         out_file = Path('pointcloud.ply').resolve()
 
-    cloud.to_file(str(out_file))
+    data = np.hstack((vertices, normals)).astype('<f4')
+    header = '\n'.join(
+        ['ply', 'format binary_little_endian 1.0', f'element vertex {len(data)}']
+        + [f'property float {name}' for name in ('x', 'y', 'z', 'nx', 'ny', 'nz')]
+        + ['end_header', '']
+    )
+    with open(out_file, 'wb') as fobj:
+        fobj.write(header.encode('ascii'))
+        fobj.write(data.tobytes())
     return out_file
 
 
+def read_ply(in_file):
+    """
+    Read the vertices and triangles of a PLY (ASCII or binary) file.
+
+    Returns
+    -------
+    vertices : (N, 3) numpy.ndarray
+        Vertex coordinates.
+    faces : (M, 3) numpy.ndarray or None
+        Vertex indices of each triangle, if the file has faces.
+
+    """
+    with open(in_file, 'rb') as fobj:
+        if fobj.readline().strip() != b'ply':
+            raise ValueError(f'<{in_file}> is not a PLY file.')
+
+        fmt = None
+        elements = []  # (name, count, [(property, list count type or None, type)])
+        for line in fobj:
+            tokens = line.decode('ascii').split()
+            if not tokens or tokens[0] in ('comment', 'obj_info'):
+                continue
+            if tokens[0] == 'end_header':
+                break
+            if tokens[0] == 'format':
+                fmt = tokens[1]
+            elif tokens[0] == 'element':
+                elements.append((tokens[1], int(tokens[2]), []))
+            elif tokens[0] == 'property' and tokens[1] == 'list':
+                elements[-1][2].append((tokens[4], tokens[2], tokens[3]))
+            elif tokens[0] == 'property':
+                elements[-1][2].append((tokens[2], None, tokens[1]))
+        body = fobj.read()
+
+    ascii_body = body.split() if fmt == 'ascii' else None
+    byteorder = '>' if fmt == 'binary_big_endian' else '<'
+    offset = 0
+    data = {}
+    for name, count, properties in elements:
+        # List properties (face indices) are read assuming all rows have the same length
+        lengths = []
+        pos = offset
+        for _, count_type, ptype in properties:
+            if count_type is None:
+                lengths.append(None)
+                pos += 1 if ascii_body is not None else np.dtype(PLY_DTYPES[ptype]).itemsize
+                continue
+            if ascii_body is not None:
+                length = int(ascii_body[pos]) if count else 0
+                pos += 1 + length
+            else:
+                ctype = np.dtype(PLY_DTYPES[count_type]).newbyteorder(byteorder)
+                length = int(np.frombuffer(body, ctype, 1, pos)[0]) if count else 0
+                pos += ctype.itemsize + length * np.dtype(PLY_DTYPES[ptype]).itemsize
+            lengths.append(length)
+
+        if ascii_body is not None:
+            ncols = sum(1 if n is None else 1 + n for n in lengths)
+            table = np.array(ascii_body[offset : offset + count * ncols], dtype='f8').reshape(
+                (count, ncols)
+            )
+            offset += count * ncols
+            col = 0
+            for (pname, count_type, ptype), length in zip(properties, lengths, strict=True):
+                if count_type is not None:
+                    if not np.all(table[:, col] == length):
+                        raise ValueError('Only PLY lists of constant length are supported.')
+                    col += 1
+                ncol = 1 if length is None else length
+                data[name, pname] = table[:, col : col + ncol].astype(PLY_DTYPES[ptype])
+                col += ncol
+            continue
+
+        fields = []
+        for (pname, count_type, ptype), length in zip(properties, lengths, strict=True):
+            ptype = np.dtype(PLY_DTYPES[ptype]).newbyteorder(byteorder)
+            if count_type is None:
+                fields.append((pname, ptype))
+            else:
+                ctype = np.dtype(PLY_DTYPES[count_type]).newbyteorder(byteorder)
+                fields += [(f'{pname}_count', ctype), (pname, ptype, (length,))]
+        table = np.frombuffer(body, np.dtype(fields), count, offset)
+        offset += table.nbytes
+        for (pname, count_type, _), length in zip(properties, lengths, strict=True):
+            if count_type is not None and not np.all(table[f'{pname}_count'] == length):
+                raise ValueError('Only PLY lists of constant length are supported.')
+            data[name, pname] = table[pname].reshape((count, -1))
+
+    vertices = np.hstack([data['vertex', axis] for axis in 'xyz'])
+    faces = data.get(('face', 'vertex_indices'), data.get(('face', 'vertex_index')))
+    return vertices, faces
+
+
 def ply2gii(in_file, metadata, out_file=None):
     """Convert from ply to GIfTI"""
     from pathlib import Path
@@ -733,16 +949,15 @@ def ply2gii(in_file, metadata, out_file=None):
         GiftiMetaData,
     )
     from numpy import eye
-    from pyntcloud import PyntCloud
 
     in_file = Path(in_file)
-    surf = PyntCloud.from_file(str(in_file))
+    vertices, faces = read_ply(in_file)
 
     # Update centroid metadata
     metadata.update(
         zip(
             ('SurfaceCenterX', 'SurfaceCenterY', 'SurfaceCenterZ'),
-            [f'{c:.4f}' for c in surf.centroid],
+            [f'{c:.4f}' for c in vertices.mean(axis=0)],
             strict=False,
         )
     )
@@ -750,14 +965,14 @@ def ply2gii(in_file, metadata, out_file=None):
     # Prepare data arrays
     da = (
         GiftiDataArray(
-            data=surf.xyz.astype('float32'),
+            data=vertices.astype('float32'),
             datatype='NIFTI_TYPE_FLOAT32',
             intent='NIFTI_INTENT_POINTSET',
             meta=GiftiMetaData.from_dict(metadata),
             coordsys=GiftiCoordSystem(xform=eye(4), xformspace=3),
         ),
         GiftiDataArray(
-            data=surf.mesh.values,
+            data=faces.astype('int32'),
             datatype='NIFTI_TYPE_INT32',
             intent='NIFTI_INTENT_TRIANGLE',
             coordsys=None,
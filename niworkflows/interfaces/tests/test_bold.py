@@ -0,0 +1,87 @@
+# emacs: -*- mode: python; py-indent-offset: 4; indent-tabs-mode: nil -*-
+# vi: set ft=python sts=4 ts=4 sw=4 et:
+#
+# Copyright 2021 The NiPreps Developers <nipreps@gmail.com>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# We support and encourage derived works from this project, please read
+# about our expectations at
+#
+#     https://www.nipreps.org/community/licensing/
+#
+"""Test BOLD utilities."""
+
+from pathlib import Path
+
+import nibabel as nb
+import numpy as np
+import pytest
+
+from ..bold import BOLDPreflight, NonsteadyStatesDetector
+from ..header import ValidateImage
+from ..images import RobustAverage
+
+
+@pytest.mark.parametrize('ext', ['.nii', '.nii.gz'])
+@pytest.mark.parametrize('valid', [True, False])
+@pytest.mark.parametrize('t_mask', [None, [False] * 20 + [True] * 5 + [False] * 25])
+def test_BOLDPreflight(tmp_path, ext, valid, t_mask):
+    """Check the fused interface matches the separate interfaces chained together."""
+    rng = np.random.default_rng(20)
+    data = rng.normal(1000, 50, size=(10, 11, 12, 50))
+    data[..., :3] *= 3  # Nonsteady states
+    img = nb.Nifti1Image(data.astype('int16'), np.diag([2.0, 2.0, 2.0, 1.0]))
+    img.header.set_slope_inter(0.5, 10)
+    img.header.extensions.append(nb.nifti1.Nifti1Extension('comment', b'preflight'))
+    img.header.set_qform(img.affine, code=1 if valid else 0)
+
+    in_file = tmp_path / f'bold{ext}'
+    img.to_filename(in_file)
+
+    for name in ('fused', 'separate'):
+        (tmp_path / name).mkdir()
+
+    fused = BOLDPreflight(in_file=str(in_file), mc_method=None)
+    if t_mask is not None:
+        fused.inputs.t_mask = t_mask
+    fused = fused.run(cwd=tmp_path / 'fused').outputs
+
+    validated = ValidateImage(in_file=str(in_file)).run(cwd=tmp_path / 'separate').outputs
+    average = RobustAverage(in_file=validated.out_file, mc_method=None)
+    if t_mask is None:
+        detected = NonsteadyStatesDetector(in_file=validated.out_file).run().outputs
+        assert fused.n_dummy == detected.n_dummy == 3
+        assert fused.t_mask == detected.t_mask
+        average.inputs.t_mask = detected.t_mask
+    else:
+        assert fused.t_mask == t_mask
+        average.inputs.t_mask = t_mask
+    average = average.run(cwd=tmp_path / 'separate').outputs
+
+    assert (fused.out_file == str(in_file)) is valid
+    assert Path(fused.out_report).read_text() == Path(validated.out_report).read_text()
+
+    fused_img = nb.load(fused.out_file)
+    validated_img = nb.load(validated.out_file)
+    assert np.allclose(fused_img.affine, validated_img.affine)
+    assert fused_img.header.get_qform(coded=True)[1] == validated_img.header['qform_code']
+    # The fused interface copies the data block verbatim, without re-scaling it
+    assert np.array_equal(fused_img.dataobj, nb.load(in_file).dataobj)
+    assert np.allclose(fused_img.dataobj, validated_img.dataobj, atol=1)
+    assert fused_img.header.extensions == img.header.extensions
+
+    assert np.allclose(fused.out_drift, average.out_drift)
+    assert np.allclose(
+        nb.load(fused.out_avg).get_fdata(), nb.load(average.out_file).get_fdata(), rtol=1e-4
+    )
@@ -88,3 +88,90 @@ def test__create_cifti_image(tmp_path):
 
     # Brain model voxels are indexed in Fortran order (fastest first)
     assert np.array_equal(bm.voxel[:4], [[0, 0, 0], [1, 0, 0], [0, 1, 0], [1, 1, 0]])
+
+
+@pytest.mark.parametrize('dtype', ['f4', 'i2'])
+def test__create_cifti_image_streaming(tmp_path, monkeypatch, dtype):
+    rng = np.random.default_rng(1234)
+    bold_data = (rng.normal(size=(4, 5, 6, 11)) * 100).astype(dtype)
+    bold_img = nb.Nifti1Image(bold_data, np.eye(4))
+    bold_img.set_data_dtype(dtype)
+    labels = np.full((4, 5, 6), 16, 'u1')
+    labels[:2] = 8
+    label_img = nb.Nifti1Image(labels, np.eye(4))
+
+    surf_data = rng.normal(size=(11, 10)).astype('f4')
+    surf_img = nb.GiftiImage(darrays=[nb.gifti.GiftiDataArray(d) for d in surf_data])
+    roi = np.ones(10, dtype='i4')
+    roi[:3] = 0
+    roi_img = nb.GiftiImage(darrays=[nb.gifti.GiftiDataArray(roi)])
+
+    bold_file = tmp_path / 'bold.nii.gz'
+    volume_label = tmp_path / 'label.nii'
+    surf_file = str(tmp_path / 'bold.func.gii')
+    roi_file = str(tmp_path / 'roi.label.gii')
+    bold_img.to_filename(bold_file)
+    label_img.to_filename(volume_label)
+    surf_img.to_filename(surf_file)
+    roi_img.to_filename(roi_file)
+
+    structures = {
+        'CIFTI_STRUCTURE_CORTEX_LEFT': None,
+        'CIFTI_STRUCTURE_BRAIN_STEM': (16,),
+        'CIFTI_STRUCTURE_CEREBELLUM_LEFT': (8,),
+    }
+    with mock.patch('niworkflows.interfaces.cifti.CIFTI_STRUCT_WITH_LABELS', structures):
+        (tmp_path / 'full').mkdir()
+        monkeypatch.chdir(tmp_path / 'full')
+        full = nb.load(
+            _create_cifti_image(bold_file, volume_label, (surf_file,) * 2, (roi_file,) * 2, 2.0)
+        )
+        (tmp_path / 'stream').mkdir()
+        monkeypatch.chdir(tmp_path / 'stream')
+        stream = nb.load(
+            _create_cifti_image(
+                bold_file, volume_label, (surf_file,) * 2, (roi_file,) * 2, 2.0, chunk_size=4
+            )
+        )
+
+    assert stream.shape == full.shape == (11, 7 + 120)
+    assert stream.get_data_dtype() == full.get_data_dtype() == np.dtype(dtype)
+    assert stream.header.to_xml() == full.header.to_xml()
+    assert np.allclose(stream.get_fdata(), full.get_fdata())
+    assert np.allclose(stream.get_fdata()[:, :7], surf_data[:, 3:], atol=1e-2)
+
+
+def test__create_cifti_image_streaming_memory(tmp_path, monkeypatch):
+    import tracemalloc
+
+    bold_data = np.ones((10, 10, 10, 1024), dtype='f4')
+    bold_file = tmp_path / 'bold.nii'
+    volume_label = tmp_path / 'label.nii'
+    nb.Nifti1Image(bold_data, np.eye(4)).to_filename(bold_file)
+    nb.Nifti1Image(np.full((10, 10, 10), 16, 'u1'), np.eye(4)).to_filename(volume_label)
+
+    # Surfaces hold as many grayordinates as the volume
+    surf_data = np.ones((1024, 1000), dtype='f4')
+    surf_file = str(tmp_path / 'bold.func.gii')
+    roi_file = str(tmp_path / 'roi.label.gii')
+    nb.GiftiImage(darrays=[nb.gifti.GiftiDataArray(d) for d in surf_data]).to_filename(surf_file)
+    nb.GiftiImage(darrays=[nb.gifti.GiftiDataArray(np.ones(1000, 'i4'))]).to_filename(roi_file)
+    monkeypatch.chdir(tmp_path)
+
+    def _peak(**kwargs):
+        tracemalloc.start()
+        with mock.patch(
+            'niworkflows.interfaces.cifti.CIFTI_STRUCT_WITH_LABELS',
+            {'CIFTI_STRUCTURE_CORTEX_LEFT': None, 'CIFTI_STRUCTURE_BRAIN_STEM': (16,)},
+        ):
+            _create_cifti_image(
+                bold_file, volume_label, (surf_file,) * 2, (roi_file,) * 2, 2.0, **kwargs
+            )
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return peak
+
+    # The first call also absorbs allocations of lazy imports
+    assert _peak() > bold_data.nbytes + surf_data.nbytes
+    # Peak memory of the streaming writer is bounded by the chunk, not the time series
+    assert _peak(chunk_size=8) < (bold_data.nbytes + surf_data.nbytes) / 4
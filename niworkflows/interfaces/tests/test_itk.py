@@ -29,7 +29,7 @@ from nipype.interfaces.ants.base import Info
 from nipype.pipeline import engine as pe
 
 from ... import data
-from ..itk import MCFLIRT2ITK, _applytfms
+from ..itk import MCFLIRT2ITK, MultiApplyTransforms, _applytfms
 from .data import load_test_data
 
 
@@ -137,3 +137,57 @@ def test_MCFLIRT2ITK(tmp_path):
             ]
         ),
     )
+
+
+@pytest.mark.parametrize('merge_outputs', [True, False])
+def test_MultiApplyTransforms_python(tmp_path, merge_outputs):
+    """Check the python engine against integer shifts, which are resampled exactly."""
+    import nibabel as nb
+    import nitransforms as nt
+
+    rng = np.random.default_rng(40)
+    affine = np.diag([1.0, 1.0, 1.0, 1.0])
+    affine[:3, 3] = -10.0
+    data = rng.uniform(1, 100, size=(3, 20, 20, 20)).astype('float32')
+    in_files = []
+    for i, volume in enumerate(data):
+        in_files.append(str(tmp_path / f'vol{i}.nii.gz'))
+        nb.Nifti1Image(volume, affine).to_filename(in_files[-1])
+
+    # Per-volume translations of i mm along x, and a displacement field of 1 mm along y
+    matrices = np.stack([np.eye(4)] * len(in_files))
+    matrices[:, 0, 3] = np.arange(len(in_files))
+    nt.linear.LinearTransformsMapping(matrices).to_filename(tmp_path / 'hmc.txt', fmt='itk')
+    field = np.zeros((20, 20, 20, 1, 3), dtype='float32')
+    field[..., 1] = -1.0  # RAS+ displacements are stored in LPS+ by ITK
+    field_img = nb.Nifti1Image(field, affine)
+    field_img.header.set_intent('vector')
+    field_img.to_filename(tmp_path / 'field.nii.gz')
+
+    result = MultiApplyTransforms(
+        input_image=in_files,
+        reference_image=in_files[0],
+        transforms=[str(tmp_path / 'field.nii.gz'), str(tmp_path / 'hmc.txt')],
+        interpolation='Linear',
+        float=True,
+        engine='python',
+        merge_outputs=merge_outputs,
+        num_threads=2,
+        save_cmd=True,
+    ).run(cwd=tmp_path)
+
+    if merge_outputs:
+        out_img = nb.load(result.outputs.out_file)
+        out_data = np.moveaxis(out_img.get_fdata(), -1, 0)
+    else:
+        assert len(result.outputs.out_files) == len(in_files)
+        out_img = nb.load(result.outputs.out_files[-1])
+        out_data = np.stack([nb.load(f).get_fdata() for f in result.outputs.out_files])
+
+    assert out_img.get_data_dtype() == np.float32
+    assert np.allclose(out_img.affine, affine)
+    for i, (volume, resampled) in enumerate(zip(data, out_data, strict=True)):
+        assert np.allclose(resampled[: 20 - i, :19], volume[i:, 1:], atol=1e-4)
+        # Samples falling outside the moving image take the default value
+        assert np.all(resampled[:, 19] == 0)
+        assert np.all(resampled[20 - i :] == 0)
@@ -27,6 +27,7 @@ from pathlib import Path
 
 import nibabel as nb
 import numpy as np
+import pytest
 
 from niworkflows.interfaces.morphology import (
     BinaryDilation,
@@ -74,3 +75,127 @@ def test_BinaryDilation_interface(tmpdir):
     out_data = np.asanyarray(nb.load(out_final).dataobj, dtype='uint8')
 
     assert np.all(out_data[data] == 0)
+
+
+def _synthetic_segmentation(shape=(40, 44, 38)):
+    """Nested blobs of WM, GM and CSF (T1w labels), with some stray voxels."""
+    rng = np.random.default_rng(38)
+    grid = np.indices(shape) - (np.array(shape).reshape(3, 1, 1, 1) / 2)
+    radius = np.sqrt((grid**2).sum(0))
+    segm = np.zeros(shape, dtype='uint8')
+    segm[radius < 16] = 1
+    segm[radius < 13] = 2
+    segm[radius < 8] = 3
+    noise = rng.random(shape) < 0.02
+    segm[noise] = rng.integers(1, 4, size=noise.sum())
+    segm[radius >= 17] = 0
+    return segm, radius < 14
+
+
+def test_AtroposRefinement(tmp_path):
+    """Check the in-memory refinement runs end to end on files."""
+    from niworkflows.interfaces.morphology import (
+        AtroposRefinement,
+        refine_atropos_segmentation,
+    )
+
+    segm, mask = _synthetic_segmentation()
+    affine = np.diag([1.2, 1.2, 1.2, 1.0])
+    nb.Nifti1Image(segm, affine).to_filename(tmp_path / 'segm.nii.gz')
+    nb.Nifti1Image(mask.astype('uint8'), affine).to_filename(tmp_path / 'mask.nii.gz')
+
+    result = (
+        AtroposRefinement(
+            in_segm=str(tmp_path / 'segm.nii.gz'),
+            in_mask=str(tmp_path / 'mask.nii.gz'),
+            segmentation_model=(3, 1, 2, 3),
+        )
+        .run(cwd=tmp_path)
+        .outputs
+    )
+
+    expected = refine_atropos_segmentation(np.pad(segm, 10), np.pad(mask, 10), (3, 1, 2, 3))
+    outputs = [result.out_mask, result.out_segm] + result.out_tpms
+    assert len(outputs) == len(expected)
+    for out_file, data in zip(outputs, expected, strict=True):
+        img = nb.load(out_file)
+        assert img.shape == segm.shape
+        assert img.get_data_dtype() == np.float32
+        assert np.allclose(img.affine, affine)
+        assert np.array_equal(img.get_fdata(), data[10:-10, 10:-10, 10:-10])
+
+    refined = nb.load(result.out_segm).get_fdata()
+    assert set(np.unique(refined)) == {0, 2, 3}
+    assert np.all(nb.load(result.out_mask).get_fdata()[mask] == 1)
+
+
+def _has_ants():
+    from nipype.interfaces.ants.base import Info
+
+    return Info.version() is not None
+
+
+@pytest.mark.skipif(not _has_ants(), reason='Needs ANTs')
+def test_AtroposRefinement_imagemath(tmp_path, monkeypatch):
+    """Compare the refinement against the ImageMath chain it replaces."""
+    from nipype.interfaces.ants import ImageMath, MultiplyImages
+
+    from niworkflows.interfaces.morphology import AtroposRefinement
+
+    monkeypatch.chdir(tmp_path)
+    segm, mask = _synthetic_segmentation()
+    nb.Nifti1Image(segm, np.eye(4)).to_filename('segm.nii.gz')
+    nb.Nifti1Image(mask.astype('uint8'), np.eye(4)).to_filename('mask.nii.gz')
+
+    def _im(operation, op1, op2=None, **kwargs):
+        return (
+            ImageMath(operation=operation, op1=op1, op2=op2, **kwargs).run().outputs.output_image
+        )
+
+    def _mult(first, second, name):
+        return (
+            MultiplyImages(
+                dimension=3,
+                first_input=first,
+                second_input=second,
+                output_product_image=name,
+            )
+            .run()
+            .outputs.output_product_image
+        )
+
+    def _select(in_segm, label, name):
+        img = nb.load(in_segm)
+        data = np.uint8(np.asanyarray(img.dataobj).astype('uint8') == label)
+        img.__class__(data, img.affine, img.header).to_filename(name)
+        return str(Path(name).absolute())
+
+    pad_segm = _im('PadImage', str(Path('segm.nii.gz').absolute()), '10', copy_header=False)
+    pad_mask = _im('PadImage', str(Path('mask.nii.gz').absolute()), '10', copy_header=False)
+    get_wm = _im('GetLargestComponent', _select(pad_segm, 3, 'wm.nii.gz'))
+    get_gm = _im('GetLargestComponent', _select(pad_segm, 2, 'gm.nii.gz'))
+    csf = _select(pad_segm, 1, 'csf.nii.gz')
+    mult_gm = _mult(get_gm, _im('FillHoles', get_gm, '2'), 'mult_gm.nii.gz')
+    relabel_wm = _mult(get_wm, 3, 'relabel_wm.nii.gz')
+    add_gm = _im('addtozero', mult_gm, _im('ME', csf, '10'))
+    relabel_gm = _mult(add_gm, 2, 'relabel_gm.nii.gz')
+    add_gm_wm = _im('addtozero', relabel_wm, relabel_gm)
+    brain = _im(
+        'addtozero', _select(add_gm_wm, 3, 'wm2.nii.gz'), _select(add_gm_wm, 2, 'gm2.nii.gz')
+    )
+    brain = _im('MD', _im('GetLargestComponent', _im('ME', brain, '2')), '4')
+    brain = _im('addtozero', _im('FillHoles', brain, '2'), pad_mask)
+    brain = _im('ME', _im('MD', brain, '5'), '5')
+    chain = [
+        _im('PadImage', fname, '-10') for fname in (brain, add_gm_wm, csf, relabel_gm, relabel_wm)
+    ]
+
+    result = AtroposRefinement(
+        in_segm=str(Path('segm.nii.gz').absolute()),
+        in_mask=str(Path('mask.nii.gz').absolute()),
+        segmentation_model=(3, 1, 2, 3),
+    ).run()
+
+    outputs = [result.outputs.out_mask, result.outputs.out_segm] + result.outputs.out_tpms
+    for expected, out_file in zip(chain, outputs, strict=True):
+        assert np.array_equal(nb.load(out_file).get_fdata(), nb.load(expected).get_fdata())
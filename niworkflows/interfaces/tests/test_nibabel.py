@@ -34,11 +34,13 @@ import pytest
 from ..nibabel import (
     ApplyMask,
     Binarize,
+    IntensityClip,
     MapLabels,
     MergeROIs,
     MergeSeries,
     ReorientImage,
     SplitSeries,
+    _robust_percentiles,
 )
 
 
@@ -333,3 +335,57 @@ def test_reorient_image(tmpdir, in_ornt, out_ornt):
     # cleanup
     for f in (in_file, target_file, out_file):
         Path(f).unlink()
+
+
+def _phantom(shape=(60, 72, 64), seed=2021):
+    rng = np.random.default_rng(seed)
+    grid = np.indices(shape, dtype='float32')
+    center = np.array(shape, dtype='float32').reshape(3, 1, 1, 1) / 2
+    radius = np.array(shape, dtype='float32').reshape(3, 1, 1, 1) / 3
+    data = 1000 * np.exp(-(((grid - center) / radius) ** 2).sum(0))
+    data += rng.normal(0, 30, shape)
+    data[rng.random(shape) < 1e-3] = 1e5  # Spikes
+    return data.astype('float32')
+
+
+@pytest.mark.parametrize('nonnegative', [True, False])
+def test_robust_percentiles(nonnegative):
+    from scipy import ndimage
+    from skimage.morphology import ball
+
+    data = _phantom()
+    percentiles = (35.0, 99.98)
+    denoised = ndimage.median_filter(data, footprint=ball(3))
+
+    # The median filter is exactly evaluated on the nodes of the sampling grid
+    sampled = denoised[::2, ::2, ::2]
+    sampled = sampled[sampled > 0] if nonnegative else sampled
+    fast = _robust_percentiles(data, percentiles, nonnegative, max_samples=data.size // 8)
+    assert np.array_equal(fast, np.percentile(sampled, percentiles))
+
+    # And the thresholds stay within 1% of the intensity range from those on every voxel
+    full = _robust_percentiles(data, percentiles, nonnegative)
+    full_denoised = denoised[denoised > 0] if nonnegative else denoised
+    assert np.array_equal(full, np.percentile(full_denoised, percentiles))
+    for max_samples in (2**16, 2**14):
+        fast = _robust_percentiles(data, percentiles, nonnegative, max_samples=max_samples)
+        assert np.allclose(fast, full, rtol=0, atol=0.01 * (full[1] - full[0]))
+
+
+def test_IntensityClip(tmp_path):
+    in_file = tmp_path / 'phantom.nii.gz'
+    nb.Nifti1Image(_phantom(), np.eye(4)).to_filename(in_file)
+
+    # Thresholds are computed on every voxel unless subsampling is requested
+    assert IntensityClip().inputs.max_samples == 0
+
+    outputs = {}
+    for max_samples in (0, 2**14):
+        (tmp_path / str(max_samples)).mkdir()
+        clip = IntensityClip(in_file=str(in_file), max_samples=max_samples)
+        result = clip.run(cwd=tmp_path / str(max_samples)).outputs.out_file
+        outputs[max_samples] = np.asanyarray(nb.load(result).dataobj).astype(int)
+
+    assert outputs[0].max() == 255
+    # Slightly different thresholds barely change the clipped image
+    assert np.abs(outputs[0] - outputs[2**14]).max() <= 2
@@ -20,7 +20,15 @@
 #
 #     https://www.nipreps.org/community/licensing/
 #
-from ..norm import SpatialNormalization
+import os
+from pathlib import Path
+from types import SimpleNamespace
+
+import nibabel as nb
+import numpy as np
+import pytest
+
+from ..norm import SpatialNormalization, _DigestCache
 
 
 def test_get_settings():
@@ -32,3 +40,80 @@ def test_get_settings():
     norm = SpatialNormalization(moving='T1w', flavor='testing')
     settings = norm._get_settings()
     assert len(settings) == 3
+
+
+def test_DigestCache_lru(tmp_path):
+    cache = _DigestCache(tmp_path / 'cache', max_entries=2)
+    src = tmp_path / 'src.txt'
+    for i in range(2):
+        src.write_text(f'{i}')
+        cache.put(f'key{i}', src, '.txt')
+        os.utime(tmp_path / 'cache' / f'key{i}.txt', ns=(i, i))
+
+    # Reading an entry marks it as recently used
+    assert cache.get('key0', '.txt').read_text() == '0'
+    cache.put('key2', src, '.txt')
+    assert cache.get('key1', '.txt') is None
+    assert cache.get('key0', '.txt') is not None
+    assert sorted(p.name for p in cache.path.iterdir()) == ['key0.txt', 'key2.txt']
+
+
+def test_SpatialNormalization_cache(tmp_path, monkeypatch):
+    """Check that initializations and template-derived inputs are reused across runs."""
+    import niworkflows.utils.misc
+
+    from .. import norm
+
+    rng = np.random.default_rng(39)
+    for name in ('moving', 'template', 'template_mask'):
+        data = rng.random((10, 10, 10)) if name != 'template_mask' else np.ones((10, 10, 10))
+        nb.Nifti1Image(data.astype('float32'), np.eye(4)).to_filename(tmp_path / f'{name}.nii.gz')
+
+    calls = {'templates': 0, 'masks': 0, 'inits': 0}
+    mask = norm.mask
+
+    def _get_template_specs(template, template_spec=None, **kwargs):
+        calls['templates'] += 1
+        return str(tmp_path / 'template.nii.gz'), {'resolution': 2}
+
+    def _mask(*args):
+        calls['masks'] += 1
+        return mask(*args)
+
+    class _AffineInitializer:
+        def __init__(self, **inputs):
+            self.inputs = inputs
+
+        def run(self):
+            calls['inits'] += 1
+            out_file = os.path.abspath('transform.mat')
+            Path(out_file).write_text(self.inputs['moving_image'])
+            return SimpleNamespace(
+                runtime=SimpleNamespace(cwd=os.getcwd()),
+                outputs=SimpleNamespace(out_file=out_file),
+            )
+
+    monkeypatch.setattr(niworkflows.utils.misc, 'get_template_specs', _get_template_specs)
+    monkeypatch.setattr(
+        norm, 'get_template', lambda *a, **k: str(tmp_path / 'template_mask.nii.gz')
+    )
+    monkeypatch.setattr(norm, 'mask', _mask)
+    monkeypatch.setattr(norm, 'AffineInitializer', _AffineInitializer)
+    monkeypatch.setenv(norm.NORM_CACHE_ENV, str(tmp_path / 'cache'))
+
+    for i in range(3):
+        workdir = tmp_path / f'run{i}'
+        workdir.mkdir()
+        monkeypatch.chdir(workdir)
+        interface = SpatialNormalization(
+            moving_image=str(tmp_path / 'moving.nii.gz'),
+            settings=[],  # Stop after the initialization
+            flavor='testing',
+        )
+        with pytest.raises(RuntimeError, match='after 0 retries'):
+            interface._run_interface(SimpleNamespace(cwd=str(workdir)))
+        assert (workdir / 'fixed_masked.nii.gz').exists()
+        assert (workdir / 'transform.mat').exists()
+
+    assert calls == {'templates': 1, 'masks': 1, 'inits': 1}
+    assert len(list((tmp_path / 'cache').iterdir())) == 3
@@ -0,0 +1,198 @@
+# emacs: -*- mode: python; py-indent-offset: 4; indent-tabs-mode: nil -*-
+# vi: set ft=python sts=4 ts=4 sw=4 et:
+#
+# Copyright 2021 The NiPreps Developers <nipreps@gmail.com>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# We support and encourage derived works from this project, please read
+# about our expectations at
+#
+#     https://www.nipreps.org/community/licensing/
+#
+"""Test surface interfaces."""
+
+import nibabel as nb
+import numpy as np
+import pytest
+from nibabel.tmpdirs import InGivenDirectory
+
+from .. import surf
+
+ITK_AFFINE = """\
+#Insight Transform File V1.0
+#Transform 0
+Transform: AffineTransform_double_3_3
+Parameters: 1 0 0 0 1 0 0 0 1 1.0 2.0 3.0
+FixedParameters: 0 0 0
+"""
+
+
+@pytest.fixture
+def surf_file(tmp_path):
+    rng = np.random.default_rng(42)
+    gii = nb.GiftiImage(
+        darrays=[
+            nb.gifti.GiftiDataArray(
+                (rng.normal(size=(500, 3)) * 50).astype('f4'), intent='NIFTI_INTENT_POINTSET'
+            ),
+            nb.gifti.GiftiDataArray(
+                rng.integers(500, size=(900, 3), dtype='i4'), intent='NIFTI_INTENT_TRIANGLE'
+            ),
+        ]
+    )
+    out_file = tmp_path / 'lh.white.surf.gii'
+    gii.to_filename(out_file)
+    return out_file
+
+
+def test_GiftiToCSV_roundtrip(tmp_path, surf_file):
+    coords = nb.load(surf_file).darrays[0].data
+
+    with InGivenDirectory(tmp_path):
+        csv_file = surf.GiftiToCSV(in_file=surf_file, itk_lps=True).run().outputs.out_file
+        data = np.loadtxt(csv_file, delimiter=',', skiprows=1)
+        assert data.shape == (coords.shape[0], 6)
+        assert np.allclose(data[:, :2], -coords[:, :2], atol=1e-5)
+        assert np.allclose(data[:, 2], coords[:, 2], atol=1e-5)
+        assert not data[:, 3:].any()
+
+        out_file = (
+            surf.CSVToGifti(in_file=csv_file, gii_file=surf_file, itk_lps=True)
+            .run()
+            .outputs.out_file
+        )
+        assert np.allclose(nb.load(out_file).darrays[0].data, coords, atol=1e-5)
+
+
+def test_apply_transforms_to_points(tmp_path):
+    affine = tmp_path / 'affine.txt'
+    affine.write_text(ITK_AFFINE)
+
+    # Constant displacement field of 1 mm along ITK's X (i.e., towards L)
+    field = np.zeros((10, 10, 10, 1, 3), dtype='f4')
+    field[..., 0] = 1.0
+    hdr = nb.Nifti1Header()
+    hdr.set_intent('vector')
+    warp = tmp_path / 'warp.nii.gz'
+    nb.Nifti1Image(field, np.eye(4), hdr).to_filename(warp)
+
+    points = np.array([[2.0, 3.0, 4.0], [5.5, 1.5, 2.5], [50.0, 50.0, 50.0]])
+
+    # Translation in LPS, mapped to RAS
+    assert np.allclose(
+        surf.apply_transforms_to_points(points, [affine]), points + [-1.0, -2.0, 3.0]
+    )
+
+    # Points out of the field are not displaced
+    assert np.allclose(
+        surf.apply_transforms_to_points(points, [warp]),
+        points + [[-1.0, 0.0, 0.0], [-1.0, 0.0, 0.0], [0.0, 0.0, 0.0]],
+    )
+
+    # The last transform is applied first (here, the affine brings the point into the field)
+    point = [[10.0, 3.0, 4.0]]
+    assert np.allclose(surf.apply_transforms_to_points(point, [warp, affine]), [[8.0, 1.0, 7.0]])
+    assert np.allclose(surf.apply_transforms_to_points(point, [affine, warp]), [[9.0, 1.0, 7.0]])
+
+
+def test_GiftiApplyTransforms(tmp_path, surf_file):
+    coords = nb.load(surf_file).darrays[0].data
+    affine = tmp_path / 'affine.txt'
+    affine.write_text(ITK_AFFINE)
+
+    with InGivenDirectory(tmp_path):
+        out_file = (
+            surf.GiftiApplyTransforms(in_file=surf_file, transforms=[affine])
+            .run()
+            .outputs.out_file
+        )
+    out = nb.load(out_file).darrays[0].data
+    assert out.dtype == coords.dtype
+    assert np.allclose(out, coords + [-1.0, -2.0, 3.0], atol=1e-4)
+
+
+def test_vertex_normals():
+    # Square pyramid: the apex is shared by four faces, the base corners by two
+    vertices = np.array(
+        [[0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0], [0.5, 0.5, 1], [5, 5, 5]], dtype='f4'
+    )
+    faces = np.array([[0, 1, 4], [1, 2, 4], [2, 3, 4], [3, 0, 4]])
+
+    norms = surf.vertex_normals(vertices, faces)
+    assert norms.dtype == np.float32
+
+    # Reference: accumulate one face at a time
+    tris = vertices[faces]
+    facenorms = np.cross(tris[:, 1] - tris[:, 0], tris[:, 2] - tris[:, 0])
+    facenorms /= np.linalg.norm(facenorms, axis=1, keepdims=True)
+    expected = np.zeros_like(vertices)
+    for face, facenorm in zip(faces, facenorms, strict=True):
+        expected[face] += facenorm
+    expected[:5] /= np.linalg.norm(expected[:5], axis=1, keepdims=True)
+
+    assert np.allclose(norms, expected, atol=1e-6)
+    assert np.allclose(norms[4], [0, 0, 1], atol=1e-6)
+    # Unreferenced vertices have no normal
+    assert not norms[5].any()
+
+
+@pytest.mark.parametrize('fmt', ['binary_little_endian', 'binary_big_endian', 'ascii'])
+def test_read_ply(tmp_path, fmt):
+    rng = np.random.default_rng(0)
+    vertices = rng.normal(size=(20, 3)).astype('f4')
+    faces = rng.integers(20, size=(30, 3)).astype('i4')
+    header = '\n'.join(
+        [
+            'ply',
+            f'format {fmt} 1.0',
+            'comment generated by a test',
+            f'element vertex {len(vertices)}',
+            'property float x',
+            'property float y',
+            'property float z',
+            'property float value',
+            f'element face {len(faces)}',
+            'property list uchar int vertex_indices',
+            'end_header',
+            '',
+        ]
+    ).encode()
+    values = np.hstack((vertices, np.ones((len(vertices), 1), dtype='f4')))
+    if fmt == 'ascii':
+        body = ''.join(f'{x} {y} {z} {v}\n' for x, y, z, v in values.tolist())
+        body += ''.join(f'3 {a} {b} {c}\n' for a, b, c in faces.tolist())
+        body = body.encode()
+    else:
+        order = '<' if fmt == 'binary_little_endian' else '>'
+        face_data = np.zeros(len(faces), dtype=[('n', 'u1'), ('idx', f'{order}i4', (3,))])
+        face_data['n'] = 3
+        face_data['idx'] = faces
+        body = values.astype(f'{order}f4').tobytes() + face_data.tobytes()
+
+    ply_file = tmp_path / 'mesh.ply'
+    ply_file.write_bytes(header + body)
+
+    out_vertices, out_faces = surf.read_ply(ply_file)
+    assert np.allclose(out_vertices, vertices)
+    assert np.array_equal(out_faces, faces)
+
+
+def test_SurfacesToPointCloud(tmp_path, surf_file):
+    gii = nb.load(surf_file)
+    with InGivenDirectory(tmp_path):
+        out_file = surf.SurfacesToPointCloud(in_files=[surf_file]).run().outputs.out_file
+
+    vertices, faces = surf.read_ply(out_file)
+    assert faces is None
+    assert np.allclose(vertices, gii.darrays[0].data)
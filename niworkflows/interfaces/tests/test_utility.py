@@ -24,9 +24,11 @@
 
 from pathlib import Path
 
+import numpy as np
+import pandas as pd
 import pytest
 
-from ..utility import KeySelect, _tsv2json
+from ..utility import AddTSVHeader, KeySelect, _tsv2json
 
 
 def test_KeySelect():
@@ -44,3 +46,19 @@ def test_tsv2json(tmp_path):
     assert res == {}
     res = _tsv2json(tmp_path / 'empty.tsv', None, 'any_column', additional_metadata={'a': 'b'})
     assert res == {}
+
+
+def test_AddTSVHeader(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    # FSL-style motion parameters (multiple spaces, trailing blank line) and one row only
+    (tmp_path / 'motion.par').write_text('0.1  -0.2  3e-05\n-1  2.5  0\n\n')
+    (tmp_path / 'single.par').write_text('1 2 3\n')
+
+    for in_file, expected in (
+        ('motion.par', [[0.1, -0.2, 3e-05], [-1.0, 2.5, 0.0]]),
+        ('single.par', [[1.0, 2.0, 3.0]]),
+    ):
+        res = AddTSVHeader(in_file=in_file, columns=['a', 'b', 'c']).run()
+        df = pd.read_csv(res.outputs.out_file, sep='\t')
+        assert df.columns.tolist() == ['a', 'b', 'c']
+        assert np.allclose(df.values, expected)
@@ -26,7 +26,6 @@ import json
 import re
 from collections import OrderedDict
 
-import numpy as np
 from nipype.interfaces.base import (
     BaseInterface,
     BaseInterfaceInputSpec,
@@ -266,14 +265,10 @@ class AddTSVHeader(SimpleInterface):
             newpath=runtime.cwd,
             use_ext=False,
         )
-        data = np.loadtxt(self.inputs.in_file)
-        np.savetxt(
-            out_file,
-            data,
-            delimiter='\t',
-            header='\t'.join(self.inputs.columns),
-            comments='',
-        )
+        # Values are copied as text, avoiding a float parse/format round trip
+        rows = _read_table_rows(self.inputs.in_file)
+        with open(out_file, 'w') as ofh:
+            ofh.write('\n'.join(['\t'.join(self.inputs.columns)] + rows) + '\n')
 
         self._results['out_file'] = out_file
         return runtime
@@ -370,21 +365,40 @@ class JoinTSVColumns(SimpleInterface):
         if len(data) != len(join):
             raise ValueError('Number of columns in datasets do not match')
 
-        merged = []
-        for d, j in zip(data, join, strict=False):
-            line = '%s\t%s' % ((j, d) if self.inputs.side == 'left' else (d, j))
-            merged.append(line)
-
-        if header:
-            merged.insert(0, header)
-
+        pairs = zip(*((join, data) if self.inputs.side == 'left' else (data, join)), strict=True)
         with open(out_file, 'w') as ofh:
-            ofh.write('\n'.join(merged))
+            if header:
+                ofh.write(f'{header}\n')
+            ofh.write('\n'.join(map('\t'.join, pairs)))
 
         self._results['out_file'] = out_file
         return runtime
 
 
+def _read_table_rows(in_file):
+    """
+    Read the rows of a whitespace-delimited table as tab-separated lines.
+
+    Empty lines and comments are dropped, as :obj:`numpy.loadtxt` would do,
+    but values are not parsed.
+
+    >>> _ = Path('data.txt').write_text('# comment\\n1.0  2.0 3\\n\\n4\\t5 6.5\\n')
+    >>> _read_table_rows('data.txt')
+    ['1.0\\t2.0\\t3', '4\\t5\\t6.5']
+    >>> _ = Path('data.txt').write_text('1 2 3\\n4 5\\n')
+    >>> _read_table_rows('data.txt')
+    Traceback (most recent call last):
+    ValueError: Inconsistent number of columns in <data.txt>.
+
+    """
+    with open(in_file) as ifh:
+        rows = [line.split('#', 1)[0].split() for line in ifh]
+    rows = [fields for fields in rows if fields]
+    if len({len(fields) for fields in rows}) > 1:
+        raise ValueError(f'Inconsistent number of columns in <{in_file}>.')
+    return ['\t'.join(fields) for fields in rows]
+
+
 class _DictMergeInputSpec(BaseInterfaceInputSpec):
     in_dicts = traits.List(
         traits.Either(traits.Dict, traits.Instance(OrderedDict)),
@@ -27,8 +27,12 @@ Generalizes report generation across BIDS-Apps
 
 """
 
+import json
+import os
 import re
 from collections import defaultdict
+from functools import lru_cache
+from hashlib import sha256
 from itertools import compress
 from pathlib import Path
 
@@ -64,6 +68,31 @@ reloading the report in your browser.</object>
 </div>
 """,
 ]
+# Figures of lazy reports are only fetched when scrolled into view, the
+# aspect ratio reserves their space in the page until then
+LAZY_SVG_SNIPPET = [
+    """\
+<object class="svg-reportlet" type="image/svg+xml" data-src="./{0}" style="{1}">
+Problem loading figure {0}. If the link below works, please try \
+reloading the report in your browser.</object>
+</div>
+<div class="elem-filename">
+    Get figure file: <a href="./{0}" target="_blank">{0}</a>
+</div>
+""",
+    """\
+<img class="svg-reportlet" src="./{0}" loading="lazy" decoding="async" \
+style="width: 100%; {1}" />
+</div>
+<div class="elem-filename">
+    Get figure file: <a href="./{0}" target="_blank">{0}</a>
+</div>
+""",
+]
+ASSETS_DIR = 'assets'
+SVG_SIZE_RE = re.compile(
+    rb'<svg\b[^>]*?\bviewBox=["\'][-\d.eE+]+[ ,]+[-\d.eE+]+[ ,]+([\d.eE+]+)[ ,]+([\d.eE+]+)'
+)
 
 
 class Smallest:
@@ -170,7 +199,7 @@ class Reportlet(Element):
 
     """
 
-    def __init__(self, layout, out_dir, config=None):
+    def __init__(self, layout, out_dir, config=None, lazy=False):
         if not config:
             raise RuntimeError('Reportlet must have a config object')
 
@@ -185,6 +214,7 @@ class Reportlet(Element):
         files = layout.get(**config['bids'])
 
         self.components = []
+        self.assets = []
         for bidsfile in files:
             src = Path(bidsfile.path)
             ext = ''.join(src.suffixes)
@@ -198,15 +228,22 @@ class Reportlet(Element):
                 if desc_text:
                     desc_text = desc_text.format(**entities)
 
-                try:
-                    html_anchor = src.relative_to(out_dir)
-                except ValueError:
-                    html_anchor = src.relative_to(Path(layout.root).parent)
-                    dst = out_dir / html_anchor
-                    dst.parent.mkdir(parents=True, exist_ok=True)
-                    copyfile(src, dst, copy=True, use_hardlink=True)
+                if lazy:
+                    html_anchor, style = _store_asset(src, out_dir)
+                    self.assets.append((str(src), str(html_anchor)))
+                    contents = LAZY_SVG_SNIPPET[config.get('static', True)].format(
+                        html_anchor, style
+                    )
+                else:
+                    try:
+                        html_anchor = src.relative_to(out_dir)
+                    except ValueError:
+                        html_anchor = src.relative_to(Path(layout.root).parent)
+                        dst = out_dir / html_anchor
+                        dst.parent.mkdir(parents=True, exist_ok=True)
+                        copyfile(src, dst, copy=True, use_hardlink=True)
 
-                contents = SVG_SNIPPET[config.get('static', True)].format(html_anchor)
+                    contents = SVG_SNIPPET[config.get('static', True)].format(html_anchor)
 
                 # Our current implementations of dynamic reportlets do this themselves,
                 # however I'll leave the code here since this is potentially something we
@@ -276,8 +313,14 @@ class Report:
         packagename=None,
         reportlets_dir=None,
         subject_id=None,
+        incremental=False,
+        lazy=False,
     ):
         self.root = Path(reportlets_dir or out_dir)
+        self.incremental = incremental
+        self.lazy = lazy
+        self.fingerprint = None
+        self.cached_errors = None
 
         # Initialize structuring elements
         self.sections = []
@@ -313,8 +356,56 @@ class Report:
         if 'template_path' in settings:
             self.template_path = config.parent / settings['template_path']
 
+        if self.incremental:
+            self.fingerprint = self._fingerprint(config)
+            manifest = self._read_manifest()
+            if (
+                manifest.get('fingerprint') == self.fingerprint
+                and (self.out_dir / self.out_filename).exists()
+            ):
+                # Nothing changed since the last report was written, skip indexing
+                self.cached_errors = manifest['errors']
+                return
+
         self.index(settings['sections'])
 
+    @property
+    def manifest_path(self):
+        """Location of the manifest that records the inputs of the last generated report."""
+        return self.out_dir / '.reports' / f'{Path(self.out_filename).stem}.json'
+
+    def _read_manifest(self):
+        try:
+            return json.loads(self.manifest_path.read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def _fingerprint(self, config):
+        """
+        Summarize everything the report is built from into a hash.
+
+        Files are tracked by their path, size and modification time, so that
+        detecting changes does not require opening (or indexing) any reportlet.
+
+        """
+        error_dir = self.out_dir / f'sub-{self.subject_id}' / 'log' / self.run_uuid
+        files = [config, self.template_path]
+        files += [self.out_dir / 'logs' / f'CITATION.{ext}' for ext in ('html', 'md', 'tex')]
+        if error_dir.is_dir():
+            files += sorted(error_dir.glob('crash*.*'))
+
+        entries = [self.run_uuid, self.packagename, self.subject_id, self.lazy]
+        entries += [_stat_entry(f) for f in files]
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            # Hidden files and folders are not indexed by the BIDS layout either
+            dirnames[:] = sorted(d for d in dirnames if not d.startswith('.'))
+            entries += [
+                _stat_entry(Path(dirpath) / fname, self.root)
+                for fname in sorted(filenames)
+                if not fname.startswith('.')
+            ]
+        return sha256(json.dumps(entries).encode()).hexdigest()
+
     def init_layout(self):
         self.layout = BIDSLayout(self.root, config='figures', validate=False)
 
@@ -326,15 +417,18 @@ class Report:
         """
         # Initialize a BIDS layout
         self.init_layout()
+        all_files = self.layout.get()
         for subrep_cfg in config:
             # First determine whether we need to split by some ordering
             # (ie. sessions / tasks / runs), which are separated by commas.
             orderings = [s for s in subrep_cfg.get('ordering', '').strip().split(',') if s]
-            entities, list_combos = self._process_orderings(orderings, self.layout)
+            entities, list_combos = self._process_orderings(
+                orderings, self.layout, files=all_files
+            )
 
             if not list_combos:  # E.g. this is an anatomical reportlet
                 reportlets = [
-                    Reportlet(self.layout, self.out_dir, config=cfg)
+                    Reportlet(self.layout, self.out_dir, config=cfg, lazy=self.lazy)
                     for cfg in subrep_cfg['reportlets']
                 ]
             else:
@@ -354,7 +448,7 @@ class Report:
                     )
                     for cfg in subrep_cfg['reportlets']:
                         cfg['bids'].update({entities[i]: c[i] for i in range(len(c))})
-                        rlet = Reportlet(self.layout, self.out_dir, config=cfg)
+                        rlet = Reportlet(self.layout, self.out_dir, config=cfg, lazy=self.lazy)
                         if not rlet.is_empty():
                             rlet.title = title
                             title = None
@@ -380,6 +474,9 @@ class Report:
 
     def generate_report(self):
         """Once the Report has been indexed, the final HTML can be generated"""
+        if self.cached_errors is not None:
+            return self.cached_errors
+
         logs_path = self.out_dir / 'logs'
 
         boilerplate = []
@@ -415,24 +512,38 @@ class Report:
             )
             boiler_idx += 1
 
-        env = jinja2.Environment(
-            loader=jinja2.FileSystemLoader(searchpath=str(self.template_path.parent)),
-            trim_blocks=True,
-            lstrip_blocks=True,
-            autoescape=False,  # noqa: S701  XXX Investigate if this is a problem in nireports.
-        )
-        report_tpl = env.get_template(self.template_path.name)
+        report_tpl = _load_template(str(self.template_path), self.template_path.stat().st_mtime_ns)
         report_render = report_tpl.render(
-            sections=self.sections, errors=self.errors, boilerplate=boilerplate
+            sections=self.sections,
+            errors=self.errors,
+            boilerplate=boilerplate,
+            lazy=self.lazy,
         )
 
         # Write out report
         self.out_dir.mkdir(parents=True, exist_ok=True)
         (self.out_dir / self.out_filename).write_text(report_render, encoding='UTF-8')
+        if self.lazy:
+            assets = [
+                {'source': source, 'asset': asset}
+                for section in self.sections
+                for reportlet in section.reportlets
+                for source, asset in reportlet.assets
+            ]
+            manifest = self.out_dir / ASSETS_DIR / f'{Path(self.out_filename).stem}.json'
+            manifest.parent.mkdir(exist_ok=True)
+            manifest.write_text(
+                json.dumps({'report': self.out_filename, 'assets': assets}, indent=2)
+            )
+        if self.incremental:
+            self.manifest_path.parent.mkdir(exist_ok=True)
+            self.manifest_path.write_text(
+                json.dumps({'fingerprint': self.fingerprint, 'errors': len(self.errors)})
+            )
         return len(self.errors)
 
     @staticmethod
-    def _process_orderings(orderings, layout):
+    def _process_orderings(orderings, layout, files=None):
         """
         Generate relevant combinations of orderings with observed values.
 
@@ -442,6 +553,8 @@ class Report:
             Sections prescribing an ordering to select across sessions, acquisitions, runs, etc.
         layout : :obj:`bids.layout.BIDSLayout`
             The BIDS layout
+        files : :obj:`list` of :obj:`bids.layout.BIDSFile`, optional
+            All the files in ``layout``, if they were already queried
 
         Returns
         -------
@@ -454,7 +567,7 @@ class Report:
         # get a set of all unique entity combinations
         all_value_combos = {
             tuple(bids_file.get_entities().get(k, None) for k in orderings)
-            for bids_file in layout.get()
+            for bids_file in (layout.get() if files is None else files)
         }
         # remove the all None member if it exists
         none_member = tuple(None for k in orderings)
@@ -485,10 +598,21 @@ def run_reports(
     config=None,
     reportlets_dir=None,
     packagename=None,
+    incremental=False,
+    lazy=False,
 ):
     """
     Run the reports.
 
+    With ``incremental=True``, the report is only regenerated if its reportlets,
+    crashfiles, citation boilerplate, configuration or template changed since
+    it was last written (with ``incremental=True`` as well).
+
+    With ``lazy=True``, figures are stored once under their content hash in a
+    shared ``assets/`` folder of the output directory and only loaded by the
+    browser when scrolled into view. A manifest listing the assets of the report
+    is written next to them (``assets/sub-<label>.json``).
+
     .. testsetup::
 
         >>> from shutil import copytree
@@ -509,27 +633,115 @@ def run_reports(
         subject_id=subject_label,
         packagename=packagename,
         reportlets_dir=reportlets_dir,
+        incremental=incremental,
+        lazy=lazy,
     ).generate_report()
 
 
+@lru_cache(maxsize=8)
+def _load_template(template_path, mtime_ns=None):
+    """
+    Compile a report template, once per process.
+
+    The modification time is part of the cache key so that edited templates are reloaded.
+
+    """
+    template_path = Path(template_path)
+    env = jinja2.Environment(
+        loader=jinja2.FileSystemLoader(searchpath=str(template_path.parent)),
+        trim_blocks=True,
+        lstrip_blocks=True,
+        autoescape=False,  # noqa: S701  XXX Investigate if this is a problem in nireports.
+    )
+    return env.get_template(template_path.name)
+
+
+def _store_asset(src, out_dir):
+    """
+    Store a figure under its content hash in the shared assets folder of ``out_dir``.
+
+    Identical figures (e.g., across runs or subjects) are stored only once.
+
+    Returns
+    -------
+    asset : :obj:`~pathlib.Path`
+        The location of the asset, relative to ``out_dir``.
+    style : :obj:`str`
+        CSS declaration of the figure's aspect ratio, if it could be read from
+        the ``viewBox`` attribute of the SVG.
+
+    """
+    content = src.read_bytes()
+    asset = Path(ASSETS_DIR) / f'{sha256(content).hexdigest()[:32]}{src.suffix}'
+    dst = out_dir / asset
+    if not dst.exists():
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        # Concurrent reports may store the same asset, make the last step atomic
+        tmp = dst.with_name(f'.{dst.name}.{os.getpid()}')
+        copyfile(src, tmp, copy=True, use_hardlink=True)
+        os.replace(tmp, dst)
+
+    size = SVG_SIZE_RE.search(content[:4096])
+    style = f'aspect-ratio: {float(size[1]):g} / {float(size[2]):g};' if size else ''
+    return asset, style
+
+
+def _stat_entry(path, root=None):
+    """Identify a file by its path (relative to ``root``), size and modification time."""
+    name = str(path if root is None else path.relative_to(root))
+    try:
+        stat = path.stat()
+    except OSError:
+        return [name, None, None]
+    return [name, stat.st_size, stat.st_mtime_ns]
+
+
 def generate_reports(
-    subject_list, output_dir, run_uuid, config=None, work_dir=None, packagename=None
+    subject_list,
+    output_dir,
+    run_uuid,
+    config=None,
+    work_dir=None,
+    packagename=None,
+    incremental=False,
+    n_procs=1,
+    lazy=False,
 ):
-    """Execute run_reports on a list of subjects."""
+    """
+    Execute run_reports on a list of subjects.
+
+    With ``n_procs > 1``, subjects are distributed over a pool of processes,
+    each compiling the report template once for all the subjects it handles.
+    Error counts are collected per subject and summed as in the serial case;
+    an exception raised for any subject is re-raised once all the other
+    reports have been generated.
+
+    """
     reportlets_dir = None
     if work_dir is not None:
         reportlets_dir = Path(work_dir) / 'reportlets'
-    report_errors = [
-        run_reports(
-            output_dir,
-            subject_label,
-            run_uuid,
-            config=config,
-            packagename=packagename,
-            reportlets_dir=reportlets_dir,
-        )
-        for subject_label in subject_list
-    ]
+    kwargs = {
+        'config': config,
+        'packagename': packagename,
+        'reportlets_dir': reportlets_dir,
+        'incremental': incremental,
+        'lazy': lazy,
+    }
+    if n_procs is None or n_procs < 2 or len(subject_list) < 2:
+        report_errors = [
+            run_reports(output_dir, subject_label, run_uuid, **kwargs)
+            for subject_label in subject_list
+        ]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=min(n_procs, len(subject_list))) as pool:
+            futures = [
+                pool.submit(run_reports, output_dir, subject_label, run_uuid, **kwargs)
+                for subject_label in subject_list
+            ]
+        # Leaving the context waits for all subjects, results are kept in input order
+        report_errors = [future.result() for future in futures]
 
     errno = sum(report_errors)
     if errno:
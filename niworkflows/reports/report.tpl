@@ -159,6 +159,30 @@ div#boilerplate pre {
         else
             element.style.display = 'block';
     }
+{% if lazy %}
+
+    // Figures with a data-src attribute are only loaded when scrolled into view
+    document.addEventListener('DOMContentLoaded', function() {
+        var figures = document.querySelectorAll('object.svg-reportlet[data-src]');
+        function load(element) {
+            element.setAttribute('data', element.getAttribute('data-src'));
+            element.removeAttribute('data-src');
+        }
+        if (!('IntersectionObserver' in window)) {
+            figures.forEach(load);
+            return;
+        }
+        var observer = new IntersectionObserver(function(entries) {
+            entries.forEach(function(entry) {
+                if (entry.isIntersecting) {
+                    observer.unobserve(entry.target);
+                    load(entry.target);
+                }
+            });
+        }, {rootMargin: '500px'});
+        figures.forEach(function(element) { observer.observe(element); });
+    });
+{% endif %}
 </script>
 </body>
 </html>
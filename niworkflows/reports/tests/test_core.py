@@ -284,3 +284,135 @@ def test_subject_id(tmp_path, subject_id, out_html):
     )
     assert report.subject_id[:4] != 'sub-'
     assert report.out_filename == out_html
+
+
+def test_incremental(tmp_path, bids_sessions, monkeypatch):
+    from .. import core
+
+    reportlets_dir = Path(bids_sessions)
+    out_html = tmp_path / 'fmriprep' / 'sub-01.html'
+    kwargs = {'reportlets_dir': reportlets_dir, 'packagename': 'fmriprep', 'incremental': True}
+
+    indexed = []
+    index = Report.index
+    monkeypatch.setattr(Report, 'index', lambda self, cfg: indexed.append(1) or index(self, cfg))
+
+    assert core.run_reports(tmp_path, '01', 'fakeuuid', **kwargs) == 0
+    assert out_html.exists()
+    assert len(indexed) == 1
+
+    # Nothing changed: neither indexed nor written
+    out_html.write_text('untouched')
+    assert core.run_reports(tmp_path, '01', 'fakeuuid', **kwargs) == 0
+    assert len(indexed) == 1
+    assert out_html.read_text() == 'untouched'
+
+    # A new reportlet triggers the regeneration
+    new_svg = reportlets_dir / 'fmriprep' / 'sub-01' / 'figures' / 'sub-01_desc-new_T1w.svg'
+    new_svg.parent.mkdir(exist_ok=True)
+    new_svg.write_text('<svg/>')
+    assert core.run_reports(tmp_path, '01', 'fakeuuid', **kwargs) == 0
+    assert len(indexed) == 2
+    assert out_html.read_text() != 'untouched'
+
+    # So does a crashfile, which is accounted for in the cached error count
+    crash_dir = tmp_path / 'fmriprep' / 'sub-01' / 'log' / 'fakeuuid'
+    crash_dir.mkdir(parents=True)
+    (crash_dir / 'crash-20240101-node.txt').write_text(
+        'Traceback (most recent call last):\nError\n'
+    )
+    assert core.run_reports(tmp_path, '01', 'fakeuuid', **kwargs) == 1
+    assert core.run_reports(tmp_path, '01', 'fakeuuid', **kwargs) == 1
+    assert len(indexed) == 3
+
+    # The non-incremental mode always regenerates
+    assert core.run_reports(tmp_path, '01', 'fakeuuid', **{**kwargs, 'incremental': False}) == 1
+    assert len(indexed) == 4
+
+
+@pytest.mark.parametrize('n_procs', [1, 2])
+def test_generate_reports(tmp_path, n_procs, caplog):
+    from .. import core
+
+    f, _ = plt.subplots()
+    subjects = ['01', '02', '03']
+    for subject in subjects:
+        figures = tmp_path / 'work' / 'reportlets' / 'fmriprep' / f'sub-{subject}' / 'figures'
+        figures.mkdir(parents=True)
+        for desc in ('conform', 'reconall'):
+            f.savefig(figures / f'sub-{subject}_desc-{desc}_T1w.svg')
+    plt.close(f)
+
+    # Two crashfiles for the second subject
+    crash_dir = tmp_path / 'out' / 'fmriprep' / 'sub-02' / 'log' / 'fakeuuid'
+    crash_dir.mkdir(parents=True)
+    for node in ('a', 'b'):
+        (crash_dir / f'crash-20240101-{node}.txt').write_text(
+            'Traceback (most recent call last):\nError\n'
+        )
+
+    core._load_template.cache_clear()
+    errno = core.generate_reports(
+        subjects,
+        tmp_path / 'out',
+        'fakeuuid',
+        work_dir=tmp_path / 'work',
+        packagename='fmriprep',
+        n_procs=n_procs,
+    )
+    assert errno == 2
+    assert 'participants: 02 (2)' in caplog.text
+    for subject in subjects:
+        html = (tmp_path / 'out' / 'fmriprep' / f'sub-{subject}.html').read_text()
+        assert f'sub-{subject}_desc-reconall_T1w.svg' in html
+
+    if n_procs == 1:
+        # The template was compiled once and reused for the other subjects
+        assert core._load_template.cache_info().misses == 1
+        assert core._load_template.cache_info().hits == len(subjects) - 1
+
+
+def test_lazy_report(tmp_path):
+    import json
+
+    from .. import core
+
+    f, _ = plt.subplots()
+    for subject in ('01', '02'):
+        figures = tmp_path / 'work' / 'reportlets' / 'fmriprep' / f'sub-{subject}' / 'figures'
+        figures.mkdir(parents=True)
+        f.savefig(figures / f'sub-{subject}_desc-reconall_T1w.svg')
+        f.savefig(figures / f'sub-{subject}_space-MNI152NLin6Asym_T1w.svg')
+    plt.close(f)
+    # Identical figures are shared across subjects
+    (tmp_path / 'dseg.svg').write_text('<svg viewBox="0 0 10 5"></svg>')
+    for subject in ('01', '02'):
+        figures = tmp_path / 'work' / 'reportlets' / 'fmriprep' / f'sub-{subject}' / 'figures'
+        (figures / f'sub-{subject}_dseg.svg').write_bytes((tmp_path / 'dseg.svg').read_bytes())
+
+    assert not core.generate_reports(
+        ['01', '02'],
+        tmp_path / 'out',
+        'fakeuuid',
+        work_dir=tmp_path / 'work',
+        packagename='fmriprep',
+        lazy=True,
+    )
+    out_dir = tmp_path / 'out' / 'fmriprep'
+    assert not (out_dir / 'sub-01' / 'figures').exists()
+    assert len(list((out_dir / 'assets').glob('*.svg'))) == 5
+
+    for subject in ('01', '02'):
+        manifest = json.loads((out_dir / 'assets' / f'sub-{subject}.json').read_text())
+        assert manifest['report'] == f'sub-{subject}.html'
+        assert len(manifest['assets']) == 3
+        html = (out_dir / f'sub-{subject}.html').read_text()
+        for entry in manifest['assets']:
+            assert (out_dir / entry['asset']).read_bytes() == Path(entry['source']).read_bytes()
+            assert f'./{entry["asset"]}' in html
+
+        assert html.count('loading="lazy"') == 2
+        assert html.count('data-src=') == 1
+        assert 'IntersectionObserver' in html
+        assert 'aspect-ratio: 460.8 / 345.6;' in html
+        assert 'aspect-ratio: 10 / 5;' in html
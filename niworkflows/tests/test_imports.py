@@ -0,0 +1,92 @@
+# emacs: -*- mode: python; py-indent-offset: 4; indent-tabs-mode: nil -*-
+# vi: set ft=python sts=4 ts=4 sw=4 et:
+#
+# Copyright 2021 The NiPreps Developers <nipreps@gmail.com>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# We support and encourage derived works from this project, please read
+# about our expectations at
+#
+#     https://www.nipreps.org/community/licensing/
+#
+"""Import-time benchmarks."""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import niworkflows
+
+HEAVY_MODULES = (
+    'matplotlib',
+    'pandas',
+    'nilearn',
+    'nitransforms',
+    'seaborn',
+    'sklearn',
+    'templateflow.api',
+)
+
+
+def import_times(module):
+    """
+    Import a module in a fresh interpreter and collect ``-X importtime`` timings.
+
+    Returns a mapping of the names of all modules imported to their
+    cumulative import time in microseconds.
+
+    """
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=Path(niworkflows.__file__).parents[1],
+    )
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or line.endswith('imported package'):
+            continue
+        _, cumulative, name = line.split('|')
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+@pytest.mark.parametrize(
+    ('module', 'allowed'),
+    [
+        ('niworkflows', ()),
+        ('niworkflows.engine.plugin', ()),
+        ('niworkflows.engine.workflows', ()),
+        ('niworkflows.interfaces.bids', ()),
+        ('niworkflows.interfaces.cifti', ()),
+        ('niworkflows.interfaces.confounds', ()),
+        ('niworkflows.interfaces.itk', ()),
+        ('niworkflows.interfaces.nilearn', ('nilearn',)),
+        ('niworkflows.interfaces.plotting', ()),
+        ('niworkflows.interfaces.reportlets.registration', ('templateflow.api',)),
+        ('niworkflows.utils.spaces', ()),
+    ],
+)
+def test_import_time(module, allowed):
+    """Heavy dependencies are only imported when interfaces run."""
+    times = import_times(module)
+    assert module in times
+
+    heavy = set(HEAVY_MODULES).difference(allowed).intersection(times)
+    assert not heavy, f'{module} imports {sorted(heavy)}'
+    # Generous budget (in microseconds), mostly spent importing nipype
+    assert times[module] < 5_000_000
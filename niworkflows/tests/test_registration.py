@@ -209,3 +209,26 @@ def test_ANTSRegistrationRPT(monkeypatch, reference, moving, datadir):
         from_file=data.load('t1w-mni_registration_testing_000.json'),
     )
     _smoke_test_report(ants_rpt, 'testANTSRegistrationRPT.svg')
+
+
+def test_apply_mask():
+    """Check masking in single precision matches nilearn's apply/unmask round trip."""
+    import nibabel as nb
+    import numpy as np
+    from nilearn.masking import apply_mask, unmask
+
+    from ..interfaces.reportlets.base import _apply_mask
+
+    rng = np.random.default_rng(46)
+    affine = np.diag([2.0, 2.0, 2.0, 1.0])
+    img = nb.Nifti1Image(rng.integers(0, 1000, size=(10, 11, 12)).astype('int16'), affine)
+    mask = nb.Nifti1Image((rng.random((10, 11, 12)) > 0.3).astype('uint8'), affine)
+
+    masked = _apply_mask(img, mask)
+    assert masked.get_data_dtype() == np.float32
+    assert masked.dataobj.dtype == np.float32
+    assert np.allclose(masked.affine, affine)
+    assert np.array_equal(masked.dataobj, unmask(apply_mask(img, mask), mask).get_fdata())
+
+    with pytest.raises(ValueError, match='same grid'):
+        _apply_mask(img, nb.Nifti1Image(mask.dataobj, np.eye(4)))
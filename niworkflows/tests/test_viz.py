@@ -25,6 +25,7 @@
 import os
 from pathlib import Path
 
+import matplotlib.pyplot as plt
 import nibabel as nb
 import numpy as np
 import pandas as pd
@@ -39,7 +40,7 @@ from .generate_data import _create_dtseries_cifti
 
 
 @pytest.mark.parametrize('tr', [None, 0.7])
-@pytest.mark.parametrize('sorting', [None, 'ward', 'linkage'])
+@pytest.mark.parametrize('sorting', [None, 'ward', 'linkage', 'svd'])
 def test_carpetplot(tr, sorting):
     """Write a carpetplot"""
     save_artifacts = os.getenv('SAVE_CIRCLE_ARTIFACTS')
@@ -123,6 +124,37 @@ def test_carpetplot(tr, sorting):
     )
 
 
+def test_ward_to_linkage():
+    """Check the conversion of Ward trees and the ordering of rows."""
+    from scipy.cluster.hierarchy import dendrogram, is_valid_linkage, leaves_list, linkage
+    from sklearn.cluster import ward_tree
+
+    from niworkflows.viz.plots import _svd_projection, _ward_to_linkage
+
+    rng = np.random.default_rng(42)
+    data = rng.normal(size=(300, 5)) @ rng.normal(size=(5, 200))
+    data += 0.1 * rng.normal(size=data.shape)
+
+    children, _, n_leaves, _, distances = ward_tree(data, return_distance=True)
+    linkage_matrix = _ward_to_linkage(children, n_leaves, distances)
+    assert is_valid_linkage(linkage_matrix)
+    assert linkage_matrix[-1, 3] == 300
+    assert np.array_equal(
+        leaves_list(linkage_matrix), dendrogram(linkage_matrix, no_plot=True)['leaves']
+    )
+
+    # Ward's clustering is invariant to rotations, and the projection keeps
+    # the leading components of the (row-centered) data
+    centered = data - data.mean(axis=1, keepdims=True)
+    u, s, _ = np.linalg.svd(centered, full_matrices=False)
+    proj = _svd_projection(data, n_components=5)
+    assert np.allclose(proj @ proj.T, (u[:, :5] * s[:5]) @ (u[:, :5] * s[:5]).T, atol=0.1)
+    assert np.array_equal(
+        leaves_list(linkage(proj, method='ward')),
+        leaves_list(linkage(u[:, :5] * s[:5], method='ward')),
+    )
+
+
 @pytest.mark.parametrize(
     'input_files',
     [
@@ -170,6 +202,198 @@ def test_fmriplot(input_files, datadir):
         )
 
 
+@pytest.mark.parametrize('dtype', ['nifti', 'nifti_seg', 'cifti'])
+def test_lazy_carpetplot(tmp_path, monkeypatch, dtype):
+    """Check carpet plots do not change when rows are read lazily from disk."""
+    monkeypatch.chdir(tmp_path)
+    rng = np.random.default_rng(41)
+    if dtype == 'cifti':
+        in_file = str(
+            _create_dtseries_cifti(
+                timepoints=50,
+                models=[
+                    ('CIFTI_STRUCTURE_CORTEX_LEFT', rng.normal(100, 20, (3000, 50))),
+                    ('CIFTI_STRUCTURE_CORTEX_RIGHT', rng.normal(50, 10, (3100, 50))),
+                ],
+            )
+        )
+        args = (in_file,)
+        extract = _cifti_timeseries
+    else:
+        in_file = str(tmp_path / 'bold.nii.gz')
+        nb.Nifti1Image(
+            rng.normal(100, 20, (20, 21, 22, 50)).astype('float32'), np.eye(4)
+        ).to_filename(in_file)
+        args = (in_file,)
+        if dtype == 'nifti_seg':
+            seg_file = str(tmp_path / 'seg.nii.gz')
+            nb.Nifti1Image(
+                rng.integers(0, 6, (20, 21, 22)).astype('uint8'), np.eye(4)
+            ).to_filename(seg_file)
+            args += (seg_file,)
+        extract = _nifti_timeseries
+
+    data, segments = extract(*args)
+    lazy_data, lazy_segments = extract(*args, lazy=True)
+    lazy_data.chunk_size = 7
+    assert lazy_data.shape == data.shape
+    rows = np.arange(0, data.shape[0], 97)
+    assert np.array_equal(lazy_data[rows], data[rows])
+
+    images = []
+    for timeseries, segs in ((data, segments), (lazy_data, lazy_segments)):
+        plt.figure()
+        viz.plot_carpet(timeseries, segs, tr=2.0, size=(300, 100))
+        images.append([ax.images[0].get_array() for ax in plt.gcf().axes if ax.images])
+        plt.close()
+
+    assert len(images[0]) == len(images[1]) > 0
+    for eager, lazy in zip(*images, strict=True):
+        assert np.allclose(eager, lazy)
+
+
+def test_LazyTimeseries_scaled(tmp_path):
+    """Read scaled, gzipped NIfTI timeseries in blocks."""
+    from niworkflows.utils.timeseries import _LazyTimeseries
+
+    rng = np.random.default_rng(41)
+    data = rng.integers(-100, 100, size=(5, 6, 7, 30)).astype('int16')
+    img = nb.Nifti1Image(data, np.eye(4))
+    img.header.set_slope_inter(0.5, 3)
+    img.to_filename(tmp_path / 'bold.nii.gz')
+
+    img = nb.load(tmp_path / 'bold.nii.gz')
+    expected = img.get_fdata().reshape((-1, 30))
+    index = np.flatnonzero(rng.random(5 * 6 * 7) > 0.5)
+    lazy = _LazyTimeseries(img, index=index, chunk_size=4)
+    assert lazy.shape == (len(index), 30)
+    assert np.allclose(lazy[[3, 0, 3]], expected[index[[3, 0, 3]]])
+    assert np.allclose(np.asarray(lazy), expected[index])
+
+
+def test_svg_raster(tmp_path):
+    """Check rasterized figures are wrapped in SVGs that compose like vector figures."""
+    from nilearn.plotting import plot_anat
+    from svgutils.transform import fromstring
+
+    from niworkflows.viz.utils import compose_view, extract_svg
+
+    rng = np.random.default_rng(43)
+    img = nb.Nifti1Image(rng.uniform(size=(20, 22, 18)).astype('float32'), np.eye(4))
+    display = plot_anat(img, display_mode='z', cut_coords=3)
+    vector = fromstring(extract_svg(display, dpi=50, compress=False))
+    raster_svg = extract_svg(display, dpi=50, compress='raster')
+    display.close()
+
+    assert raster_svg.startswith('<svg ')
+    assert raster_svg.endswith('</svg>')
+    assert 'data:image/webp;base64,' in raster_svg
+    assert '<path' not in raster_svg
+    raster = fromstring(raster_svg.replace('figure_1', 'raster-z', 1))
+    assert raster.root.get('viewBox') == vector.root.get('viewBox')
+
+    out_file = compose_view([raster], [fromstring(raster_svg)], out_file=tmp_path / 'report.svg')
+    assert Path(out_file).read_text().count('data:image/webp') == 2
+
+
+def test_robust_set_limits():
+    """Estimate display limits from a subsample."""
+    from niworkflows.viz.utils import robust_set_limits
+
+    data = np.random.default_rng(46).gamma(2.0, 100.0, size=(60, 70, 50))
+    exact = robust_set_limits(data, {})
+    approx = robust_set_limits(data, {}, max_samples=2**14)
+    assert np.isclose(approx['vmin'], exact['vmin'], rtol=0.05)
+    assert np.isclose(approx['vmax'], exact['vmax'], rtol=0.05)
+    # Limits already set are kept
+    assert robust_set_limits(data, {'vmin': -1}, max_samples=100)['vmin'] == -1
+
+
+@pytest.mark.parametrize('n_procs', [1, 2])
+def test_plot_registration_nprocs(tmp_path, n_procs):
+    """Render registration and segmentation views, possibly in parallel processes."""
+    from niworkflows.viz.utils import compose_view, cuts_from_bbox, plot_registration, plot_segs
+
+    rng = np.random.default_rng(45)
+    img = nb.Nifti1Image(rng.uniform(size=(20, 22, 18)).astype('float32'), np.eye(4))
+    mask = nb.Nifti1Image((img.get_fdata() > 0.5).astype('uint8'), np.eye(4))
+    cuts = cuts_from_bbox(mask, cuts=3)
+
+    svgs = plot_registration(
+        img, 'fixed-image', cuts=cuts, contour=mask, compress=False, n_procs=n_procs
+    )
+    ribbon_svgs = plot_registration(
+        img,
+        'fixed-image',
+        cuts=cuts,
+        contour=nb.Nifti1Image(
+            rng.choice(np.array([0, 2, 3, 41, 42], dtype='int16'), size=img.shape), np.eye(4)
+        ),
+        compress=False,
+        n_procs=n_procs,
+    )
+    # White (blue) and pial (red) surfaces are drawn for FreeSurfer ribbons
+    assert '#0000ff' in ribbon_svgs[0].to_str().decode()
+    assert len(svgs) == 3
+    for svg, mode in zip(svgs, 'zxy', strict=True):
+        assert f'id="fixed-image-{mode}-' in svg.to_str().decode()
+    compose_view(svgs, None, out_file=tmp_path / 'registration.svg')
+
+    img.to_filename(tmp_path / 'img.nii.gz')
+    mask.to_filename(tmp_path / 'mask.nii.gz')
+    svgs = plot_segs(
+        str(tmp_path / 'img.nii.gz'),
+        [str(tmp_path / 'mask.nii.gz')],
+        str(tmp_path / 'segs.svg'),
+        compress=False,
+        n_procs=n_procs,
+    )
+    assert len(svgs) == 3
+    for svg, mode in zip(svgs, 'zxy', strict=True):
+        assert f'id="segmentation-{mode}-' in svg.to_str().decode()
+
+
+def test_svg_compress(monkeypatch):
+    """Check embedded PNGs are converted into WEBP in-process, and memoized."""
+    from base64 import b64decode
+    from io import BytesIO
+    from shutil import which
+
+    from nilearn.plotting import plot_anat
+    from PIL import Image
+
+    from niworkflows.viz import utils
+
+    rng = np.random.default_rng(44)
+    img = nb.Nifti1Image(rng.uniform(size=(20, 22, 18)).astype('float32'), np.eye(4))
+    display = plot_anat(img, display_mode='z', cut_coords=3)
+    svg = utils.svg2str(display, dpi=50)
+    display.close()
+    n_pngs = svg.count('data:image/png;base64,')
+    assert n_pngs > 1
+
+    monkeypatch.setattr(utils, '_WEBP_CACHE', utils.OrderedDict())
+    compressed = utils.svg_compress(svg, compress=True)
+    assert 'data:image/png' not in compressed
+    assert compressed.count('data:image/webp;base64,') == n_pngs
+    assert compressed.startswith('<svg ')
+    assert len(utils._WEBP_CACHE) == len(set(utils._PNG_B64_RE.findall(svg)))
+
+    webp = b64decode(compressed.split('base64,')[1].split('"')[0])
+    assert Image.open(BytesIO(webp)).format == 'WEBP'
+
+    # Converted images are reused, rather than encoded again
+    def _no_encoding(*args, **kwargs):
+        raise AssertionError('image encoded twice')
+
+    monkeypatch.setattr(Image.Image, 'save', _no_encoding)
+    assert utils.svg_compress(svg, compress=True) == compressed
+
+    if not all((which('svgo'), which('cwebp'))):
+        with pytest.raises(RuntimeError, match='svgo or cwebp'):
+            utils.svg_compress(svg, compress='external')
+
+
 def test_plot_melodic_components(tmp_path):
     """Test plotting melodic components"""
     import numpy as np
@@ -276,3 +500,62 @@ def test_cifti_surfaces_plot(tmp_path, create_surface_dtseries):
     out_dir = Path(os.getenv('SAVE_CIRCLE_ARTIFACTS', str(tmp_path)))
     out_file = str(out_dir / 'cifti_surfaces_plot.svg')
     viz.plots.cifti_surfaces_plot(create_surface_dtseries, output_file=out_file)
+
+
+@pytest.mark.parametrize('n_procs', [1, 2])
+def test_cifti_surfaces_plot_cached(tmp_path, monkeypatch, create_surface_dtseries, n_procs):
+    """Test the fsLR meshes are looked up once, with panels rendered serially or in parallel."""
+    import templateflow.api as tf
+
+    # A coarse stand-in for the fsLR 32k meshes (which must be fetched from TemplateFlow)
+    rng = np.random.default_rng(0)
+    coords = rng.normal(size=(32492, 3)).astype('float32')
+    coords *= 50 / np.linalg.norm(coords, axis=1, keepdims=True)
+    faces = rng.integers(0, 32492, size=(2000, 3), dtype='int32')
+    meshes = []
+    for hemi in ('L', 'R'):
+        gii = nb.GiftiImage(
+            darrays=[
+                nb.gifti.GiftiDataArray(coords, intent='NIFTI_INTENT_POINTSET'),
+                nb.gifti.GiftiDataArray(faces, intent='NIFTI_INTENT_TRIANGLE'),
+            ]
+        )
+        meshes.append(tmp_path / f'hemi-{hemi}_inflated.surf.gii')
+        gii.to_filename(meshes[-1])
+
+    calls = []
+    monkeypatch.setattr(tf, 'get', lambda *args, **kwargs: calls.append(kwargs) or meshes)
+    viz.plots._fslr_mesh_files.cache_clear()
+    viz.plots._load_surf_mesh.cache_clear()
+
+    for _ in range(2):
+        figure = viz.plots.cifti_surfaces_plot(create_surface_dtseries, n_procs=n_procs)
+        assert [ax.get_title() for ax in figure.axes[:4]] == [
+            'Left - Lateral',
+            'Right - Lateral',
+            'Left - Medial',
+            'Right - Medial',
+        ]
+        plt.close(figure)
+
+    # Mesh paths are resolved in the parent only, and workers receive them as arguments
+    assert len(calls) == 1
+    if n_procs == 1:
+        assert viz.plots._load_surf_mesh.cache_info().misses == 2
+
+    # Panels rendered in worker processes match those rendered in-process
+    from niworkflows.viz.utils import _render_views
+
+    surf_map = rng.random(32492)
+    jobs = [
+        (
+            viz.plots._render_surface_panel,
+            (str(mesh), hemi, 'lateral'),
+            {'figsize': (2, 2), 'dpi': 50, 'surf_map': surf_map, 'vmin': 0, 'vmax': 1},
+        )
+        for mesh, hemi in zip(meshes, ('left', 'right'), strict=True)
+    ]
+    serial = _render_views(jobs, n_procs=1)
+    for expected, image in zip(serial, _render_views(jobs, n_procs=n_procs), strict=True):
+        assert image.shape == expected.shape
+        assert np.array_equal(image, expected)
@@ -29,6 +29,7 @@ all the imports MUST be done in each function's context.
 """
 
 __all__ = [
+    'drop_first',
     'listify',
     'pop_file',
 ]
@@ -55,6 +56,26 @@ def pop_file(in_files):
     return in_files
 
 
+def drop_first(in_files):
+    """
+    Select all but the first file from a list of filenames.
+
+    The complement of :func:`pop_file`, used to grab the remaining echoes
+    of multi-echo data.
+
+    Examples
+    --------
+    >>> drop_first(['some/file1.nii.gz', 'some/file2.nii.gz', 'some/file3.nii.gz'])
+    ['some/file2.nii.gz', 'some/file3.nii.gz']
+    >>> drop_first('some/file.nii.gz')
+    []
+
+    """
+    if isinstance(in_files, (list, tuple)):
+        return list(in_files[1:])
+    return []
+
+
 def listify(value):
     """
     Convert to a list (inspired by bids.utils.listify).
@@ -331,3 +331,133 @@ def nii_ones_like(in_file, value, dtype, newpath=None):
     nii.to_filename(out_file)
 
     return out_file
+
+
+def load_gifti_timeseries(in_file, vertices=None, dtype='float32', n_workers=None):
+    """
+    Read a GIfTI time series (one data array per time point) into a single array.
+
+    Each data array is decoded (base64 and zlib) in a thread pool, directly into
+    a preallocated *T* |times| *V* array.
+    Files this reader does not handle (ASCII or external encodings, or data
+    arrays that are not one-dimensional) are read with *NiBabel* instead.
+
+    .. |times| unicode:: U+00D7
+
+    Parameters
+    ----------
+    in_file : :obj:`os.PathLike`
+        A GIfTI file with one data array per time point.
+    vertices : array-like
+        Indices of the vertices to extract (default: all vertices).
+    dtype : :obj:`numpy.dtype`
+        Data type of the output array.
+    n_workers : :obj:`int`
+        Number of decoding threads (default: as chosen by
+        :obj:`~concurrent.futures.ThreadPoolExecutor`).
+
+    Returns
+    -------
+    :obj:`numpy.ndarray`
+        The time series, with shape *T* |times| *V*.
+
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from xml.etree import ElementTree as ET
+
+    darrays = ET.parse(in_file).getroot().findall('DataArray')  # noqa: S314
+    if not darrays or any(
+        da.get('Encoding') not in ('Base64Binary', 'GZipBase64Binary')
+        or da.get('Dimensionality', '1') != '1'
+        for da in darrays
+    ):
+        data = np.array([da.data for da in nb.load(in_file).darrays], dtype=dtype)
+        return data if vertices is None else data[:, vertices]
+
+    n_vertices = int(darrays[0].get('Dim0'))
+    if vertices is None:
+        vertices = slice(None)
+    out = np.empty((len(darrays), len(np.arange(n_vertices)[vertices])), dtype=dtype)
+
+    def _decode(index):
+        out[index] = _decode_gifti_darray(darrays[index])[vertices]
+
+    with ThreadPoolExecutor(max_workers=n_workers) as pool:
+        # Consume the results so that decoding errors are raised
+        list(pool.map(_decode, range(len(darrays))))
+
+    return out
+
+
+def iter_gifti_timeseries(in_file, chunk_size, vertices=None, dtype='float32'):
+    """
+    Read a GIfTI time series (one data array per time point) in blocks of time points.
+
+    The XML document is parsed incrementally, and each data array is released as
+    soon as it is decoded, so that only about ``chunk_size`` time points are held
+    in memory at any time.
+    If a data array this reader does not handle (external encodings, or data
+    arrays that are not one-dimensional) is found, the remainder of the file is
+    read with *NiBabel* instead.
+
+    Parameters
+    ----------
+    in_file : :obj:`os.PathLike`
+        A GIfTI file with one data array per time point.
+    chunk_size : :obj:`int`
+        Number of time points in each block.
+    vertices : array-like
+        Indices of the vertices to extract (default: all vertices).
+    dtype : :obj:`numpy.dtype`
+        Data type of the output blocks.
+
+    Yields
+    ------
+    :obj:`numpy.ndarray`
+        Consecutive blocks of the time series, with ``chunk_size`` rows
+        (the last block may be shorter) and one column per vertex.
+
+    """
+    from xml.etree import ElementTree as ET
+
+    if vertices is None:
+        vertices = slice(None)
+
+    block = []
+    index = 0
+    for _, element in ET.iterparse(in_file):  # noqa: S314
+        if element.tag != 'DataArray':
+            continue
+        if (
+            element.get('Encoding') not in ('ASCII', 'Base64Binary', 'GZipBase64Binary')
+            or element.get('Dimensionality', '1') != '1'
+        ):
+            block += [da.data[vertices] for da in nb.load(in_file).darrays[index:]]
+            break
+        block.append(_decode_gifti_darray(element)[vertices])
+        element.clear()
+        index += 1
+        if len(block) == chunk_size:
+            yield np.array(block, dtype=dtype)
+            block = []
+
+    for start in range(0, len(block), chunk_size):
+        yield np.array(block[start : start + chunk_size], dtype=dtype)
+
+
+def _decode_gifti_darray(element):
+    """Decode the data of a one-dimensional GIfTI ``DataArray`` XML element."""
+    import base64
+    import zlib
+
+    da_dtype = nb.nifti1.data_type_codes.dtype[element.get('DataType')].newbyteorder(
+        '>' if element.get('Endian') == 'BigEndian' else '<'
+    )
+    text = element.find('Data').text or ''
+    if element.get('Encoding') == 'ASCII':
+        return np.array(text.split(), dtype=da_dtype)
+
+    raw = base64.b64decode(text)
+    if element.get('Encoding') == 'GZipBase64Binary':
+        raw = zlib.decompress(raw)
+    return np.frombuffer(raw, dtype=da_dtype, count=int(element.get('Dim0')))
@@ -23,11 +23,15 @@
 """Utilities for tracking and filtering spaces."""
 
 import argparse
+import json
+import os
 from collections import defaultdict
+from contextlib import suppress
+from functools import cache
 from itertools import product
+from pathlib import Path
 
 import attr
-from templateflow import api as _tfapi
 
 NONSTANDARD_REFERENCES = [
     'T1w',
@@ -60,6 +64,83 @@ FSAVERAGE_DENSITY = {
 FSAVERAGE_LEGACY = {v: k for k, v in FSAVERAGE_DENSITY.items()}
 """A map of surface densities to legacy fsaverageX names."""
 
+TEMPLATEFLOW_SNAPSHOT_ENV = 'NIWORKFLOWS_TEMPLATEFLOW_SNAPSHOT'
+"""Environment variable pointing at an (optional) on-disk snapshot of TemplateFlow's catalog."""
+
+
+@cache
+def _tf_catalog():
+    """
+    Query TemplateFlow (once per process) for the templates it holds.
+
+    Listing templates requires indexing TemplateFlow's home directory, which is
+    slow, so it is deferred until a reference space must be validated.
+    If the environment variable named by :data:`TEMPLATEFLOW_SNAPSHOT_ENV` is set,
+    the catalog (including cohorts) is read from, or otherwise written to, that
+    JSON file.
+    The snapshot is discarded when TemplateFlow's home, version or list of
+    template folders change.
+
+    """
+    import templateflow
+    from templateflow import api, conf
+
+    home = Path(conf.TF_HOME)
+    key = {
+        'home': str(home),
+        'version': templateflow.__version__,
+        'folders': sorted(p.name for p in home.glob('tpl-*')),
+    }
+
+    snapshot = os.getenv(TEMPLATEFLOW_SNAPSHOT_ENV)
+    if snapshot:
+        with suppress(OSError, ValueError):
+            catalog = json.loads(Path(snapshot).read_text())
+            if catalog.get('key') == key:
+                return catalog
+
+    catalog = {
+        'key': key,
+        'templates': api.templates(),
+        'spaces_2d': api.templates(suffix='sphere'),
+    }
+    if snapshot:
+        catalog['cohorts'] = {
+            template: _query_cohorts(template) for template in catalog['templates']
+        }
+        with suppress(OSError):
+            tmp_file = Path(f'{snapshot}.{os.getpid()}.tmp')
+            tmp_file.write_text(json.dumps(catalog))
+            tmp_file.replace(snapshot)
+    return catalog
+
+
+@cache
+def _query_cohorts(template):
+    from templateflow import api
+
+    return [f'{t}' for t in api.TF_LAYOUT.get_cohorts(template=template)]
+
+
+def _get_cohorts(template):
+    """Return the cohorts of a standard space (empty for nonstandard spaces)."""
+    catalog = _tf_catalog()
+    if template not in catalog['templates']:
+        return []
+    if 'cohorts' in catalog:
+        return catalog['cohorts'].get(template, [])
+    return _query_cohorts(template)
+
+
+class _TemplateFlowQuery:
+    """A class attribute that resolves a list of TemplateFlow templates on first access."""
+
+    def __init__(self, key):
+        self._key = key
+
+    def __get__(self, obj, objtype=None):
+        return tuple(_tf_catalog()[self._key])
+
 
 @attr.s(slots=True, frozen=True)
 class Reference:
@@ -152,8 +233,8 @@ class Reference:
 
     """
 
-    _standard_spaces = tuple(_tfapi.templates())
-    _spaces_2d = tuple(_tfapi.templates(suffix='sphere'))
+    _standard_spaces = _TemplateFlowQuery('templates')
+    _spaces_2d = _TemplateFlowQuery('spaces_2d')
 
     space = attr.ib(default=None, type=str)
     """Name designating this space."""
@@ -187,7 +268,7 @@ class Reference:
         if self.space in self._standard_spaces:
             object.__setattr__(self, 'standard', True)
 
-        _cohorts = [f'{t}' for t in _tfapi.TF_LAYOUT.get_cohorts(template=self.space)]
+        _cohorts = _get_cohorts(self.space)
         if 'cohort' in self.spec:
             if not _cohorts:
                 raise ValueError(
@@ -466,7 +547,7 @@ class SpatialReferences:
     """
 
     __slots__ = ('_cached', '_refs')
-    standard_spaces = tuple(_tfapi.templates())
+    standard_spaces = _TemplateFlowQuery('templates')
     """List of supported standard reference spaces."""
 
     @staticmethod
@@ -26,6 +26,8 @@ import pytest
 
 from ..images import (
     dseg_label,
+    iter_gifti_timeseries,
+    load_gifti_timeseries,
     overwrite_header,
     resample_by_spacing,
     update_header_fields,
@@ -134,3 +136,52 @@ def test_resample_by_spacing():
     resampled = resample_by_spacing(nii, (2.0, 2.0, 2.0), order=1, clip=False)
     assert resampled.header.get_zooms()[:3] == (2.0, 2.0, 2.0)
     assert np.allclose(resampled.affine, rot.dot(new_affine))
+
+
+@pytest.mark.parametrize('encoding', ['GIFTI_ENCODING_B64GZ', 'GIFTI_ENCODING_B64BIN', 'ASCII'])
+@pytest.mark.parametrize('vertices', [None, [0, 5, 3, 99], slice(10, 20)])
+def test_load_gifti_timeseries(tmp_path, encoding, vertices):
+    data = np.random.default_rng(0).normal(size=(7, 100)).astype('f4')
+    gii = nb.GiftiImage(
+        darrays=[
+            nb.gifti.GiftiDataArray(
+                d, intent='NIFTI_INTENT_TIME_SERIES', datatype='float32', encoding=encoding
+            )
+            for d in data
+        ]
+    )
+    fname = tmp_path / 'bold.func.gii'
+    gii.to_filename(fname)
+
+    expected = np.array([da.data for da in nb.load(fname).darrays])
+    if vertices is not None:
+        expected = expected[:, vertices]
+
+    out = load_gifti_timeseries(fname, vertices=vertices, n_workers=3)
+    assert out.dtype == np.float32
+    assert np.array_equal(out, expected)
+
+
+@pytest.mark.parametrize('encoding', ['GIFTI_ENCODING_B64GZ', 'GIFTI_ENCODING_B64BIN', 'ASCII'])
+@pytest.mark.parametrize('vertices', [None, [0, 5, 3, 99], slice(10, 20)])
+def test_iter_gifti_timeseries(tmp_path, encoding, vertices):
+    data = np.random.default_rng(0).normal(size=(7, 100)).astype('f4')
+    gii = nb.GiftiImage(
+        darrays=[
+            nb.gifti.GiftiDataArray(
+                d, intent='NIFTI_INTENT_TIME_SERIES', datatype='float32', encoding=encoding
+            )
+            for d in data
+        ]
+    )
+    fname = tmp_path / 'bold.func.gii'
+    gii.to_filename(fname)
+
+    expected = np.array([da.data for da in nb.load(fname).darrays])
+    if vertices is not None:
+        expected = expected[:, vertices]
+
+    blocks = list(iter_gifti_timeseries(fname, 3, vertices=vertices))
+    assert [len(block) for block in blocks] == [3, 3, 1]
+    assert all(block.dtype == np.float32 for block in blocks)
+    assert np.array_equal(np.concatenate(blocks), expected)
@@ -117,3 +117,42 @@ def test_space_action_edgecases(parser, flag, expected):
 def test_space_action_invalid_spaces(parser, spaces, expected):
     with pytest.raises(ValueError, match=expected):
         parser.parse_known_args(args=('--spaces',) + spaces)[0]
+
+
+def test_import_does_not_query_templateflow():
+    """Importing the module must not index TemplateFlow's home."""
+    import subprocess
+    import sys
+    from pathlib import Path
+
+    import niworkflows
+
+    code = (
+        'import sys, niworkflows.utils.spaces; '
+        "assert 'bids.layout' not in sys.modules; "
+        "assert 'templateflow.api' not in sys.modules"
+    )
+    subprocess.run(
+        [sys.executable, '-c', code], check=True, cwd=Path(niworkflows.__file__).parents[1]
+    )
+
+
+def test_templateflow_snapshot(tmp_path, monkeypatch):
+    """The TemplateFlow catalog round-trips through an on-disk snapshot."""
+    from .. import spaces
+
+    snapshot = tmp_path / 'templateflow.json'
+    monkeypatch.setenv(spaces.TEMPLATEFLOW_SNAPSHOT_ENV, str(snapshot))
+    spaces._tf_catalog.cache_clear()
+    try:
+        catalog = spaces._tf_catalog()
+        assert snapshot.exists()
+        assert 'MNI152NLin2009cAsym' in catalog['templates']
+        assert set(catalog['cohorts']) == set(catalog['templates'])
+
+        spaces._tf_catalog.cache_clear()
+        monkeypatch.setattr(spaces, '_query_cohorts', None)
+        assert spaces._tf_catalog() == catalog
+        assert Reference('MNIPediatricAsym', {'cohort': 1}).fullname == 'MNIPediatricAsym:cohort-1'
+    finally:
+        spaces._tf_catalog.cache_clear()
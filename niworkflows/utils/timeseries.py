@@ -26,8 +26,96 @@ import nibabel as nb
 import numpy as np
 
 
-def _cifti_timeseries(dataset):
-    """Extract timeseries from CIFTI2 dataset."""
+class _LazyTimeseries:
+    """
+    An *N* x *T* array of timeseries that reads from disk only the rows being indexed.
+
+    Rows are extracted from blocks of ``chunk_size`` timepoints, so that at most one
+    block of the image is in memory at a time. NIfTI files are read in a single
+    sequential pass (which avoids decompressing gzipped files more than once).
+
+    Parameters
+    ----------
+    img : :obj:`~nibabel.spatialimages.SpatialImage`
+        A 4D NIfTI image (timepoints last), or a CIFTI2 dense timeseries (timepoints first).
+    index : :obj:`numpy.ndarray`, optional
+        Flat (C-ordered) indices of the sampling locations corresponding to each row.
+    chunk_size : :obj:`int`
+        Number of timepoints read at once.
+
+    """
+
+    def __init__(self, img, index=None, chunk_size=64):
+        self._img = img
+        self._cifti = isinstance(img, nb.Cifti2Image)
+        self._spatial_shape = img.shape[1:] if self._cifti else img.shape[:-1]
+        self._index = None if index is None else np.asanyarray(index)
+        self.chunk_size = chunk_size
+        n_rows = int(np.prod(self._spatial_shape)) if index is None else len(self._index)
+        self.shape = (n_rows, img.shape[0] if self._cifti else img.shape[-1])
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __array__(self, dtype=None, copy=None):
+        return self[np.arange(self.shape[0])].astype(dtype or 'float32', copy=False)
+
+    def __getitem__(self, rows):
+        rows = np.arange(self.shape[0])[rows]
+        locations = rows if self._index is None else self._index[rows]
+        coords = np.unravel_index(locations, self._spatial_shape)
+
+        out = np.empty(np.shape(rows) + (self.shape[1],), dtype='float32')
+        for start, block in self._iter_blocks():
+            block = block.T if self._cifti else block
+            out[..., start : start + block.shape[-1]] = block[coords]
+        return out
+
+    def _iter_blocks(self):
+        """Generate consecutive blocks of timepoints, along with their onset."""
+        n_t = self.shape[1]
+        dataobj = self._img.dataobj
+        if (
+            self._cifti
+            or type(self._img) not in (nb.Nifti1Image, nb.Nifti2Image)
+            or not (nb.is_proxy(dataobj))
+        ):
+            for start in range(0, n_t, self.chunk_size):
+                block = (
+                    dataobj[start : start + self.chunk_size]
+                    if self._cifti
+                    else (dataobj[..., start : start + self.chunk_size])
+                )
+                yield start, np.asanyarray(block, dtype='float32')
+            return
+
+        from nibabel.openers import ImageOpener
+        from nibabel.volumeutils import apply_read_scaling
+
+        dtype = self._img.header.get_data_dtype()
+        vol_bytes = int(np.prod(self._spatial_shape)) * dtype.itemsize
+        with ImageOpener(dataobj.file_like) as fobj:
+            fobj.seek(dataobj.offset)
+            for start in range(0, n_t, self.chunk_size):
+                n_vols = min(self.chunk_size, n_t - start)
+                block = np.frombuffer(fobj.read(vol_bytes * n_vols), dtype=dtype).reshape(
+                    self._spatial_shape + (n_vols,), order='F'
+                )
+                yield (
+                    start,
+                    apply_read_scaling(block, dataobj.slope, dataobj.inter).astype(
+                        'float32', copy=False
+                    ),
+                )
+
+
+def _cifti_timeseries(dataset, lazy=False):
+    """
+    Extract timeseries from CIFTI2 dataset.
+
+    If ``lazy`` is set, data are returned as a :class:`_LazyTimeseries`.
+
+    """
     dataset = nb.load(dataset) if isinstance(dataset, str) else dataset
 
     if dataset.nifti_header.get_intent()[0] != 'ConnDenseSeries':
@@ -45,7 +133,7 @@ def _cifti_timeseries(dataset):
         label = labels.get(bm.brain_structure, 'Other')
         seg[label] += list(range(bm.index_offset, bm.index_offset + bm.index_count))
 
-    return dataset.get_fdata(dtype='float32').T, seg
+    return (_LazyTimeseries(dataset) if lazy else dataset.get_fdata(dtype='float32').T), seg
 
 
 def _nifti_timeseries(
@@ -54,13 +142,20 @@ def _nifti_timeseries(
     labels=('Ctx GM', 'dGM', 'WM+CSF', 'Cb', 'Crown'),
     remap_rois=False,
     lut=None,
+    lazy=False,
 ):
-    """Extract timeseries from NIfTI1/2 datasets."""
-    dataset = nb.load(dataset) if isinstance(dataset, str) else dataset
-    data = dataset.get_fdata(dtype='float32').reshape((-1, dataset.shape[-1]))
+    """
+    Extract timeseries from NIfTI1/2 datasets.
+
+    If ``lazy`` is set, data are returned as a :class:`_LazyTimeseries`, and only
+    the rows eventually indexed are read from disk.
 
+    """
+    dataset = nb.load(dataset) if isinstance(dataset, str) else dataset
     if segmentation is None:
-        return data, None
+        if lazy:
+            return _LazyTimeseries(dataset), None
+        return dataset.get_fdata(dtype='float32').reshape((-1, dataset.shape[-1])), None
 
     # Open NIfTI and extract numpy array
     segmentation = nb.load(segmentation) if isinstance(segmentation, str) else segmentation
@@ -85,4 +180,8 @@ def _nifti_timeseries(
     for i in np.unique(segmentation):
         seg_dict[labels[i - 1]] = np.argwhere(segmentation == i).squeeze()
 
+    if lazy:
+        return _LazyTimeseries(dataset, index=np.flatnonzero(fgmask)), seg_dict
+
+    data = dataset.get_fdata(dtype='float32').reshape((-1, dataset.shape[-1]))
     return data[fgmask], seg_dict
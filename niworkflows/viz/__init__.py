@@ -2,7 +2,6 @@
 # vi: set ft=python sts=4 ts=4 sw=4 et:
 import warnings
 
-from .plots import plot_carpet
 from .utils import SVGNS
 
 msg = (
@@ -12,3 +11,12 @@ msg = (
 warnings.warn(msg, PendingDeprecationWarning, stacklevel=2)
 
 __all__ = ['SVGNS', 'plot_carpet']
+
+
+def __getattr__(name):
+    # Importing matplotlib.pyplot is slow, defer it until plots are requested
+    if name == 'plot_carpet':
+        from .plots import plot_carpet
+
+        return plot_carpet
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
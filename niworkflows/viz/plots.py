@@ -22,6 +22,8 @@
 #
 """Plotting tools shared across MRIQC and fMRIPrep."""
 
+from functools import lru_cache
+
 import matplotlib.pyplot as plt
 import nibabel as nb
 import numpy as np
@@ -161,6 +163,10 @@ def plot_carpet(
     ----------
     data : N x T :obj:`numpy.array`
         The functional data to be plotted (*N* sampling locations by *T* timepoints).
+        Only the (decimated) rows to be plotted are accessed, so an array-like
+        reading rows from disk on indexing
+        (e.g., :class:`~niworkflows.utils.timeseries._LazyTimeseries`) keeps memory
+        use proportional to the size of the plot.
     segments: :obj:`dict`, optional
         A mapping between segment labels (e.g., `"Left Cortex"`) and list of indexes
         in the data array.
@@ -186,6 +192,8 @@ def plot_carpet(
         ``""``, ``False``, and ``None`` skip clustering sorting.
         ``"linkage"`` uses linkage hierarchical clustering
         :obj:`scipy.cluster.hierarchy.linkage`.
+        ``"svd"`` runs Ward's clustering on a projection of the rows onto their
+        leading (randomized) singular vectors, which is much faster on large segments.
         Any other value that Python evaluates to ``True`` will use the
         default clustering, which is :obj:`sklearn.cluster.ward_tree`.
 
@@ -203,26 +211,34 @@ def plot_carpet(
         colors[0], colors[1] = colors[1], colors[0]
         colors[2], colors[7] = colors[7], colors[2]
 
+    # Decimate number of time-series before reading, detrending and clustering them
+    n_dec = int((1.8 * data.shape[0]) // size[0])
+    if n_dec > 1:
+        segments = {
+            lab: idx[::n_dec] for lab, idx in segments.items() if np.array(idx).shape >= (1,)
+        }
+
+    # Extract the rows to be plotted, and index segments into them
+    seg_idx = [np.atleast_1d(np.asanyarray(idx, dtype=int)) for idx in segments.values()]
+    rows, inverse = np.unique(np.concatenate(seg_idx), return_inverse=True)
+    offsets = np.cumsum([0] + [len(idx) for idx in seg_idx])
+    segments = {lab: inverse[offsets[i] : offsets[i + 1]] for i, lab in enumerate(segments.keys())}
+    data = data[rows]
+
     if detrend:
         from nilearn.signal import clean
 
         if tr is not None:
             tr = float(tr)
+        # Timeseries are detrended and standardized independently
         data = clean(data.T, t_r=tr, filter=False).T
 
     # We want all subplots to have the same dynamic range
     vminmax = (np.percentile(data, 2), np.percentile(data, 98))
 
-    # Decimate number of time-series before clustering
-    n_dec = int((1.8 * data.shape[0]) // size[0])
-    if n_dec > 1:
-        segments = {
-            lab: idx[::n_dec] for lab, idx in segments.items() if np.array(idx).shape >= (1,)
-        }
-
     # Cluster segments (if argument enabled)
     if sort_rows:
-        from scipy.cluster.hierarchy import dendrogram, linkage
+        from scipy.cluster.hierarchy import leaves_list, linkage
         from sklearn.cluster import ward_tree
 
         for seg_label, seg_idx in segments.items():
@@ -230,17 +246,19 @@ def plot_carpet(
             if len(seg_idx) < 2:
                 continue
             roi_data = data[seg_idx]
-            if isinstance(sort_rows, str) and sort_rows.lower() == 'linkage':
+            method = sort_rows.lower() if isinstance(sort_rows, str) else None
+            if method == 'linkage':
                 linkage_matrix = linkage(
                     roi_data, method='average', metric='euclidean', optimal_ordering=True
                 )
+            elif method == 'svd':
+                linkage_matrix = linkage(_svd_projection(roi_data), method='ward')
             else:
                 children, _, n_leaves, _, distances = ward_tree(roi_data, return_distance=True)
                 linkage_matrix = _ward_to_linkage(children, n_leaves, distances)
 
-            dn = dendrogram(linkage_matrix, no_plot=True)
             # Override the ordering of the indices in this segment
-            segments[seg_label] = np.array(seg_idx)[np.array(dn['leaves'])]
+            segments[seg_label] = np.array(seg_idx)[leaves_list(linkage_matrix)]
 
     # If subplot is not defined
     if subplot is None:
@@ -982,6 +1000,7 @@ def cifti_surfaces_plot(
     surface_type='inflated',
     clip_range=(0, None),
     output_file=None,
+    n_procs=1,
     **kwargs,
 ):
     """
@@ -1002,6 +1021,9 @@ def cifti_surfaces_plot(
     output_file: :obj:`str` or :obj:`None`
         Path where the output figure should be saved. If this is not defined,
         then the figure will be returned.
+    n_procs : :obj:`int`
+        With ``n_procs > 1``, the four panels are rendered in parallel processes
+        and composed as raster images into the figure (default: 1).
     kwargs : dict
         Keyword arguments for :obj:`nilearn.plotting.plot_surf`
 
@@ -1012,14 +1034,6 @@ def cifti_surfaces_plot(
     output_file: :obj:`str`
         The file where the figure is saved.
     """
-    from nilearn.plotting import plot_surf
-
-    def get_surface_meshes(density, surface_type):
-        import templateflow.api as tf
-
-        lh, rh = tf.get('fsLR', density=density, suffix=surface_type, extension=['.surf.gii'])
-        return str(lh), str(rh)
-
     if density != '32k':
         raise NotImplementedError('Only 32k density is currently supported.')
 
@@ -1073,18 +1087,53 @@ def cifti_surfaces_plot(
     lh_bg[:2] = [3, -2]
     rh_bg[:2] = [3, -2]
 
-    lh_mesh, rh_mesh = get_surface_meshes(density, surface_type)
-    lh_kwargs = {'surf_mesh': lh_mesh, 'surf_map': lh_data, 'bg_map': lh_bg}
-    rh_kwargs = {'surf_mesh': rh_mesh, 'surf_map': rh_data, 'bg_map': rh_bg}
+    lh_kwargs = {'surf_map': lh_data, 'bg_map': lh_bg}
+    rh_kwargs = {'surf_map': rh_data, 'bg_map': rh_bg}
+    panels = [
+        (hemi, view, (lh_kwargs, rh_kwargs)[j])
+        for view in ('lateral', 'medial')
+        for j, hemi in enumerate(('left', 'right'))
+    ]
 
     # Build the figure
     figure = plt.figure(figsize=plt.figaspect(0.25), constrained_layout=True)
-    for i, view in enumerate(('lateral', 'medial')):
-        for j, hemi in enumerate(('left', 'right')):
+    mesh_files = dict(zip(('left', 'right'), _fslr_mesh_files(density, surface_type), strict=True))
+    if n_procs is not None and n_procs > 1:
+        from .utils import _render_views
+
+        panel_size = (figure.get_figwidth() / 4, figure.get_figheight())
+        dpi = 400 if output_file is not None else figure.dpi
+        jobs = [
+            (
+                _render_surface_panel,
+                (mesh_files[hemi], hemi, view),
+                {
+                    'figsize': panel_size,
+                    'dpi': dpi,
+                    'cmap': cmap,
+                    'vmin': mn,
+                    'vmax': mx,
+                    **hemi_kwargs,
+                    **kwargs,
+                },
+            )
+            for hemi, view, hemi_kwargs in panels
+        ]
+        for i, ((hemi, view, _), image) in enumerate(
+            zip(panels, _render_views(jobs, n_procs=n_procs), strict=True)
+        ):
+            ax = figure.add_subplot(1, 4, i + 1)
+            ax.imshow(image, interpolation='none')
+            ax.set_axis_off()
+            ax.set_title(f'{hemi.title()} - {view.title()}')
+    else:
+        from nilearn.plotting import plot_surf
+
+        for i, (hemi, view, hemi_kwargs) in enumerate(panels):
             title = f'{hemi.title()} - {view.title()}'
-            ax = figure.add_subplot(1, 4, i * 2 + j + 1, projection='3d', rasterized=True)
-            hemi_kwargs = (lh_kwargs, rh_kwargs)[j]
+            ax = figure.add_subplot(1, 4, i + 1, projection='3d', rasterized=True)
             plot_surf(
+                surf_mesh=_load_surf_mesh(mesh_files[hemi]),
                 hemi=hemi,
                 view=view,
                 title=title,
@@ -1109,6 +1158,51 @@ def cifti_surfaces_plot(
     return figure
 
 
+@lru_cache(maxsize=4)
+def _fslr_mesh_files(density, surface_type):
+    """Resolve the paths to the left and right fsLR meshes in TemplateFlow."""
+    import templateflow.api as tf
+
+    lh, rh = tf.get('fsLR', density=density, suffix=surface_type, extension=['.surf.gii'])
+    return str(lh), str(rh)
+
+
+@lru_cache(maxsize=4)
+def _load_surf_mesh(mesh_file):
+    """
+    Load a surface mesh, once per process.
+
+    Meshes are kept for the lifetime of the process, so that plotting many runs
+    does not read the same GIFTI files over and over.
+
+    """
+    from nilearn.surface import load_surf_mesh
+
+    return load_surf_mesh(mesh_file)
+
+
+def _render_surface_panel(mesh_file, hemi, view, figsize, dpi, **kwargs):
+    """Render one view of a hemisphere of :func:`cifti_surfaces_plot` as an RGBA array."""
+    from nilearn.plotting import plot_surf
+
+    figure = plt.figure(figsize=figsize, dpi=dpi)
+    ax = figure.add_axes((0, 0, 1, 1), projection='3d')
+    plot_surf(
+        surf_mesh=_load_surf_mesh(mesh_file),
+        hemi=hemi,
+        view=view,
+        axes=ax,
+        colorbar=False,
+        **kwargs,
+    )
+    # plot_surf sets this to 8, which seems a little far out, but 6 starts clipping
+    ax.dist = 7
+    figure.canvas.draw()
+    image = np.array(figure.canvas.buffer_rgba())
+    plt.close(figure)
+    return image
+
+
 def _concat_brain_struct_data(structs, data):
     concat_data = np.array([], dtype=data.dtype)
     for struct in structs:
@@ -1120,13 +1214,41 @@ def _concat_brain_struct_data(structs, data):
 
 def _ward_to_linkage(children, n_leaves, distances):
     """Create linkage matrix from the output of Ward clustering."""
-    # create the counts of samples under each node
-    counts = np.zeros(children.shape[0])
-    n_samples = n_leaves
-    for i, merge in enumerate(children):
-        current_count = 0
-        for child_idx in merge:
-            current_count += 1 if child_idx < n_samples else counts[child_idx - n_samples]
-        counts[i] = current_count
-
-    return np.column_stack([children, distances, counts]).astype(float)
+    # create the counts of samples under each node (leaves first, then merges)
+    counts = [1] * n_leaves
+    for left, right in children.tolist():
+        counts.append(counts[left] + counts[right])
+
+    return np.column_stack([children, distances, counts[n_leaves:]]).astype(float)
+
+
+def _svd_projection(data, n_components=10, n_oversamples=10, n_iter=2):
+    """
+    Project the rows of a matrix onto its leading singular vectors.
+
+    Uses a (seeded) randomized range finder with power iterations, so that
+    only products of ``data`` with thin matrices are calculated.
+
+    Examples
+    --------
+    >>> rng = np.random.default_rng(0)
+    >>> data = rng.normal(size=(100, 3)) @ rng.normal(size=(3, 50))
+    >>> proj = _svd_projection(data, n_components=4)
+    >>> proj.shape
+    (100, 4)
+    >>> centered = data - data.mean(axis=1, keepdims=True)
+    >>> np.allclose(proj @ proj.T, centered @ centered.T)
+    True
+
+    """
+    data = data - data.mean(axis=1, keepdims=True)
+    n_components = min(n_components, *data.shape)
+    rng = np.random.default_rng(0)
+    basis = data @ rng.standard_normal(
+        (data.shape[1], min(n_components + n_oversamples, data.shape[1]))
+    )
+    for _ in range(n_iter):
+        basis = data @ (data.T @ np.linalg.qr(basis)[0])
+    basis = np.linalg.qr(basis)[0]
+    u, s, _ = np.linalg.svd(basis.T @ data, full_matrices=False)
+    return (basis @ u[:, :n_components]) * s[:n_components]
@@ -23,12 +23,16 @@
 """Helper tools for visualization purposes."""
 
 import base64
+import hashlib
+import os
 import re
 import subprocess
-from io import StringIO
+from collections import OrderedDict
+from functools import partial
 from pathlib import Path
 from shutil import which
 from tempfile import TemporaryDirectory
+from threading import Lock
 from uuid import uuid4
 
 import nibabel as nb
@@ -41,24 +45,47 @@ from ..utils.images import rotate_affine, rotation2canonical
 SVGNS = 'http://www.w3.org/2000/svg'
 
 
-def robust_set_limits(data, plot_params, percentiles=(15, 99.8)):
-    """Set (vmax, vmin) based on percentiles of the data."""
+def robust_set_limits(data, plot_params, percentiles=(15, 99.8), max_samples=None):
+    """
+    Set (vmax, vmin) based on percentiles of the data.
+
+    If ``max_samples`` is set, percentiles are estimated on a regular
+    subsample of (at most) that many values.
+
+    """
+    data = np.asanyarray(data).reshape(-1)
+    if max_samples and data.size > max_samples:
+        data = data[:: -(-data.size // max_samples)]
     plot_params['vmin'] = plot_params.get('vmin', np.percentile(data, percentiles[0]))
     plot_params['vmax'] = plot_params.get('vmax', np.percentile(data, percentiles[1]))
     return plot_params
 
 
 def svg_compress(image, compress='auto'):
-    """Generate a blob SVG from a matplotlib figure, may perform compression."""
-    # Check availability of svgo and cwebp
-    has_compress = all((which('svgo'), which('cwebp')))
-    if compress is True and not has_compress:
-        raise RuntimeError('Compression is required, but svgo or cwebp are not installed')
+    """
+    Generate a blob SVG from a matplotlib figure, may perform compression.
+
+    All the PNG rasters embedded in the SVG are found in a single pass and
+    converted into 80% compressed WEBP in a thread pool with Pillow.
+    With ``compress='external'``, the SVG is optimized with ``svgo`` and
+    rasters are converted with ``cwebp`` instead (as long as they are installed,
+    otherwise a :obj:`RuntimeError` is raised).
+    Conversions are memoized by the hash of each PNG.
+
+    """
+    external = compress == 'external'
+    has_compress = all((which('svgo'), which('cwebp'))) if external else _has_webp()
+    if compress in (True, 'external') and not has_compress:
+        raise RuntimeError(
+            'Compression is required, but svgo or cwebp are not installed'
+            if external
+            else 'Compression is required, but Pillow was built without WEBP support'
+        )
     else:
-        compress = (compress is True or compress == 'auto') and has_compress
+        compress = compress in (True, 'auto', 'external') and has_compress
 
     # Compress the SVG file using SVGO
-    if compress:
+    if compress and external:
         cmd = 'svgo -i - -o - -q -p 3 --pretty'
         try:
             pout = subprocess.run(  # noqa: S602
@@ -72,43 +99,33 @@ def svg_compress(image, compress='auto'):
         except OSError as e:
             from errno import ENOENT
 
-            if compress is True and e.errno == ENOENT:
-                raise e
+            if e.errno == ENOENT:
+                raise
         else:
             image = pout.decode('utf-8')
 
     # Convert all of the rasters inside the SVG file with 80% compressed WEBP
     if compress:
-        new_lines = []
-        with StringIO(image) as fp:
-            for line in fp:
-                if 'image/png' in line:
-                    tmp_lines = [line]
-                    while '/>' not in line:
-                        line = fp.readline()
-                        tmp_lines.append(line)
-                    content = ''.join(tmp_lines).replace('\n', '').replace(',  ', ',')
-
-                    left = content.split('base64,')[0] + 'base64,'
-                    left = left.replace('image/png', 'image/webp')
-                    right = content.split('base64,')[1]
-                    png_b64 = right.split('"')[0]
-                    right = '"' + '"'.join(right.split('"')[1:])
-
-                    cmd = 'cwebp -quiet -noalpha -q 80 -o - -- -'
-                    pout = subprocess.run(  # noqa: S602
-                        cmd,
-                        input=base64.b64decode(png_b64),
-                        shell=True,
-                        stdout=subprocess.PIPE,
-                        check=True,
-                        close_fds=True,
-                    ).stdout
-                    webpimg = base64.b64encode(pout).decode('utf-8')
-                    new_lines.append(left + webpimg + right)
-                else:
-                    new_lines.append(line)
-        lines = new_lines
+        from concurrent.futures import ThreadPoolExecutor
+
+        matches = list(_PNG_B64_RE.finditer(image))
+        pngs = {m.group(1): base64.b64decode(re.sub(r'\s+', '', m.group(1))) for m in matches}
+        if pngs:
+            with ThreadPoolExecutor(max_workers=min(len(pngs), os.cpu_count() or 1)) as pool:
+                webps = dict(
+                    zip(
+                        pngs,
+                        pool.map(partial(_png2webp, external=external), pngs.values()),
+                        strict=True,
+                    )
+                )
+            image = _PNG_B64_RE.sub(
+                lambda m: (
+                    'data:image/webp;base64,' + base64.b64encode(webps[m.group(1)]).decode('utf-8')
+                ),
+                image,
+            )
+        lines = image.splitlines(keepends=True)
     else:
         lines = image.splitlines()
 
@@ -122,6 +139,53 @@ def svg_compress(image, compress='auto'):
     return ''.join(image_svg)  # straight up giant string
 
 
+_PNG_B64_RE = re.compile(r'data:image/png;base64,([A-Za-z0-9+/=\s]+)')
+_WEBP_CACHE = OrderedDict()
+_WEBP_CACHE_SIZE = 64
+_WEBP_CACHE_LOCK = Lock()
+
+
+def _has_webp():
+    """Check whether Pillow can encode WEBP images."""
+    try:
+        from PIL import features
+    except ImportError:
+        return False
+    return features.check('webp')
+
+
+def _png2webp(png, external=False):
+    """Convert a PNG (bytes) into an 80% compressed WEBP, memoizing the result."""
+    key = (hashlib.sha256(png).hexdigest(), external)
+    with _WEBP_CACHE_LOCK:
+        if key in _WEBP_CACHE:
+            _WEBP_CACHE.move_to_end(key)
+            return _WEBP_CACHE[key]
+
+    if external:
+        webp = subprocess.run(
+            ['cwebp', '-quiet', '-noalpha', '-q', '80', '-o', '-', '--', '-'],  # noqa: S607
+            input=png,
+            stdout=subprocess.PIPE,
+            check=True,
+            close_fds=True,
+        ).stdout
+    else:
+        from io import BytesIO
+
+        from PIL import Image
+
+        with BytesIO(png) as png_buf, BytesIO() as webp_buf:
+            Image.open(png_buf).convert('RGB').save(webp_buf, format='webp', quality=80)
+            webp = webp_buf.getvalue()
+
+    with _WEBP_CACHE_LOCK:
+        _WEBP_CACHE[key] = webp
+        while len(_WEBP_CACHE) > _WEBP_CACHE_SIZE:
+            _WEBP_CACHE.popitem(last=False)
+    return webp
+
+
 def svg2str(display_object, dpi=300):
     """Serialize a nilearn display object to string."""
     from io import StringIO
@@ -133,10 +197,69 @@ def svg2str(display_object, dpi=300):
     return image_buf.getvalue()
 
 
+def svg_raster(display_object, dpi=300, image_format='webp', quality=80):
+    """
+    Render a nilearn display object to a raster image, embedded in a minimal SVG.
+
+    The figure is drawn by matplotlib's Agg backend and encoded in-process
+    with Pillow, bypassing the serialization of the display to SVG
+    (and its compression with external tools).
+    The SVG container has the same ``viewBox`` (in points) that matplotlib
+    would have generated, so that reportlets are composed identically.
+
+    """
+    from io import BytesIO
+
+    from PIL import Image
+
+    figure = display_object.frame_axes.figure
+    with BytesIO() as png_buf:
+        # Store the PNG without compression, it is only decoded back right away
+        figure.savefig(
+            png_buf,
+            dpi=dpi,
+            format='png',
+            facecolor='k',
+            edgecolor='k',
+            pil_kwargs={'compress_level': 0},
+        )
+        png_buf.seek(0)
+        image = Image.open(png_buf).convert('RGB')
+
+    with BytesIO() as out_buf:
+        if image_format == 'webp':
+            # Effort level 1 encodes ~3x faster than cwebp's default, for ~5% larger files
+            image.save(out_buf, format='webp', quality=quality, method=1)
+        else:
+            image.save(out_buf, format='png', optimize=True)
+        b64 = base64.b64encode(out_buf.getvalue()).decode('ascii')
+
+    width, height = (f'{size:g}' for size in figure.get_size_inches() * 72)
+    return (
+        f'<svg xmlns:xlink="http://www.w3.org/1999/xlink" '
+        f'preserveAspectRatio="xMidYMid meet" viewBox="0 0 {width} {height}" '
+        f'xmlns="{SVGNS}" version="1.1">\n'
+        f' <g id="figure_1">\n'
+        f'  <image x="0" y="0" width="{width}" height="{height}" '
+        f'xlink:href="data:image/{image_format};base64,{b64}"/>\n'
+        f' </g>\n'
+        f'</svg>'
+    )
+
+
 def extract_svg(display_object, dpi=300, compress='auto'):
-    """Remove the preamble of the svg files generated with nilearn."""
+    """
+    Remove the preamble of the svg files generated with nilearn.
+
+    With ``compress='raster'``, the display is rendered as a WebP image
+    wrapped in a minimal SVG (see :func:`svg_raster`).
+
+    """
+    if compress == 'raster':
+        return svg_raster(display_object, dpi)
+
     image_svg = svg2str(display_object, dpi)
-    if compress is True or compress == 'auto':
+    if compress in (True, 'auto', 'external'):
         image_svg = svg_compress(image_svg, compress)
     image_svg = re.sub(r' height="[0-9]+[a-z]*"', '', image_svg, count=1)
     image_svg = re.sub(r' width="[0-9]+[a-z]*"', '', image_svg, count=1)
@@ -228,6 +351,7 @@ def plot_segs(
     masked=False,
     colors=None,
     compress='auto',
+    n_procs=1,
     **plot_params,
 ):
     """
@@ -237,6 +361,7 @@ def plot_segs(
     seg_niis should be a list of files. mask_nii helps determine the cut
     coordinates. plot_params will be passed on to nilearn plot_* functions. If
     seg_niis is a list of size one, it behaves as if it was plotting the mask.
+    With ``n_procs > 1``, each view is rendered in a separate process.
     """
     from nilearn import image as nlimage
     from svgutils.transform import fromstring
@@ -260,16 +385,48 @@ def plot_segs(
 
     cuts = cuts_from_bbox(bbox_nii, cuts=7)
     plot_params['colors'] = colors or plot_params.get('colors', None)
-    out_files = []
-    for d in plot_params.pop('dimensions', ('z', 'x', 'y')):
-        plot_params['display_mode'] = d
-        plot_params['cut_coords'] = cuts[d]
-        svg = _plot_anat_with_contours(image_nii, segs=seg_niis, compress=compress, **plot_params)
-        # Find and replace the figure_1 id.
-        svg = svg.replace('figure_1', f'segmentation-{d}-{uuid4()}', 1)
-        out_files.append(fromstring(svg))
+    dimensions = plot_params.pop('dimensions', ('z', 'x', 'y'))
+    svgs = _render_views(
+        [
+            (
+                _plot_anat_with_contours,
+                (image_nii,),
+                dict(
+                    plot_params,
+                    segs=seg_niis,
+                    compress=compress,
+                    display_mode=d,
+                    cut_coords=cuts[d],
+                ),
+            )
+            for d in dimensions
+        ],
+        n_procs=n_procs,
+    )
+
+    # Find and replace the figure_1 id.
+    return [
+        fromstring(svg.replace('figure_1', f'segmentation-{d}-{uuid4()}', 1))
+        for d, svg in zip(dimensions, svgs, strict=True)
+    ]
 
-    return out_files
+
+def _render_views(jobs, n_procs=1):
+    """
+    Run a list of ``(function, args, kwargs)`` figure-rendering jobs.
+
+    Matplotlib is not thread-safe, so with ``n_procs > 1`` jobs are dispatched
+    to a pool of processes. Results are returned in the order of ``jobs``.
+
+    """
+    if n_procs is None or n_procs < 2 or len(jobs) < 2:
+        return [func(*args, **kwargs) for func, args, kwargs in jobs]
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=min(n_procs, len(jobs))) as pool:
+        futures = [pool.submit(func, *args, **kwargs) for func, args, kwargs in jobs]
+        return [future.result() for future in futures]
 
 
 def _plot_anat_with_contours(image, segs=None, compress='auto', **plot_params):
@@ -320,15 +477,50 @@ def plot_registration(
     contour=None,
     compress='auto',
     dismiss_affine=False,
+    n_procs=1,
 ):
     """
     Plots the foreground and background views
     Default order is: axial, coronal, sagittal
+    With ``n_procs > 1``, each view is rendered in a separate process.
     """
-    from nilearn import image as nlimage
-    from nilearn.plotting import plot_anat
     from svgutils.transform import fromstring
 
+    return [
+        fromstring(svg)
+        for svg in _render_views(
+            _registration_jobs(
+                anat_nii,
+                div_id,
+                plot_params=plot_params,
+                order=order,
+                cuts=cuts,
+                estimate_brightness=estimate_brightness,
+                label=label,
+                contour=contour,
+                compress=compress,
+                dismiss_affine=dismiss_affine,
+            ),
+            n_procs=n_procs,
+        )
+    ]
+
+
+def _registration_jobs(
+    anat_nii,
+    div_id,
+    plot_params=None,
+    order=('z', 'x', 'y'),
+    cuts=None,
+    estimate_brightness=False,
+    label=None,
+    contour=None,
+    compress='auto',
+    dismiss_affine=False,
+):
+    """Prepare the rendering jobs of :func:`plot_registration` (see :func:`_render_views`)."""
+    from nilearn import image as nlimage
+
     plot_params = {} if plot_params is None else plot_params
 
     # Use default MNI cuts if none defined
@@ -338,20 +530,21 @@ def plot_registration(
     # nilearn 0.10.0 uses Nifti-specific methods
     anat_nii = nb.Nifti1Image.from_image(anat_nii)
 
-    out_files = []
     if estimate_brightness:
-        plot_params = robust_set_limits(anat_nii.get_fdata().reshape(-1), plot_params)
+        plot_params = robust_set_limits(
+            np.asanyarray(anat_nii.dataobj, dtype='float32'), plot_params, max_samples=2**20
+        )
 
     # FreeSurfer ribbon.mgz
     if contour:
         contour = nb.Nifti1Image.from_image(contour)
+        # Labels are read without scaling them to floating point
+        contour_data = np.asanyarray(contour.dataobj)
 
-    ribbon = contour is not None and np.array_equal(
-        np.unique(contour.get_fdata()), [0, 2, 3, 41, 42]
-    )
+    ribbon = contour is not None and np.array_equal(np.unique(contour_data), [0, 2, 3, 41, 42])
 
     if ribbon:
-        contour_data = contour.get_fdata() % 39
+        contour_data = contour_data % 39
         white = nlimage.new_img_like(contour, contour_data == 2)
         pial = nlimage.new_img_like(contour, contour_data >= 2)
 
@@ -364,32 +557,48 @@ def plot_registration(
         if contour:
             contour = rotate_affine(contour, rot=canonical_r)
 
+    if ribbon:
+        kwargs = {'levels': [0.5], 'linewidths': 0.5}
+        contours = [(white, dict(kwargs, colors='b')), (pial, dict(kwargs, colors='r'))]
+    elif contour is not None:
+        contours = [(contour, {'colors': 'r', 'levels': [0.5], 'linewidths': 0.5})]
+    else:
+        contours = []
+
     # Plot each cut axis
-    for i, mode in enumerate(list(order)):
-        plot_params['display_mode'] = mode
-        plot_params['cut_coords'] = cuts[mode]
-        if i == 0:
-            plot_params['title'] = label
-        else:
-            plot_params['title'] = None
+    return [
+        (
+            _plot_registration_view,
+            (anat_nii, f'{div_id}-{mode}'),
+            {
+                'plot_params': dict(
+                    plot_params,
+                    display_mode=mode,
+                    cut_coords=cuts[mode],
+                    title=label if i == 0 else None,
+                ),
+                'contours': contours,
+                'compress': compress,
+            },
+        )
+        for i, mode in enumerate(list(order))
+    ]
 
-        # Generate nilearn figure
-        display = plot_anat(anat_nii, **plot_params)
-        if ribbon:
-            kwargs = {'levels': [0.5], 'linewidths': 0.5}
-            display.add_contours(white, colors='b', **kwargs)
-            display.add_contours(pial, colors='r', **kwargs)
-        elif contour is not None:
-            display.add_contours(contour, colors='r', levels=[0.5], linewidths=0.5)
 
-        svg = extract_svg(display, compress=compress)
-        display.close()
+def _plot_registration_view(anat_nii, fig_id, plot_params, contours=(), compress='auto'):
+    """Render one view of :func:`plot_registration` to an SVG string."""
+    from nilearn.plotting import plot_anat
+
+    # Generate nilearn figure
+    display = plot_anat(anat_nii, **plot_params)
+    for contour, kwargs in contours:
+        display.add_contours(contour, **kwargs)
 
-        # Find and replace the figure_1 id.
-        svg = svg.replace('figure_1', f'{div_id}-{mode}-{uuid4()}', 1)
-        out_files.append(fromstring(svg))
+    svg = extract_svg(display, compress=compress)
+    display.close()
 
-    return out_files
+    # Find and replace the figure_1 id.
+    return svg.replace('figure_1', f'{fig_id}-{uuid4()}', 1)
 
 
 def compose_view(bg_svgs, fg_svgs, ref=0, out_file='report.svg'):
@@ -26,14 +26,17 @@ from nipype.interfaces import utility as niu
 from nipype.pipeline import engine as pe
 
 from ...engine.workflows import LiterateWorkflow as Workflow
+from ...engine.workflows import cached_workflow
 
 DEFAULT_MEMORY_MIN_GB = 0.01
 
 
+@cached_workflow
 def init_epi_reference_wf(
     omp_nthreads,
     auto_bold_nss=False,
     name='epi_reference_wf',
+    fused_preflight=False,
 ):
     """
     Build a workflow that generates a reference map from a set of EPI images.
@@ -83,6 +86,11 @@ def init_epi_reference_wf(
         If ``True``, determines nonsteady states in the beginning of the timeseries
         and selects them for the averaging of each run.
         IMPORTANT: this option applies only to BOLD EPIs.
+    fused_preflight : :obj:`bool`
+        Validate the header, (optionally) detect nonsteady states and average the
+        reference volumes of each run in a single
+        :class:`~niworkflows.interfaces.bold.BOLDPreflight` node, which reads
+        each run once (default: ``False``).
 
     Inputs
     ------
@@ -116,7 +124,7 @@ def init_epi_reference_wf(
     """
     from nipype.interfaces.ants import N4BiasFieldCorrection
 
-    from ...interfaces.bold import NonsteadyStatesDetector
+    from ...interfaces.bold import BOLDPreflight, NonsteadyStatesDetector
     from ...interfaces.freesurfer import StructuralReference
     from ...interfaces.header import ValidateImage
     from ...interfaces.images import RobustAverage
@@ -140,11 +148,21 @@ def init_epi_reference_wf(
         name='outputnode',
     )
 
-    validate_nii = pe.MapNode(ValidateImage(), name='validate_nii', iterfield=['in_file'])
-
-    per_run_avgs = pe.MapNode(
-        RobustAverage(), name='per_run_avgs', mem_gb=1, iterfield=['in_file', 't_mask']
-    )
+    if fused_preflight:
+        # A single node stands for the validation, the detector and the averaging
+        validate_nii = per_run_avgs = select_volumes = pe.MapNode(
+            BOLDPreflight(),
+            name='preflight',
+            mem_gb=1,
+            iterfield=['in_file'] if auto_bold_nss else ['in_file', 't_mask'],
+        )
+        avg_field = 'out_avg'
+    else:
+        validate_nii = pe.MapNode(ValidateImage(), name='validate_nii', iterfield=['in_file'])
+        per_run_avgs = pe.MapNode(
+            RobustAverage(), name='per_run_avgs', mem_gb=1, iterfield=['in_file', 't_mask']
+        )
+        avg_field = 'out_file'
 
     clip_avgs = pe.MapNode(IntensityClip(), name='clip_avgs', iterfield=['in_file'])
 
@@ -188,8 +206,7 @@ def init_epi_reference_wf(
     # fmt:off
     wf.connect([
         (inputnode, validate_nii, [(('in_files', listify), 'in_file')]),
-        (validate_nii, per_run_avgs, [('out_file', 'in_file')]),
-        (per_run_avgs, clip_avgs, [('out_file', 'in_file')]),
+        (per_run_avgs, clip_avgs, [(avg_field, 'in_file')]),
         (clip_avgs, n4_avgs, [('out_file', 'input_image')]),
         (n4_avgs, clip_bg_noise, [('output_image', 'in_file')]),
         (clip_bg_noise, epi_merge, [
@@ -206,17 +223,21 @@ def init_epi_reference_wf(
     ])
     # fmt:on
 
+    if not fused_preflight:
+        wf.connect(validate_nii, 'out_file', per_run_avgs, 'in_file')
+
     if auto_bold_nss:
-        select_volumes = pe.MapNode(
-            NonsteadyStatesDetector(), name='select_volumes', iterfield=['in_file']
-        )
-        # fmt:off
-        wf.connect([
-            (validate_nii, select_volumes, [('out_file', 'in_file')]),
-            (select_volumes, per_run_avgs, [('t_mask', 't_mask')]),
-            (select_volumes, outputnode, [('n_dummy', 'n_dummy')])
-        ])
-        # fmt:on
+        if not fused_preflight:
+            select_volumes = pe.MapNode(
+                NonsteadyStatesDetector(), name='select_volumes', iterfield=['in_file']
+            )
+            # fmt:off
+            wf.connect([
+                (validate_nii, select_volumes, [('out_file', 'in_file')]),
+                (select_volumes, per_run_avgs, [('t_mask', 't_mask')]),
+            ])
+            # fmt:on
+        wf.connect(select_volumes, 'n_dummy', outputnode, 'n_dummy')
     else:
         wf.connect(inputnode, 't_masks', per_run_avgs, 't_mask')
 
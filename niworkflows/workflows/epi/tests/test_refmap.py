@@ -25,16 +25,21 @@
 import os
 import unittest
 
+import pytest
+
 from ....testing import has_afni
 from ..refmap import init_epi_reference_wf
 
 
 @unittest.skipUnless(has_afni, 'Needs AFNI')
-def test_reference(tmpdir, ds000030_dir, workdir, outdir):
+@pytest.mark.parametrize('fused_preflight', [False, True])
+def test_reference(tmpdir, ds000030_dir, workdir, outdir, fused_preflight):
     """Exercise the EPI reference workflow."""
     tmpdir.chdir()
 
-    wf = init_epi_reference_wf(omp_nthreads=os.cpu_count(), auto_bold_nss=True)
+    wf = init_epi_reference_wf(
+        omp_nthreads=os.cpu_count(), auto_bold_nss=True, fused_preflight=fused_preflight
+    )
     if workdir:
         wf.base_dir = str(workdir)
 